@@ -2,26 +2,48 @@
 Sistema de Control de Pollos de Engorde - Backend
 API REST con Flask
 """
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, g
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import inspect, text
+from sqlalchemy import text, insert, update, delete, select, func, case, event, literal, true
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, aliased, joinedload, load_only
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta, timezone, date
 from functools import wraps
+from collections import defaultdict, namedtuple
 import jwt
 import os
+import sys
+import atexit
 import warnings
 import io
 import importlib
-
-# Intentar importar qrcode (opcional)
-try:
-    import qrcode
-    QRCODE_AVAILABLE = True
-except ImportError:
-    QRCODE_AVAILABLE = False
-    print("⚠️  Librería qrcode no disponible. Instalar con: pip install qrcode[pil]")
+import json
+
+# Permitir importar config y services tanto con `python run.py` como con `gunicorn backend.app:app`
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import get_config
+from services.ingesta import BufferIngesta, ColaLlenaError
+from services.logs import configurar_logging
+from services.base_datos import (aplicar_perfil_sqlite, activar_claves_foraneas_sqlite, opciones_motor, metricas_pool,
+                                 SesionEnrutada, EnrutadorReplica, BIND_REPLICA, COOKIE_ESCRITURA)
+from services.consultas import presupuesto_consultas, presupuesto_de, fijar_presupuesto, vigilar_consultas
+from services.paginacion import paginar
+from services.json_api import ProveedorJSON
+from services.compresion import configurar_compresion
+from services.estaticos import configurar_estaticos
+from services.publico import CacheTTL, LimitadorTokens, limitar_peticiones
+from services.paginas_publicas import PaginasPublicas, renderizar_pagina_lote, PAGINA_NO_DISPONIBLE
+from services.archivo import comprimir_filas, descomprimir_filas
+from services.particiones import tablas_particionables, particionar_tabla, asegurar_particiones
+from services.migraciones import RegistroMigraciones, agregar_columna, crear_indices_faltantes, sincronizar_claves_foraneas
+
+# qrcode es opcional: sin él no hay imágenes QR ni hoja de etiquetas
+from services.qr import CacheQR, hoja_etiquetas_pdf, FORMATOS_QR, QRCODE_DISPONIBLE, REPORTLAB_DISPONIBLE
 
 # Suprimir warnings de deprecación de datetime.utcnow()
 warnings.filterwarnings("ignore", category=DeprecationWarning, message="datetime.datetime.utcnow*")
@@ -40,7 +62,7 @@ app = Flask(
 CORS(app,
     resources={r"/api/*": {"origins": ["http://127.0.0.1:5500", "http://localhost:5500", "http://127.0.0.1:8000", "http://localhost:8000", "http://localhost", "http://127.0.0.1", "null"]}},
      supports_credentials=True,
-     expose_headers=["Content-Disposition"],
+     expose_headers=["Content-Disposition", "X-Lote-Archivado"],
      allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
      max_age=600)
@@ -55,7 +77,143 @@ if db_url.startswith('postgres://'):
 app.config['SQLALCHEMY_DATABASE_URI'] = db_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db = SQLAlchemy(app)
+# Ajustes operativos definidos en config.py (según FLASK_ENV)
+CONFIG = get_config()
+app.config['INGESTA_HABILITADA'] = CONFIG.INGESTA_HABILITADA
+app.config['INGESTA_MAX_COLA'] = CONFIG.INGESTA_MAX_COLA
+app.config['INGESTA_TAM_LOTE'] = CONFIG.INGESTA_TAM_LOTE
+app.config['INGESTA_INTERVALO_SEG'] = CONFIG.INGESTA_INTERVALO_SEG
+app.config['INGESTA_SPOOL'] = CONFIG.INGESTA_SPOOL
+app.config['INGESTA_FSYNC'] = CONFIG.INGESTA_FSYNC
+app.config['INGESTA_MAX_INTENTOS'] = CONFIG.INGESTA_MAX_INTENTOS
+app.config['INGESTA_SPOOL_COMPACTAR_KB'] = CONFIG.INGESTA_SPOOL_COMPACTAR_KB
+app.config['LOG_LEVEL'] = CONFIG.LOG_LEVEL
+app.config['LOG_FORMATO'] = CONFIG.LOG_FORMATO
+app.config['LOG_MUESTREO'] = CONFIG.LOG_MUESTREO
+app.config['LOG_ASINCRONO'] = CONFIG.LOG_ASINCRONO
+app.config['SYNC_MAX_PAGINA'] = CONFIG.SYNC_MAX_PAGINA
+app.config['SYNC_RETENCION_DIAS'] = CONFIG.SYNC_RETENCION_DIAS
+app.config['PAGINA_POR_DEFECTO'] = CONFIG.PAGINA_POR_DEFECTO
+app.config['PAGINA_MAX'] = CONFIG.PAGINA_MAX
+app.config['BATCH_MAX_PETICIONES'] = CONFIG.BATCH_MAX_PETICIONES
+app.config['PUBLICO_CACHE_SEG'] = CONFIG.PUBLICO_CACHE_SEG
+app.config['PUBLICO_LIMITE_POR_MINUTO'] = CONFIG.PUBLICO_LIMITE_POR_MINUTO
+app.config['PUBLICO_LIMITE_RAFAGA'] = CONFIG.PUBLICO_LIMITE_RAFAGA
+app.config['PROXIES_CONFIABLES'] = CONFIG.PROXIES_CONFIABLES
+app.config['AUTH_CACHE_SEG'] = CONFIG.AUTH_CACHE_SEG
+app.config['JSON_RAPIDO'] = CONFIG.JSON_RAPIDO
+
+# Serialización JSON: fechas en ISO 8601 y Decimal como número; orjson si está instalado y JSON_RAPIDO
+app.json = ProveedorJSON(app)
+app.json.usar_orjson = app.json.usar_orjson and app.config['JSON_RAPIDO']
+app.config['COMPRESION_HABILITADA'] = CONFIG.COMPRESION_HABILITADA
+app.config['COMPRESION_MIN_BYTES'] = CONFIG.COMPRESION_MIN_BYTES
+app.config['COMPRESION_NIVEL_GZIP'] = CONFIG.COMPRESION_NIVEL_GZIP
+app.config['COMPRESION_NIVEL_BROTLI'] = CONFIG.COMPRESION_NIVEL_BROTLI
+app.config['COMPRESION_BROTLI'] = CONFIG.COMPRESION_BROTLI
+app.config['FRONTEND_BUILD_DIR'] = CONFIG.FRONTEND_BUILD_DIR or os.path.join(BASE_DIR, '..', 'build', 'frontend')
+app.config['FRONTEND_HTML_TTL_SEG'] = CONFIG.FRONTEND_HTML_TTL_SEG
+
+# Detrás de un proxy, la IP del cliente (límite de los endpoints públicos) viene en X-Forwarded-For
+if app.config['PROXIES_CONFIABLES'] > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXIES_CONFIABLES'], x_proto=app.config['PROXIES_CONFIABLES'])
+
+# Frontend construido (huella + .gz/.br) si existe; si no, se sirve frontend/ sin procesar
+configurar_estaticos(app, os.path.abspath(app.config['FRONTEND_BUILD_DIR']), app.config['FRONTEND_HTML_TTL_SEG'])
+
+# Compresión negociada de respuestas (API, exportaciones CSV y frontend estático)
+if app.config['COMPRESION_HABILITADA']:
+    configurar_compresion(
+        app,
+        min_bytes=app.config['COMPRESION_MIN_BYTES'],
+        nivel_gzip=app.config['COMPRESION_NIVEL_GZIP'],
+        nivel_brotli=app.config['COMPRESION_NIVEL_BROTLI'],
+        brotli_habilitado=app.config['COMPRESION_BROTLI']
+    )
+app.config['MIGRAR_AL_INICIAR'] = CONFIG.MIGRAR_AL_INICIAR
+app.config['ARCHIVO_MESES'] = CONFIG.ARCHIVO_MESES
+app.config['PARTICIONES_ANIOS_ADELANTE'] = CONFIG.PARTICIONES_ANIOS_ADELANTE
+app.config['CONSULTAS_VIGILAR'] = CONFIG.CONSULTAS_VIGILAR
+app.config['SQLITE_OPTIMIZADO'] = CONFIG.SQLITE_OPTIMIZADO
+app.config['SQLITE_SYNCHRONOUS'] = CONFIG.SQLITE_SYNCHRONOUS
+app.config['SQLITE_CACHE_KB'] = CONFIG.SQLITE_CACHE_KB
+app.config['SQLITE_MMAP_MB'] = CONFIG.SQLITE_MMAP_MB
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = CONFIG.SQLITE_BUSY_TIMEOUT_MS
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones_motor(
+    db_url,
+    pool_size=CONFIG.DB_POOL_SIZE,
+    max_overflow=CONFIG.DB_MAX_OVERFLOW,
+    pool_timeout=CONFIG.DB_POOL_TIMEOUT,
+    pool_recycle=CONFIG.DB_POOL_RECYCLE,
+    pool_pre_ping=CONFIG.DB_POOL_PRE_PING,
+    statement_timeout_ms=CONFIG.DB_STATEMENT_TIMEOUT_MS,
+    connect_timeout=CONFIG.DB_CONNECT_TIMEOUT
+)
+
+# Réplica de solo lectura (opcional): las peticiones GET leen de ella
+replica_url = CONFIG.DATABASE_REPLICA_URL
+if replica_url.startswith('postgres://'):
+    replica_url = replica_url.replace('postgres://', 'postgresql+psycopg2://', 1)
+if replica_url:
+    app.config['SQLALCHEMY_BINDS'] = {BIND_REPLICA: {
+        'url': replica_url,
+        **opciones_motor(
+            replica_url,
+            pool_size=CONFIG.DB_POOL_SIZE,
+            max_overflow=CONFIG.DB_MAX_OVERFLOW,
+            pool_timeout=CONFIG.DB_POOL_TIMEOUT,
+            pool_recycle=CONFIG.DB_POOL_RECYCLE,
+            pool_pre_ping=CONFIG.DB_POOL_PRE_PING,
+            statement_timeout_ms=CONFIG.DB_STATEMENT_TIMEOUT_MS,
+            connect_timeout=CONFIG.DB_CONNECT_TIMEOUT
+        )
+    }}
+    app.config['DB_REPLICA_VENTANA_SEG'] = CONFIG.DB_REPLICA_VENTANA_SEG
+
+log = configurar_logging(
+    app,
+    nivel=app.config['LOG_LEVEL'],
+    formato=app.config['LOG_FORMATO'],
+    muestreo=app.config['LOG_MUESTREO'],
+    asincrono=app.config['LOG_ASINCRONO']
+)
+if not QRCODE_DISPONIBLE:
+    log.warning("Librería qrcode no disponible. Instalar con: pip install qrcode[pil]")
+
+db = SQLAlchemy(app, session_options={'class_': SesionEnrutada})
+
+if replica_url:
+    app.extensions['enrutador_replica'] = EnrutadorReplica(app.config['DB_REPLICA_VENTANA_SEG'])
+
+    @app.after_request
+    def marcar_escritura(response):
+        """Tras una escritura exitosa, el usuario lee del primario durante la ventana configurada."""
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400
+                and request.endpoint != 'peticiones_agrupadas'):  # /api/batch solo lee
+            marca = app.extensions['enrutador_replica'].registrar_escritura(g.get('usuario_id'))
+            response.set_cookie(COOKIE_ESCRITURA, f'{marca:.3f}', max_age=int(app.config['DB_REPLICA_VENTANA_SEG']) + 1,
+                                httponly=True, samesite='Lax')
+        return response
+
+# Perfil de rendimiento SQLite (WAL, synchronous=NORMAL, caché, mmap...) en cada conexión nueva.
+# Sin el perfil se activa al menos PRAGMA foreign_keys=ON, necesario para ON DELETE CASCADE.
+if app.config['SQLITE_OPTIMIZADO']:
+    with app.app_context():
+        aplicar_perfil_sqlite(
+            db.engine,
+            synchronous=app.config['SQLITE_SYNCHRONOUS'],
+            cache_kb=app.config['SQLITE_CACHE_KB'],
+            mmap_mb=app.config['SQLITE_MMAP_MB'],
+            busy_timeout_ms=app.config['SQLITE_BUSY_TIMEOUT_MS']
+        )
+else:
+    with app.app_context():
+        activar_claves_foraneas_sqlite(db.engine)
+
+# Sentencias SQL por petición frente al presupuesto declarado con @presupuesto_consultas
+if app.config['CONSULTAS_VIGILAR']:
+    with app.app_context():
+        vigilar_consultas(app, db.engines.values())
 
 # ============= MODELOS =============
 
@@ -86,15 +244,22 @@ class Lote(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    registros = db.relationship('RegistroDiario', backref='lote', lazy=True, cascade='all, delete-orphan')
-    costos = db.relationship('Costo', backref='lote', lazy=True, cascade='all, delete-orphan')
-    ingresos = db.relationship('Ingreso', backref='lote', lazy=True, cascade='all, delete-orphan')
-    sanidad = db.relationship('Sanidad', backref='lote', lazy=True, cascade='all, delete-orphan')
+    __table_args__ = (
+        db.Index('idx_lotes_estado_fecha', 'estado', 'fecha_inicio'),  # Lotes activos / filtros por estado
+        db.Index('idx_lotes_fecha_inicio', 'fecha_inicio'),            # Listado ordenado por fecha
+    )
+    
+    # Las filas hijas las borra la base (ON DELETE CASCADE); passive_deletes evita cargarlas en la sesión
+    registros = db.relationship('RegistroDiario', backref='lote', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    costos = db.relationship('Costo', backref='lote', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    ingresos = db.relationship('Ingreso', backref='lote', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    sanidad = db.relationship('Sanidad', backref='lote', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    archivo = db.relationship('LoteArchivado', uselist=False, lazy=True, cascade='all, delete-orphan', passive_deletes=True)
 
 class RegistroDiario(db.Model):
     __tablename__ = 'registros_diarios'
     id = db.Column(db.Integer, primary_key=True)
-    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id'), nullable=False)
+    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id', ondelete='CASCADE'), nullable=False)
     fecha = db.Column(db.Date, nullable=False)
     alimento_kg = db.Column(db.Float)
     agua_litros = db.Column(db.Float)
@@ -106,23 +271,30 @@ class RegistroDiario(db.Model):
     observaciones = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('lote_id', 'fecha', name='_lote_fecha_uc'),)
+    # La restricción única crea el índice (lote_id, fecha) que usan listados, curvas y reportes.
+    # En PostgreSQL la tabla se particiona por año de `fecha` (ver services/particiones.py).
+    __table_args__ = (
+        db.UniqueConstraint('lote_id', 'fecha', name='_lote_fecha_uc'),
+        {'info': {'particion_rango': 'fecha'}},
+    )
 
 class Costo(db.Model):
     __tablename__ = 'costos'
     id = db.Column(db.Integer, primary_key=True)
-    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id'), nullable=False)
+    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id', ondelete='CASCADE'), nullable=False)
     categoria = db.Column(db.String(50), nullable=False)
     concepto = db.Column(db.String(200), nullable=False)
     monto = db.Column(db.Float, nullable=False)
     fecha = db.Column(db.Date, nullable=False)
     observaciones = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('idx_costos_lote_fecha', 'lote_id', 'fecha'),)
 
 class Ingreso(db.Model):
     __tablename__ = 'ingresos'
     id = db.Column(db.Integer, primary_key=True)
-    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id'), nullable=False)
+    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id', ondelete='CASCADE'), nullable=False)
     cantidad_vendida = db.Column(db.Integer, nullable=False)
     peso_promedio = db.Column(db.Float, nullable=False)
     precio_por_kg = db.Column(db.Float, nullable=False)
@@ -131,11 +303,13 @@ class Ingreso(db.Model):
     cliente = db.Column(db.String(100))
     observaciones = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('idx_ingresos_lote_fecha', 'lote_id', 'fecha'),)
 
 class Sanidad(db.Model):
     __tablename__ = 'sanidad'
     id = db.Column(db.Integer, primary_key=True)
-    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id'), nullable=False)
+    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id', ondelete='CASCADE'), nullable=False)
     tipo = db.Column(db.String(50), nullable=False)
     producto = db.Column(db.String(200), nullable=False)
     dosis = db.Column(db.String(100))
@@ -147,6 +321,8 @@ class Sanidad(db.Model):
     enfermedad = db.relationship('Enfermedad')
     observaciones = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('idx_sanidad_lote_fecha', 'lote_id', 'fecha'),)
 
 class Configuracion(db.Model):
     __tablename__ = 'configuracion'
@@ -171,36 +347,258 @@ class Enfermedad(db.Model):
     medicamentos = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class Cambio(db.Model):
+    """Bitácora de mutaciones para sincronización incremental; el id es el cursor monotónico."""
+    __tablename__ = 'cambios'
+    id = db.Column(db.Integer, primary_key=True)
+    entidad = db.Column(db.String(30), nullable=False)  # lotes, registros, costos, ingresos, sanidad, enfermedades
+    entidad_id = db.Column(db.Integer, nullable=False)
+    lote_id = db.Column(db.Integer)
+    operacion = db.Column(db.String(10), nullable=False)  # upsert | delete | poda
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('idx_cambios_entidad', 'entidad', 'entidad_id'),)
+
+class LoteArchivado(db.Model):
+    """Detalle comprimido y resumen congelado de un lote finalizado, fuera de las tablas calientes."""
+    __tablename__ = 'lotes_archivados'
+    lote_id = db.Column(db.Integer, db.ForeignKey('lotes.id', ondelete='CASCADE'), primary_key=True)
+    archivado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    resumen = db.Column(db.Text, nullable=False)  # JSON: estadisticas, economia y filas por tabla
+    filas = db.Column(db.Integer, default=0)
+    bytes_comprimidos = db.Column(db.Integer, default=0)
+    datos = db.deferred(db.Column(db.LargeBinary, nullable=False))  # Filas de detalle en JSON gzip
+
+# Modelos sincronizables -> nombre de entidad en /api/sync
+ENTIDADES_SYNC = {
+    Lote: 'lotes',
+    RegistroDiario: 'registros',
+    Costo: 'costos',
+    Ingreso: 'ingresos',
+    Sanidad: 'sanidad',
+    Enfermedad: 'enfermedades',
+}
+
+def _lote_de(obj):
+    if isinstance(obj, Lote):
+        return obj.id
+    return getattr(obj, 'lote_id', None)
+
+@event.listens_for(Session, 'after_flush')
+def registrar_cambios_flush(session, flush_context):
+    """Anota en la bitácora cada alta, modificación o baja hecha a través del ORM."""
+    filas = []
+    for obj in session.new:
+        if type(obj) in ENTIDADES_SYNC:
+            filas.append({'entidad': ENTIDADES_SYNC[type(obj)], 'entidad_id': obj.id, 'lote_id': _lote_de(obj), 'operacion': 'upsert'})
+    for obj in session.dirty:
+        if type(obj) in ENTIDADES_SYNC and session.is_modified(obj, include_collections=False):
+            filas.append({'entidad': ENTIDADES_SYNC[type(obj)], 'entidad_id': obj.id, 'lote_id': _lote_de(obj), 'operacion': 'upsert'})
+    for obj in session.deleted:
+        if type(obj) in ENTIDADES_SYNC:
+            filas.append({'entidad': ENTIDADES_SYNC[type(obj)], 'entidad_id': obj.id, 'lote_id': _lote_de(obj), 'operacion': 'delete'})
+    if filas:
+        session.info.setdefault('cambios_pendientes', []).extend(filas)
+        marcar_lotes_modificados((f['lote_id'] for f in filas), session)
+
+def registrar_cambios(modelo, claves, operacion='upsert'):
+    """Anota cambios hechos con sentencias masivas (insert/update/delete), que no pasan por el flush del ORM.
+    `claves` es un iterable de (entidad_id, lote_id)."""
+    filas = [{'entidad': ENTIDADES_SYNC[modelo], 'entidad_id': entidad_id, 'lote_id': lote_id, 'operacion': operacion}
+             for entidad_id, lote_id in claves]
+    if filas:
+        db.session.info.setdefault('cambios_pendientes', []).extend(filas)
+        marcar_lotes_modificados(f['lote_id'] for f in filas)
+
+# Candado de pg_advisory_xact_lock que ordena las escrituras en la bitácora
+CANDADO_BITACORA = 0x63616d62
+
+def conexion_bitacora(session):
+    """Conexión de la sesión en el primario (la cláusula de escritura la saca de la réplica)"""
+    return session.connection(bind_arguments={'clause': insert(Cambio.__table__)})
+
+def bloquear_bitacora(conexion):
+    """
+    Toma, hasta el fin de la transacción, el candado de la bitácora antes de insertar en ella.
+
+    Así los ids de `cambios` quedan en el orden en que confirman las transacciones y
+    /api/sync puede avanzar el cursor sin saltarse una transacción que insertó antes pero
+    confirmó después. Solo en PostgreSQL: SQLite ya admite un único escritor a la vez.
+    """
+    if conexion.dialect.name == 'postgresql':
+        conexion.execute(select(func.pg_advisory_xact_lock(CANDADO_BITACORA)))
+
+@event.listens_for(Session, 'before_commit')
+def escribir_bitacora(session):
+    """Inserta al confirmar los cambios anotados en la transacción, con el candado tomado
+    lo más tarde posible para no frenar a los demás escritores."""
+    session.flush()  # El flush final del commit también anota cambios
+    filas = session.info.pop('cambios_pendientes', None)
+    if filas:
+        conexion = conexion_bitacora(session)
+        bloquear_bitacora(conexion)
+        conexion.execute(insert(Cambio.__table__), filas)
+
+def registrar_cambios_por_consulta(modelo, condicion, operacion='upsert', conexion=None):
+    """Anota con un único INSERT ... SELECT todas las filas de `modelo` que cumplen `condicion`
+    (por ejemplo, los hijos de un lote justo antes de borrarlos)."""
+    lote_col = modelo.id if modelo is Lote else (modelo.lote_id if hasattr(modelo, 'lote_id') else literal(None))
+    conexion = conexion if conexion is not None else conexion_bitacora(db.session)
+    bloquear_bitacora(conexion)
+    conexion.execute(
+        insert(Cambio.__table__).from_select(
+            ['entidad', 'entidad_id', 'lote_id', 'operacion', 'created_at'],
+            select(literal(ENTIDADES_SYNC[modelo]), modelo.id, lote_col, literal(operacion), literal(datetime.utcnow()))
+            .where(condicion)
+        )
+    )
+
+def marcar_lotes_modificados(lote_ids, session=None):
+    """Anota en la sesión los lotes tocados; al confirmar se descartan sus páginas y resúmenes públicos"""
+    session = session if session is not None else db.session
+    session.info.setdefault('lotes_modificados', set()).update(i for i in lote_ids if i is not None)
+
+@event.listens_for(Session, 'after_commit')
+def invalidar_publicos(session):
+    lote_ids = session.info.pop('lotes_modificados', None)
+    if lote_ids:
+        for lote_id in lote_ids:
+            cache_publico.invalidar(lote_id)
+        paginas_publicas.invalidar(lote_ids)
+
+@event.listens_for(Session, 'after_rollback')
+def descartar_lotes_modificados(session):
+    session.info.pop('lotes_modificados', None)
+    session.info.pop('cambios_pendientes', None)
+
+@event.listens_for(Session, 'after_flush')
+def marcar_usuarios_modificados(session, flush_context):
+    usuario_ids = {obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, Usuario)}
+    if usuario_ids:
+        session.info.setdefault('usuarios_modificados', set()).update(usuario_ids)
+
+@event.listens_for(Session, 'after_commit')
+def invalidar_usuarios(session):
+    for usuario_id in session.info.pop('usuarios_modificados', ()):
+        cache_usuarios.invalidar(usuario_id)
+
+@event.listens_for(Session, 'after_rollback')
+def descartar_usuarios_modificados(session):
+    session.info.pop('usuarios_modificados', None)
+
 # ============= FUNCIONES DE INICIALIZACIÓN =============
 
-def ensure_database_schema():
-    """Garantiza que existan columnas añadidas por migraciones simples."""
+# Migraciones versionadas: se aplican una vez por despliegue con `python migrar.py`.
+# Las versiones 2-6 reemplazan a los antiguos scripts migrate_*.py.
+migraciones = RegistroMigraciones()
+
+@migraciones.migracion(1, 'Esquema base y usuario administrador')
+def _m001_esquema_base(conn):
+    db.metadata.create_all(conn)
+    usuarios = Usuario.__table__
+    if conn.execute(select(usuarios.c.id).where(usuarios.c.username == 'admin')).first() is None:
+        conn.execute(insert(usuarios).values(
+            username='admin',
+            password_hash=generate_password_hash('admin123'),
+            nombre_completo='Administrador',
+            email='admin@granja.com',
+            rol='admin',
+            created_at=datetime.utcnow()
+        ))
+        log.info("Usuario administrador creado: admin / admin123")
+
+@migraciones.migracion(2, 'registros_diarios.humedad')
+def _m002_humedad(conn):
+    agregar_columna(conn, RegistroDiario.__table__.c.humedad)
+
+@migraciones.migracion(3, 'lotes.dias_ciclo')
+def _m003_dias_ciclo(conn):
+    if agregar_columna(conn, Lote.__table__.c.dias_ciclo, default=42):
+        conn.execute(update(Lote.__table__).where(Lote.__table__.c.dias_ciclo.is_(None)).values(dias_ciclo=42))
+
+@migraciones.migracion(4, 'sanidad.via_administracion y sanidad.retiro_dias')
+def _m004_sanidad_via_retiro(conn):
+    agregar_columna(conn, Sanidad.__table__.c.via_administracion)
+    agregar_columna(conn, Sanidad.__table__.c.retiro_dias)
+
+@migraciones.migracion(5, 'sanidad.enfermedad_id')
+def _m005_sanidad_enfermedad(conn):
+    agregar_columna(conn, Sanidad.__table__.c.enfermedad_id)
+
+@migraciones.migracion(6, 'configuracion.peso_tolerancia_pct')
+def _m006_peso_tolerancia(conn):
+    agregar_columna(conn, Configuracion.__table__.c.peso_tolerancia_pct, default=5.0)
+
+@migraciones.migracion(7, 'Índices compuestos (lote_id, fecha) y (estado, fecha_inicio)')
+def _m007_indices(conn):
+    creados = crear_indices_faltantes(conn, db.metadata)
+    if creados:
+        log.info('Índices creados: %s', ', '.join(creados))
+
+@migraciones.migracion(8, 'Bitácora de cambios inicial para /api/sync')
+def _m008_sembrar_bitacora(conn):
+    # Registra como 'upsert' las filas existentes para que /api/sync?since=0 entregue una réplica completa
+    if conn.execute(select(Cambio.id).limit(1)).first() is None:
+        for modelo in ENTIDADES_SYNC:
+            registrar_cambios_por_consulta(modelo, true(), conexion=conn)
+
+@migraciones.migracion(9, 'Tabla lotes_archivados (archivo frío de lotes finalizados)')
+def _m009_lotes_archivados(conn):
+    LoteArchivado.__table__.create(conn, checkfirst=True)
+
+@migraciones.migracion(10, 'Particionado anual de registros_diarios (solo PostgreSQL)')
+def _m010_particionar(conn):
+    if conn.dialect.name != 'postgresql':
+        return
+    for tabla, columna in tablas_particionables(db.metadata):
+        if particionar_tabla(conn, tabla, columna, anios_adelante=app.config['PARTICIONES_ANIOS_ADELANTE']):
+            log.info("Tabla %s particionada por año de %s", tabla.name, columna)
+
+@migraciones.migracion(11, 'ON DELETE CASCADE en las tablas hijas de lotes')
+def _m011_borrado_en_cascada(conn):
+    for modelo in (RegistroDiario, Costo, Ingreso, Sanidad, LoteArchivado):
+        if sincronizar_claves_foraneas(conn, modelo.__table__):
+            log.info("Claves foráneas de %s con ON DELETE CASCADE", modelo.__tablename__)
+
+@migraciones.migracion(12, 'Índice (entidad, entidad_id) de la bitácora para podarla')
+def _m012_indice_bitacora(conn):
+    crear_indices_faltantes(conn, db.metadata)
+
+def aplicar_migraciones():
+    """Aplica las migraciones pendientes. Devuelve la lista de migraciones aplicadas."""
+    with app.app_context():
+        return migraciones.aplicar(db.engine, log=log)
+
+def mantener_particiones():
+    """Crea por adelantado las particiones anuales que falten (PostgreSQL). Se ejecuta en cada despliegue."""
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            return []
+        creadas = []
+        with db.engine.begin() as conn:
+            conn.execute(text('SET LOCAL statement_timeout = 0'))
+            for tabla, columna in tablas_particionables(db.metadata):
+                creadas += asegurar_particiones(conn, tabla.name, columna, app.config['PARTICIONES_ANIOS_ADELANTE'])
+        if creadas:
+            log.info("Particiones creadas: %s", ', '.join(creadas))
+        return creadas
+
+def preparar_esquema():
+    """Al arrancar un worker: solo consulta la versión del esquema (sin reflexión).
+    Con MIGRAR_AL_INICIAR (desarrollo) aplica además lo pendiente."""
     try:
         with app.app_context():
-            engine = db.engine
-            inspector = inspect(engine)
-            tables = set(inspector.get_table_names())
-
-            if 'sanidad' in tables:
-                sanidad_cols = {col['name'] for col in inspector.get_columns('sanidad')}
-                missing_statements = []
-
-                if 'via_administracion' not in sanidad_cols:
-                    missing_statements.append(('via_administracion', "ALTER TABLE sanidad ADD COLUMN via_administracion TEXT"))
-                if 'retiro_dias' not in sanidad_cols:
-                    missing_statements.append(('retiro_dias', "ALTER TABLE sanidad ADD COLUMN retiro_dias INTEGER"))
-                if 'enfermedad_id' not in sanidad_cols:
-                    missing_statements.append(('enfermedad_id', "ALTER TABLE sanidad ADD COLUMN enfermedad_id INTEGER"))
-
-                if missing_statements:
-                    with engine.begin() as conn:
-                        for _, stmt in missing_statements:
-                            conn.execute(text(stmt))
-                    added = ', '.join(name for name, _ in missing_statements)
-                    print(f'✅ Columnas faltantes agregadas a sanidad: {added}')
+            actual = migraciones.version_actual(db.engine)
+        if actual >= migraciones.ultima_version:
+            return
+        if app.config['MIGRAR_AL_INICIAR']:
+            aplicar_migraciones()
+        else:
+            log.warning("Esquema en versión %s de %s; aplicar con: python backend/migrar.py",
+                        actual, migraciones.ultima_version)
     except Exception as exc:
         # Registrar el problema pero no bloquear el arranque del backend
-        print(f"⚠️  No se pudieron aplicar migraciones automáticas: {exc}")
+        log.warning("No se pudieron aplicar migraciones automáticas: %s", exc)
 
 
 def ensure_app_dirs():
@@ -211,6 +609,8 @@ def ensure_app_dirs():
             os.path.join(data_dir, 'uploads'),
             os.path.join(data_dir, 'exports'),
             os.path.join(data_dir, 'backups'),
+            os.path.join(data_dir, 'spool'),
+            os.path.join(data_dir, 'publico'),
         ]
         for p in paths:
             os.makedirs(p, exist_ok=True)
@@ -218,31 +618,14 @@ def ensure_app_dirs():
         app.config.setdefault('UPLOAD_FOLDER', paths[0])
         app.config.setdefault('EXPORT_FOLDER', paths[1])
         app.config.setdefault('BACKUP_FOLDER', paths[2])
+        app.config.setdefault('SPOOL_FOLDER', paths[3])
+        app.config.setdefault('PUBLICO_FOLDER', paths[4])
     except Exception as exc:
-        print(f"⚠️  No se pudieron crear directorios de trabajo: {exc}")
-
-def bootstrap_database():
-    try:
-        with app.app_context():
-            db.create_all()
-            if not Usuario.query.filter_by(username='admin').first():
-                admin = Usuario(
-                    username='admin',
-                    password_hash=generate_password_hash('admin123'),
-                    nombre_completo='Administrador',
-                    email='admin@granja.com',
-                    rol='admin'
-                )
-                db.session.add(admin)
-                db.session.commit()
-                print("✅ Usuario administrador creado: admin / admin123")
-    except Exception as exc:
-        print(f"⚠️  Bootstrap de base de datos falló: {exc}")
+        log.warning("No se pudieron crear directorios de trabajo: %s", exc)
 
 # Inicializar todo
-ensure_database_schema()
+preparar_esquema()
 ensure_app_dirs()
-bootstrap_database()
 
 @app.route('/api/ping', methods=['GET'])
 def ping():
@@ -262,6 +645,27 @@ def favicon():
 
 # ============= DECORADORES =============
 
+# Lo que los endpoints reciben como current_user: una copia de solo lectura del usuario,
+# no la fila de la sesión, para poder guardarla entre peticiones
+UsuarioAutenticado = namedtuple('UsuarioAutenticado', 'id username nombre_completo rol')
+
+# Usuarios ya autenticados por id. Se descartan al confirmar un cambio del usuario en este
+# proceso; AUTH_CACHE_SEG acota lo que tarda en notarse un cambio hecho desde otro proceso.
+cache_usuarios = CacheTTL(app.config['AUTH_CACHE_SEG'])
+
+def usuario_autenticado(usuario_id):
+    """UsuarioAutenticado del id del token, de la caché o de la base; None si ya no existe"""
+    usuario = cache_usuarios.obtener(usuario_id)
+    if usuario is None:
+        fila = db.session.execute(
+            select(Usuario.id, Usuario.username, Usuario.nombre_completo, Usuario.rol).where(Usuario.id == usuario_id)
+        ).first()
+        if fila is None:
+            return None
+        usuario = UsuarioAutenticado(*fila)
+        cache_usuarios.guardar(usuario_id, usuario)
+    return usuario
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -273,7 +677,8 @@ def token_required(f):
             if token.startswith('Bearer '):
                 token = token[7:]
             data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = Usuario.query.get(data['user_id'])
+            g.usuario_id = data['user_id']
+            current_user = usuario_autenticado(data['user_id'])
             if not current_user:
                 return jsonify({'mensaje': 'Usuario no encontrado'}), 401
         except jwt.ExpiredSignatureError:
@@ -288,20 +693,104 @@ def token_required(f):
 
 # ============= SERVICIOS DE CÁLCULO =============
 
-def calcular_estadisticas(lote):
-    """Calcula todas las estadísticas del lote"""
+def totales_estadisticas(lote_ids):
+    """
+    Totales que necesita calcular_estadisticas para varios lotes, agregados en
+    la base (GROUP BY): tres consultas en total, sin cargar registros, costos
+    ni ingresos en memoria.
+
+    {lote_id: {alimento, agua, mortalidad, peso, costos, ingresos}}; `peso`
+    es el último peso promedio registrado (None si no hay ninguno).
+    """
+    totales = {lid: {'alimento': 0, 'agua': 0, 'mortalidad': 0, 'peso': None, 'costos': 0, 'ingresos': 0}
+               for lid in lote_ids}
+    if not totales:
+        return totales
+
+    con_peso = aliased(RegistroDiario)
+    ultimo_peso = (
+        select(con_peso.peso_promedio)
+        .where(con_peso.lote_id == RegistroDiario.lote_id,
+               con_peso.peso_promedio.isnot(None), con_peso.peso_promedio != 0)
+        .order_by(con_peso.fecha.desc(), con_peso.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    registros = db.session.execute(
+        select(RegistroDiario.lote_id, func.sum(RegistroDiario.alimento_kg), func.sum(RegistroDiario.agua_litros),
+               func.sum(RegistroDiario.mortalidad), ultimo_peso)
+        .where(RegistroDiario.lote_id.in_(totales.keys()))
+        .group_by(RegistroDiario.lote_id)
+    )
+    for lote_id, alimento, agua, mortalidad, peso in registros:
+        totales[lote_id].update(alimento=alimento or 0, agua=agua or 0, mortalidad=mortalidad or 0, peso=peso)
+
+    costos = db.session.execute(
+        select(Costo.lote_id, func.sum(Costo.monto)).where(Costo.lote_id.in_(totales.keys())).group_by(Costo.lote_id)
+    )
+    for lote_id, monto in costos:
+        totales[lote_id]['costos'] = monto or 0
+
+    ingresos = db.session.execute(
+        select(Ingreso.lote_id, func.sum(Ingreso.total)).where(Ingreso.lote_id.in_(totales.keys())).group_by(Ingreso.lote_id)
+    )
+    for lote_id, total in ingresos:
+        totales[lote_id]['ingresos'] = total or 0
+    return totales
+
+def lotes_archivados_entre(lote_ids):
+    """Ids de `lote_ids` que están archivados, en una consulta (sin leer el detalle comprimido)"""
+    lote_ids = list(lote_ids)
+    if not lote_ids:
+        return set()
+    return set(db.session.scalars(select(LoteArchivado.lote_id).where(LoteArchivado.lote_id.in_(lote_ids))))
+
+def respuesta_lote_archivado(lote_id):
+    return jsonify({'mensaje': f'El lote {lote_id} está archivado: restáurelo antes de modificarlo',
+                    'archivado': True}), 409
+
+def estadisticas_archivadas(lotes):
+    """{lote_id: estadísticas congeladas} de los lotes finalizados de `lotes` que están archivados"""
+    ids = [l.id for l in lotes if l.estado == 'finalizado']
+    if not ids:
+        return {}
+    filas = db.session.execute(
+        select(LoteArchivado.lote_id, LoteArchivado.resumen).where(LoteArchivado.lote_id.in_(ids))
+    )
+    return {lote_id: json.loads(resumen)['estadisticas'] for lote_id, resumen in filas}
+
+def estadisticas_lotes(lotes):
+    """{lote_id: estadísticas} de varios lotes: los resúmenes archivados en una
+    consulta y los totales del resto en tres (totales_estadisticas)"""
+    lotes = list(lotes)
+    archivadas = estadisticas_archivadas(lotes)
+    totales = totales_estadisticas([l.id for l in lotes if l.id not in archivadas])
+    return {l.id: calcular_estadisticas(l, archivadas, totales) for l in lotes}
+
+def calcular_estadisticas(lote, archivadas=None, totales=None):
+    """Calcula todas las estadísticas del lote. `archivadas` y `totales` son los
+    resultados de estadisticas_archivadas y totales_estadisticas para varios
+    lotes; sin ellos se consultan los del lote."""
+    if lote.estado == 'finalizado':
+        if archivadas is None:
+            archivadas = estadisticas_archivadas([lote])
+        if lote.id in archivadas:
+            # Lote archivado: su detalle ya no está en las tablas calientes
+            return dict(archivadas[lote.id])
     try:
+        if totales is None:
+            totales = totales_estadisticas([lote.id])
+        t = totales[lote.id]
         dias_transcurridos = (datetime.now().date() - lote.fecha_inicio).days
         
         # Totales básicos
-        total_alimento = sum(r.alimento_kg or 0 for r in lote.registros)
-        total_mortalidad = sum(r.mortalidad or 0 for r in lote.registros)
-        total_agua = sum(r.agua_litros or 0 for r in lote.registros)
+        total_alimento = t['alimento']
+        total_mortalidad = t['mortalidad']
+        total_agua = t['agua']
         
         # Peso
-        registros_con_peso = sorted([r for r in lote.registros if r.peso_promedio], key=lambda x: x.fecha)
         peso_inicial = lote.peso_inicial if lote.peso_inicial else 40
-        peso_actual = registros_con_peso[-1].peso_promedio if registros_con_peso else peso_inicial
+        peso_actual = t['peso'] if t['peso'] else peso_inicial
         
         # Cantidad actual
         cantidad_actual = max(0, lote.cantidad_inicial - total_mortalidad)
@@ -320,8 +809,8 @@ def calcular_estadisticas(lote):
         mortalidad_porcentaje = (total_mortalidad / lote.cantidad_inicial * 100) if lote.cantidad_inicial > 0 else 0
         
         # Economía
-        total_costos = sum(c.monto for c in lote.costos)
-        total_ingresos = sum(i.total for i in lote.ingresos)
+        total_costos = t['costos']
+        total_ingresos = t['ingresos']
         ganancia = total_ingresos - total_costos
         
         # Costo por kg
@@ -359,10 +848,8 @@ def calcular_estadisticas(lote):
             'consumo_por_ave': round(consumo_por_ave, 2),
             'agua_alimento': round(agua_alimento, 2)
         }
-    except Exception as e:
-        print(f"Error en calcular_estadisticas para lote {lote.id}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error en calcular_estadisticas para lote %s", lote.id)
         # Retornar valores por defecto en caso de error
         return {
             'dias_transcurridos': 0,
@@ -406,6 +893,324 @@ def get_configuracion_valores():
         'peso_tolerancia_pct': cfg.peso_tolerancia_pct if cfg else 5.0,
     }
 
+def ultimos_registros(lote_ids):
+    """Último RegistroDiario de cada lote de `lote_ids` en una sola consulta: {lote_id: registro}"""
+    # (lote_id, fecha) es único
+    ultimas_fechas = (
+        select(RegistroDiario.lote_id, func.max(RegistroDiario.fecha).label('fecha'))
+        .where(RegistroDiario.lote_id.in_(lote_ids))
+        .group_by(RegistroDiario.lote_id)
+        .subquery()
+    )
+    return {
+        r.lote_id: r for r in RegistroDiario.query.join(
+            ultimas_fechas,
+            (RegistroDiario.lote_id == ultimas_fechas.c.lote_id) & (RegistroDiario.fecha == ultimas_fechas.c.fecha)
+        )
+    }
+
+def evaluar_alertas(lote, stats, ultimo, cfg):
+    """Alertas de un lote a partir de su último registro; las fórmulas están documentadas en get_alertas()"""
+    alertas = []
+    if not ultimo:
+        return alertas
+
+    # ALERTA 1: Temperatura fuera de rango
+    if ultimo.temperatura_promedio is not None and ultimo.temperatura_promedio > 0:
+        temp_ideal = (cfg['temp_min'] + cfg['temp_max']) / 2
+        desviacion = abs(ultimo.temperatura_promedio - temp_ideal)
+
+        if ultimo.temperatura_promedio < cfg['temp_min'] or ultimo.temperatura_promedio > cfg['temp_max']:
+            alertas.append({
+                'tipo': 'ADVERTENCIA',
+                'categoria': 'TEMPERATURA',
+                'mensaje': f"Temperatura fuera de rango: {ultimo.temperatura_promedio}°C (ideal {cfg['temp_min']}-{cfg['temp_max']}°C)",
+                'valor': ultimo.temperatura_promedio,
+                'prioridad': 'alta' if desviacion > 3 else 'media'
+            })
+
+    # ALERTA 2: Humedad fuera de rango
+    if ultimo.humedad is not None and ultimo.humedad > 0:
+        humedad_ideal = (cfg['humedad_min'] + cfg['humedad_max']) / 2
+        desviacion = abs(ultimo.humedad - humedad_ideal)
+
+        if ultimo.humedad < cfg['humedad_min'] or ultimo.humedad > cfg['humedad_max']:
+            alertas.append({
+                'tipo': 'ADVERTENCIA',
+                'categoria': 'HUMEDAD',
+                'mensaje': f"Humedad fuera de rango: {ultimo.humedad}% (ideal {cfg['humedad_min']}-{cfg['humedad_max']}%)",
+                'valor': ultimo.humedad,
+                'prioridad': 'alta' if desviacion > 10 else 'media'
+            })
+
+    # ALERTA 3: Consumo por ave bajo (solo si hay registro de alimento)
+    if ultimo.alimento_kg is not None and ultimo.alimento_kg > 0:
+        cantidad_actual = stats['cantidad_actual'] or lote.cantidad_inicial
+        if cantidad_actual > 0:
+            # Fórmula: gramos por ave por día = (kg de alimento * 1000) / número de aves
+            consumo_g_dia = (ultimo.alimento_kg * 1000) / cantidad_actual
+
+            if consumo_g_dia < cfg['consumo_min_g_dia']:
+                alertas.append({
+                    'tipo': 'ADVERTENCIA',
+                    'categoria': 'CONSUMO',
+                    'mensaje': f"Consumo bajo: {round(consumo_g_dia,1)} g/ave/día (mín {cfg['consumo_min_g_dia']} g)",
+                    'valor': round(consumo_g_dia, 1),
+                    'prioridad': 'media'
+                })
+
+    # ALERTA 4: Mortalidad diaria alta (solo si hay mortalidad registrada)
+    if ultimo.mortalidad is not None and ultimo.mortalidad > 0:
+        # Usamos cantidad_actual como base para el cálculo
+        # Nota: Idealmente debería ser la cantidad ANTES de ese día, pero cantidad_actual es aproximación
+        cantidad_base = stats['cantidad_actual'] or lote.cantidad_inicial
+
+        if cantidad_base > 0:
+            # Fórmula: % mortalidad diaria = (aves muertas ese día / aves vivas) * 100
+            pct_mortalidad_diaria = (ultimo.mortalidad / cantidad_base) * 100
+
+            # Solo alertar si supera el umbral configurado
+            if pct_mortalidad_diaria > cfg['mortalidad_diaria_max_pct']:
+                es_critico = pct_mortalidad_diaria > (cfg['mortalidad_diaria_max_pct'] * 2)
+
+                alertas.append({
+                    'tipo': 'CRÍTICO' if es_critico else 'ADVERTENCIA',
+                    'categoria': 'MORTALIDAD',
+                    'mensaje': f"Mortalidad diaria alta: {round(pct_mortalidad_diaria,2)}% (máx {cfg['mortalidad_diaria_max_pct']}%) - {ultimo.mortalidad} aves el {ultimo.fecha.strftime('%d/%m')}",
+                    'valor': round(pct_mortalidad_diaria, 2),
+                    'prioridad': 'alta' if es_critico else 'media'
+                })
+
+    return alertas
+
+# ============= SERVICIOS - CANTIDAD ACTUAL DE AVES =============
+
+def _acotar_cantidad(expr, maximo=None):
+    """Expresión SQL equivalente a max(0, expr) (y opcionalmente min(maximo, ...)), válida en SQLite y PostgreSQL."""
+    casos = [(expr < 0, 0)]
+    if maximo is not None:
+        casos.append((expr > maximo, maximo))
+    return case(*casos, else_=expr)
+
+def ajustar_cantidad_actual(lote_id, delta_mortalidad):
+    """Descuenta aves de Lote.cantidad_actual (o las devuelve si el delta es negativo)
+    con un único UPDATE atómico, sin leer el lote en Python. Se acota a [0, cantidad_inicial]."""
+    if not delta_mortalidad:
+        return
+    nueva = func.coalesce(Lote.cantidad_actual, Lote.cantidad_inicial) - delta_mortalidad
+    db.session.execute(
+        update(Lote)
+        .where(Lote.id == lote_id)
+        .values(cantidad_actual=_acotar_cantidad(nueva, Lote.cantidad_inicial), updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    registrar_cambios(Lote, [(lote_id, lote_id)])
+
+def reconciliar_cantidad_actual(corregir=False):
+    """Verifica cantidad_actual contra cantidad_inicial - SUM(mortalidad) de todos los lotes
+    en una sola consulta. Con corregir=True reescribe los descuadres en un único UPDATE."""
+    mortalidad = (
+        db.session.query(RegistroDiario.lote_id, func.sum(RegistroDiario.mortalidad).label('total'))
+        .group_by(RegistroDiario.lote_id)
+        .subquery()
+    )
+    filas = (
+        db.session.query(Lote.id, Lote.nombre, Lote.cantidad_inicial, Lote.cantidad_actual,
+                         func.coalesce(mortalidad.c.total, 0))
+        .outerjoin(mortalidad, mortalidad.c.lote_id == Lote.id)
+        .all()
+    )
+
+    descuadres = []
+    for lote_id, nombre, inicial, actual, total_mortalidad in filas:
+        esperada = max(0, inicial - total_mortalidad)
+        if actual != esperada:
+            descuadres.append({
+                'lote_id': lote_id,
+                'nombre': nombre,
+                'cantidad_actual': actual,
+                'cantidad_esperada': esperada,
+                'total_mortalidad': total_mortalidad
+            })
+
+    if corregir and descuadres:
+        total = (
+            select(func.coalesce(func.sum(RegistroDiario.mortalidad), 0))
+            .where(RegistroDiario.lote_id == Lote.id)
+            .scalar_subquery()
+        )
+        db.session.execute(
+            update(Lote)
+            .where(Lote.id.in_([d['lote_id'] for d in descuadres]))
+            .values(cantidad_actual=_acotar_cantidad(Lote.cantidad_inicial - total))
+            .execution_options(synchronize_session=False)
+        )
+        registrar_cambios(Lote, [(d['lote_id'], d['lote_id']) for d in descuadres])
+        db.session.commit()
+        log.warning("Reconciliación de cantidad_actual corrigió %s lotes", len(descuadres))
+
+    return {
+        'lotes_revisados': len(filas),
+        'descuadres': descuadres,
+        'corregidos': len(descuadres) if corregir else 0
+    }
+
+# ============= SERIALIZACIÓN =============
+
+def _dias_ciclo(l):
+    return l.dias_ciclo or 42
+
+def _dias_transcurridos(l):
+    return (datetime.now().date() - l.fecha_inicio).days
+
+# Campo serializado -> (columnas de Lote que lee, valor). Con ?fields= solo se cargan esas columnas.
+CAMPOS_LOTE = {
+    'id': (('id',), lambda l: l.id),
+    'nombre': (('nombre',), lambda l: l.nombre),
+    'fecha_inicio': (('fecha_inicio',), lambda l: l.fecha_inicio),
+    'fecha_fin': (('fecha_fin',), lambda l: l.fecha_fin),
+    'cantidad_inicial': (('cantidad_inicial',), lambda l: l.cantidad_inicial),
+    'cantidad_actual': (('cantidad_actual', 'cantidad_inicial'), lambda l: l.cantidad_actual or l.cantidad_inicial),
+    'estado': (('estado',), lambda l: l.estado),
+    'genetica': (('genetica',), lambda l: l.genetica),
+    'proveedor': (('proveedor',), lambda l: l.proveedor),
+    'peso_inicial': (('peso_inicial',), lambda l: l.peso_inicial),
+    'galpon': (('galpon',), lambda l: l.galpon),
+    'dias_ciclo': (('dias_ciclo',), _dias_ciclo),
+    'dias_transcurridos': (('fecha_inicio',), _dias_transcurridos),
+    'dias_restantes': (('fecha_inicio', 'dias_ciclo'), lambda l: _dias_ciclo(l) - _dias_transcurridos(l)),
+    'fecha_sacrificio': (('fecha_inicio', 'dias_ciclo'), lambda l: l.fecha_inicio + timedelta(days=_dias_ciclo(l))),
+}
+
+def serializar_lote(l, campos=None):
+    """Todos los campos del lote, o solo `campos` (claves de CAMPOS_LOTE) sin tocar columnas no cargadas"""
+    return {campo: CAMPOS_LOTE[campo][1](l) for campo in (campos or CAMPOS_LOTE)}
+
+def serializar_registro(r):
+    return {
+        'id': r.id,
+        'lote_id': r.lote_id,
+        'fecha': r.fecha,
+        'alimento_kg': r.alimento_kg,
+        'agua_litros': r.agua_litros,
+        'mortalidad': r.mortalidad,
+        'causa_mortalidad': r.causa_mortalidad,
+        'peso_promedio': r.peso_promedio,
+        'temperatura_promedio': r.temperatura_promedio,
+        'humedad': r.humedad,
+        'observaciones': r.observaciones
+    }
+
+def serializar_costo(c):
+    return {
+        'id': c.id,
+        'lote_id': c.lote_id,
+        'categoria': c.categoria,
+        'concepto': c.concepto,
+        'monto': c.monto,
+        'fecha': c.fecha,
+        'observaciones': c.observaciones
+    }
+
+def serializar_ingreso(i):
+    return {
+        'id': i.id,
+        'lote_id': i.lote_id,
+        'cantidad_vendida': i.cantidad_vendida,
+        'peso_promedio': i.peso_promedio,
+        'precio_por_kg': i.precio_por_kg,
+        'total': i.total,
+        'fecha': i.fecha,
+        'cliente': i.cliente,
+        'observaciones': i.observaciones
+    }
+
+def serializar_sanidad(s):
+    return {
+        'id': s.id,
+        'lote_id': s.lote_id,
+        'tipo': s.tipo,
+        'producto': s.producto,
+        'dosis': s.dosis,
+        'fecha': s.fecha,
+        'edad_dias': s.edad_dias,
+        'via_administracion': s.via_administracion,
+        'retiro_dias': s.retiro_dias,
+        'enfermedad_id': s.enfermedad_id,
+        'enfermedad_nombre': s.enfermedad.nombre if s.enfermedad_id and s.enfermedad else None,
+        'observaciones': s.observaciones
+    }
+
+def serializar_enfermedad(e):
+    return {
+        'id': e.id,
+        'nombre': e.nombre,
+        'sintomas': e.sintomas,
+        'prevencion': e.prevencion,
+        'tratamiento': e.tratamiento,
+        'medicamentos': e.medicamentos
+    }
+
+# ============= LISTADOS PAGINADOS =============
+
+def filtro_fechas(columna):
+    """Condiciones de los parámetros desde/hasta (YYYY-MM-DD, inclusivos) sobre `columna`.
+    Lanza ValueError si alguna fecha no es válida."""
+    condiciones = []
+    for parametro, comparar in (('desde', columna.__ge__), ('hasta', columna.__le__)):
+        valor = request.args.get(parametro)
+        if valor:
+            try:
+                condiciones.append(comparar(date.fromisoformat(valor)))
+            except ValueError:
+                raise ValueError(f'{parametro} debe tener formato YYYY-MM-DD')
+    return condiciones
+
+def responder_listado(consulta, columnas, serializar, descendente=True, preparar=None, lote_id=None):
+    """
+    Respuesta de un listado ya filtrado.
+
+    Sin `limit` ni `cursor` devuelve la lista completa, como siempre. Con
+    ellos devuelve una página: {datos, cursor, hay_mas} y, si se pide
+    `total=true`, el total de filas que cumplen los filtros. La página
+    siguiente se pide con el mismo filtro y el `cursor` recibido.
+    `preparar(filas)` se llama una vez con las filas antes de serializarlas
+    (para cargar en lote lo que necesite `serializar`).
+
+    Con `lote_id`, si la primera página sale vacía porque el lote está
+    archivado (su detalle ya no está en las tablas calientes) se indica con
+    la cabecera X-Lote-Archivado y, en modo paginado, `archivado: true`.
+    """
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        orden = [c.desc() if descendente else c.asc() for c in columnas]
+        filas = consulta.order_by(*orden).all()
+        if preparar:
+            preparar(filas)
+        respuesta = jsonify([serializar(x) for x in filas])
+        if not filas and lote_id is not None and lotes_archivados_entre([lote_id]):
+            respuesta.headers['X-Lote-Archivado'] = 'true'
+        return respuesta
+
+    limite = min(max(request.args.get('limit', app.config['PAGINA_POR_DEFECTO'], type=int), 1),
+                 app.config['PAGINA_MAX'])
+    try:
+        filas, siguiente = paginar(consulta, columnas, limite, request.args.get('cursor'), descendente)
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 400
+    if preparar:
+        preparar(filas)
+    respuesta = {'datos': [serializar(x) for x in filas], 'cursor': siguiente, 'hay_mas': siguiente is not None}
+    if request.args.get('total', '').lower() in ('1', 'true'):
+        respuesta['total'] = consulta.order_by(None).count()
+    archivado = (not filas and lote_id is not None and not request.args.get('cursor')
+                 and lotes_archivados_entre([lote_id]))
+    if archivado:
+        respuesta['archivado'] = True
+    respuesta = jsonify(respuesta)
+    if archivado:
+        respuesta.headers['X-Lote-Archivado'] = 'true'
+    return respuesta
+
 # ============= RUTAS - AUTENTICACIÓN =============
 
 @app.route('/api/auth/login', methods=['POST'])
@@ -467,56 +1272,76 @@ def register():
 
 # ============= RUTAS - LOTES =============
 
+# Columnas que leen calcular_estadisticas y evaluar_alertas además de las relaciones precargadas
+COLUMNAS_ESTADISTICAS = ('id', 'estado', 'fecha_inicio', 'cantidad_inicial', 'peso_inicial')
+INCLUSIONES_LOTE = ('stats', 'alertas')
+
+def parametro_lista(nombre, permitidos):
+    """Valores de un parámetro separado por comas (?fields=a,b); ValueError si alguno no está en `permitidos`"""
+    valores = [v.strip() for v in request.args.get(nombre, '').split(',') if v.strip()]
+    desconocidos = [v for v in valores if v not in permitidos]
+    if desconocidos:
+        raise ValueError(f"{nombre} no admite: {', '.join(desconocidos)} (válidos: {', '.join(permitidos)})")
+    return list(dict.fromkeys(valores))
+
 @app.route('/api/lotes', methods=['GET'])
+@presupuesto_consultas(8)  # 3 base; include=stats +3 (registros, costos, ingresos); alertas +2; +1 con total=true
 @token_required
 def get_lotes(current_user):
+    """
+    Filtros: estado, desde/hasta (fecha_inicio). Paginación: limit, cursor, total.
+    Proyección: fields=id,nombre,... (solo esas columnas se leen de la base).
+    include=stats,alertas agrega `estadisticas` y `alertas` de cada lote con
+    consultas por lote de página, no por lote (reemplaza 1+N llamadas).
+    """
     try:
-        lotes = Lote.query.order_by(Lote.fecha_inicio.desc()).all()
-        return jsonify([{
-            'id': l.id,
-            'nombre': l.nombre,
-            'fecha_inicio': l.fecha_inicio.isoformat(),
-            'fecha_fin': l.fecha_fin.isoformat() if l.fecha_fin else None,
-            'cantidad_inicial': l.cantidad_inicial,
-            'cantidad_actual': l.cantidad_actual or l.cantidad_inicial,
-            'estado': l.estado,
-            'genetica': l.genetica,
-            'proveedor': l.proveedor,
-            'galpon': l.galpon,
-            'dias_ciclo': l.dias_ciclo or 42,
-            'dias_transcurridos': (datetime.now().date() - l.fecha_inicio).days,
-            'dias_restantes': (l.dias_ciclo or 42) - (datetime.now().date() - l.fecha_inicio).days,
-            'fecha_sacrificio': (l.fecha_inicio + timedelta(days=l.dias_ciclo or 42)).isoformat()
-        } for l in lotes])
+        campos = parametro_lista('fields', list(CAMPOS_LOTE))
+        incluir = parametro_lista('include', INCLUSIONES_LOTE)
+
+        consulta = Lote.query.filter(*filtro_fechas(Lote.fecha_inicio))
+        if request.args.get('estado'):
+            consulta = consulta.filter(Lote.estado == request.args['estado'])
+        if campos:
+            # Las columnas del cursor siempre se cargan
+            columnas = {'id', 'fecha_inicio'}.union(*(CAMPOS_LOTE[c][0] for c in campos))
+            if incluir:
+                columnas.update(COLUMNAS_ESTADISTICAS)
+            consulta = consulta.options(load_only(*(getattr(Lote, c) for c in sorted(columnas))))
+        if not incluir:
+            return responder_listado(consulta, (Lote.fecha_inicio, Lote.id), lambda l: serializar_lote(l, campos))
+
+        # Antes de cargar los lotes: si crea la configuración, su commit expiraría lo cargado
+        contexto = {'ultimos': {}, 'estadisticas': {}, 'cfg': get_configuracion_valores() if 'alertas' in incluir else None}
+
+        def preparar(lotes):
+            contexto['estadisticas'] = estadisticas_lotes(lotes)
+            if 'alertas' in incluir and lotes:
+                contexto['ultimos'] = ultimos_registros([l.id for l in lotes])
+
+        def serializar(lote):
+            datos = serializar_lote(lote, campos)
+            stats = contexto['estadisticas'][lote.id]
+            if 'stats' in incluir:
+                datos['estadisticas'] = stats
+            if 'alertas' in incluir:
+                datos['alertas'] = evaluar_alertas(lote, stats, contexto['ultimos'].get(lote.id), contexto['cfg'])
+            return datos
+
+        return responder_listado(consulta, (Lote.fecha_inicio, Lote.id), serializar, preparar=preparar)
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 400
     except Exception as e:
         return jsonify({'mensaje': f'Error al obtener lotes: {str(e)}'}), 500
 
 @app.route('/api/lotes/<int:id>', methods=['GET'])
+@presupuesto_consultas(2)
 @token_required
 def get_lote(current_user, id):
     try:
         lote = Lote.query.get_or_404(id)
-        return jsonify({
-            'id': lote.id,
-            'nombre': lote.nombre,
-            'fecha_inicio': lote.fecha_inicio.isoformat(),
-            'fecha_fin': lote.fecha_fin.isoformat() if lote.fecha_fin else None,
-            'cantidad_inicial': lote.cantidad_inicial,
-            'cantidad_actual': lote.cantidad_actual or lote.cantidad_inicial,
-            'genetica': lote.genetica,
-            'proveedor': lote.proveedor,
-            'peso_inicial': lote.peso_inicial,
-            'galpon': lote.galpon,
-            'estado': lote.estado,
-            'dias_ciclo': lote.dias_ciclo or 42,
-            'dias_transcurridos': (datetime.now().date() - lote.fecha_inicio).days,
-            'dias_restantes': (lote.dias_ciclo or 42) - (datetime.now().date() - lote.fecha_inicio).days,
-            'fecha_sacrificio': (lote.fecha_inicio + timedelta(days=lote.dias_ciclo or 42)).isoformat()
-        })
+        return jsonify(serializar_lote(lote))
     except Exception as e:
-        print(f"Error al obtener lote {id}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error al obtener lote %s", id)
         return jsonify({'mensaje': f'Error al obtener lote: {str(e)}'}), 500
 
 @app.route('/api/lotes', methods=['POST'])
@@ -553,10 +1378,11 @@ def crear_lote(current_user):
 def actualizar_lote(current_user, id):
     try:
         lote = Lote.query.get_or_404(id)
+        if lotes_archivados_entre([id]):
+            return respuesta_lote_archivado(id)
         data = request.get_json()
         
-        print(f"🔍 DEBUG - Actualizando lote {id}")
-        print(f"🔍 DEBUG - Datos recibidos: {data}")
+        log.debug("Actualizando lote %s con datos %s", id, data, extra={'muestrear': True})
         
         # Actualizar campos básicos
         if data.get('nombre'):
@@ -571,20 +1397,20 @@ def actualizar_lote(current_user, id):
         if data.get('cantidad_inicial'):
             try:
                 nueva_cantidad_inicial = int(data['cantidad_inicial'])
-                cantidad_inicial_anterior = lote.cantidad_inicial
-                
-                # Calcular mortalidad total registrada
-                total_mortalidad = sum(r.mortalidad or 0 for r in lote.registros)
                 
-                # Actualizar cantidad_inicial
-                lote.cantidad_inicial = nueva_cantidad_inicial
-                
-                # Recalcular cantidad_actual basada en la nueva cantidad inicial
-                lote.cantidad_actual = max(0, nueva_cantidad_inicial - total_mortalidad)
-                
-                print(f"🔍 DEBUG - Cantidad inicial: {cantidad_inicial_anterior} -> {nueva_cantidad_inicial}")
-                print(f"🔍 DEBUG - Mortalidad total: {total_mortalidad}")
-                print(f"🔍 DEBUG - Nueva cantidad actual: {lote.cantidad_actual}")
+                # Trasladar la diferencia a cantidad_actual en el mismo UPDATE, sin recorrer los registros
+                # (las expresiones del SET usan los valores previos de la fila)
+                diferencia = nueva_cantidad_inicial - Lote.cantidad_inicial
+                db.session.execute(
+                    update(Lote)
+                    .where(Lote.id == id)
+                    .values(
+                        cantidad_inicial=nueva_cantidad_inicial,
+                        cantidad_actual=_acotar_cantidad(func.coalesce(Lote.cantidad_actual, Lote.cantidad_inicial) + diferencia)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                log.info("Lote %s: cantidad inicial %s -> %s", id, lote.cantidad_inicial, nueva_cantidad_inicial)
             except ValueError:
                 return jsonify({'mensaje': 'Cantidad inicial debe ser un número entero'}), 400
         
@@ -620,8 +1446,8 @@ def actualizar_lote(current_user, id):
         
         lote.updated_at = datetime.utcnow()
         
-        print(f"✅ DEBUG - Lote actualizado: {lote.nombre}")
         db.session.commit()
+        log.debug("Lote %s actualizado", id, extra={'muestrear': True})
         
         return jsonify({
             'mensaje': 'Lote actualizado exitosamente',
@@ -634,9 +1460,7 @@ def actualizar_lote(current_user, id):
             }
         })
     except Exception as e:
-        print(f"❌ DEBUG - Error actualizando lote: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error actualizando lote %s", id)
         db.session.rollback()
         return jsonify({'mensaje': f'Error al actualizar lote: {str(e)}'}), 500
 
@@ -645,6 +1469,8 @@ def actualizar_lote(current_user, id):
 def cerrar_lote(current_user, id):
     try:
         lote = Lote.query.get_or_404(id)
+        if lotes_archivados_entre([id]):
+            return respuesta_lote_archivado(id)
         lote.estado = 'finalizado'
         lote.fecha_fin = datetime.now().date()
         lote.updated_at = datetime.utcnow()
@@ -655,70 +1481,79 @@ def cerrar_lote(current_user, id):
         db.session.rollback()
         return jsonify({'mensaje': f'Error al cerrar lote: {str(e)}'}), 500
 
+def eliminar_lotes(ids):
+    """Borra los lotes `ids` con un único DELETE; la base elimina en cascada registros,
+    costos, ingresos, sanidad y archivo. Devuelve los ids que existían. No hace commit."""
+    # Bajas para los clientes sincronizados, anotadas antes de que desaparezcan las filas
+    for modelo in (Sanidad, RegistroDiario, Costo, Ingreso):
+        registrar_cambios_por_consulta(modelo, modelo.lote_id.in_(ids), operacion='delete')
+    registrar_cambios_por_consulta(Lote, Lote.id.in_(ids), operacion='delete')
+    marcar_lotes_modificados(ids)
+    resultado = db.session.execute(delete(Lote).where(Lote.id.in_(ids)).returning(Lote.id))
+    return sorted(resultado.scalars())
+
 @app.route('/api/lotes/<int:id>', methods=['DELETE'])
 @token_required
 def eliminar_lote(current_user, id):
     try:
-        print(f"Intentando eliminar lote {id}...")
-        lote = Lote.query.get_or_404(id)
-        nombre_lote = lote.nombre
-        
-        # Eliminar registros relacionados manualmente en el orden correcto
-        try:
-            # 1. Eliminar registros de sanidad (tienen FK a lote)
-            num_sanidad = Sanidad.query.filter_by(lote_id=id).delete(synchronize_session=False)
-            print(f"  - {num_sanidad} registros de sanidad eliminados")
-            
-            # 2. Eliminar registros diarios
-            num_registros = RegistroDiario.query.filter_by(lote_id=id).delete(synchronize_session=False)
-            print(f"  - {num_registros} registros diarios eliminados")
-            
-            # 3. Eliminar costos
-            num_costos = Costo.query.filter_by(lote_id=id).delete(synchronize_session=False)
-            print(f"  - {num_costos} costos eliminados")
-            
-            # 4. Eliminar ingresos
-            num_ingresos = Ingreso.query.filter_by(lote_id=id).delete(synchronize_session=False)
-            print(f"  - {num_ingresos} ingresos eliminados")
-            
-            # 5. Ahora eliminar el lote
-            db.session.delete(lote)
-            db.session.commit()
-            print(f"✅ Lote '{nombre_lote}' eliminado exitosamente")
-            
-            return jsonify({'mensaje': 'Lote eliminado exitosamente'})
-        except Exception as e:
-            print(f"❌ Error durante la eliminación: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            db.session.rollback()
-            raise
+        if not eliminar_lotes([id]):
+            return jsonify({'mensaje': 'Lote no encontrado'}), 404
+        db.session.commit()
+        log.info("Lote %s eliminado", id)
+        return jsonify({'mensaje': 'Lote eliminado exitosamente'})
     except Exception as e:
-        print(f"❌ Error al eliminar lote {id}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error al eliminar lote %s", id)
         db.session.rollback()
         return jsonify({'mensaje': f'Error al eliminar lote: {str(e)}'}), 500
 
+@app.route('/api/lotes', methods=['DELETE'])
+@token_required
+def eliminar_lotes_varios(current_user):
+    """DELETE /api/lotes?ids=1,2,3 (o ?ids=1&ids=2): borra varios lotes en una transacción"""
+    try:
+        ids = {int(v) for valor in request.args.getlist('ids') for v in valor.split(',') if v.strip()}
+    except ValueError:
+        return jsonify({'mensaje': 'ids debe ser una lista de enteros separados por comas'}), 400
+    if not ids:
+        return jsonify({'mensaje': 'Indica los lotes a eliminar con ?ids=1,2,3'}), 400
+    try:
+        eliminados = eliminar_lotes(sorted(ids))
+        db.session.commit()
+        log.info("%s lotes eliminados: %s", len(eliminados), eliminados)
+        return jsonify({
+            'mensaje': f'{len(eliminados)} lotes eliminados',
+            'eliminados': eliminados,
+            'no_encontrados': sorted(ids - set(eliminados))
+        })
+    except Exception as e:
+        log.exception("Error al eliminar lotes %s", sorted(ids))
+        db.session.rollback()
+        return jsonify({'mensaje': f'Error al eliminar lotes: {str(e)}'}), 500
+
 # ============= RUTAS - REGISTROS DIARIOS =============
 
+def valores_numericos_registro(data):
+    """Convierte los campos numéricos de un registro diario (vacío o 0 -> None).
+    Lanza ValueError/TypeError si algún valor no es numérico."""
+    return {
+        'alimento_kg': float(data['alimento_kg']) if data.get('alimento_kg') not in [None, '', 0] else None,
+        'agua_litros': float(data['agua_litros']) if data.get('agua_litros') not in [None, '', 0] else None,
+        'mortalidad': int(data.get('mortalidad', 0)),
+        'peso_promedio': float(data['peso_promedio']) if data.get('peso_promedio') not in [None, '', 0] else None,
+        'temperatura_promedio': float(data['temperatura_promedio']) if data.get('temperatura_promedio') not in [None, '', 0] else None,
+        'humedad': float(data['humedad']) if data.get('humedad') not in [None, '', 0] else None,
+    }
+
 @app.route('/api/lotes/<int:id>/registros', methods=['GET'])
+@presupuesto_consultas(4)  # +1 con total=true, +1 si sale vacío (¿lote archivado?)
 @token_required
 def get_registros(current_user, id):
+    """Filtros: desde/hasta. Paginación: limit, cursor, total."""
     try:
-        registros = RegistroDiario.query.filter_by(lote_id=id).order_by(RegistroDiario.fecha.desc()).all()
-        return jsonify([{
-            'id': r.id,
-            'fecha': r.fecha.isoformat(),
-            'alimento_kg': r.alimento_kg,
-            'agua_litros': r.agua_litros,
-            'mortalidad': r.mortalidad,
-            'causa_mortalidad': r.causa_mortalidad,
-            'peso_promedio': r.peso_promedio,
-            'temperatura_promedio': r.temperatura_promedio,
-            'humedad': r.humedad,
-            'observaciones': r.observaciones
-        } for r in registros])
+        consulta = RegistroDiario.query.filter(RegistroDiario.lote_id == id, *filtro_fechas(RegistroDiario.fecha))
+        return responder_listado(consulta, (RegistroDiario.fecha, RegistroDiario.id), serializar_registro, lote_id=id)
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 400
     except Exception as e:
         return jsonify({'mensaje': f'Error al obtener registros: {str(e)}'}), 500
 
@@ -728,79 +1563,58 @@ def crear_registro(current_user, id):
     try:
         data = request.get_json()
         
-        # Logging para debug
-        print(f"🔍 DEBUG - Creando registro para lote {id}")
-        print(f"🔍 DEBUG - Datos recibidos: {data}")
+        log.debug("Creando registro para lote %s con datos %s", id, data, extra={'muestrear': True})
         
         if not data or not data.get('fecha'):
-            print("❌ DEBUG - Falta la fecha en los datos")
             return jsonify({'mensaje': 'Falta la fecha'}), 400
         
         # Verificar que el lote existe
-        lote = Lote.query.get(id)
-        if not lote:
-            print(f"❌ DEBUG - Lote {id} no encontrado")
+        if not db.session.query(Lote.id).filter_by(id=id).first():
             return jsonify({'mensaje': 'Lote no encontrado'}), 404
+        if lotes_archivados_entre([id]):
+            return respuesta_lote_archivado(id)
         
         # Verificar si ya existe un registro para esa fecha
         try:
             fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
         except (ValueError, TypeError) as e:
-            print(f"❌ DEBUG - Error al convertir fecha {data['fecha']}: {e}")
+            log.info("Fecha inválida %r al crear registro del lote %s: %s", data['fecha'], id, e)
             return jsonify({'mensaje': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
             
         registro_existente = RegistroDiario.query.filter_by(lote_id=id, fecha=fecha).first()
         
         if registro_existente:
-            print(f"⚠️ DEBUG - Ya existe registro para lote {id} fecha {fecha}")
             return jsonify({'mensaje': 'Ya existe un registro para esta fecha'}), 400
         
         # Validar datos numéricos
         try:
-            alimento_kg = float(data['alimento_kg']) if data.get('alimento_kg') not in [None, '', 0] else None
-            agua_litros = float(data['agua_litros']) if data.get('agua_litros') not in [None, '', 0] else None
-            mortalidad = int(data.get('mortalidad', 0))
-            peso_promedio = float(data['peso_promedio']) if data.get('peso_promedio') not in [None, '', 0] else None
-            temperatura_promedio = float(data['temperatura_promedio']) if data.get('temperatura_promedio') not in [None, '', 0] else None
-            humedad = float(data['humedad']) if data.get('humedad') not in [None, '', 0] else None
+            valores = valores_numericos_registro(data)
         except (ValueError, TypeError) as e:
-            print(f"❌ DEBUG - Error al convertir datos numéricos: {e}")
+            log.info("Datos numéricos inválidos al crear registro del lote %s: %s", id, e)
             return jsonify({'mensaje': f'Error en datos numéricos: {str(e)}'}), 400
+        mortalidad = valores['mortalidad']
         
         registro = RegistroDiario(
             lote_id=id,
             fecha=fecha,
-            alimento_kg=alimento_kg,
-            agua_litros=agua_litros,
-            mortalidad=mortalidad,
             causa_mortalidad=data.get('causa_mortalidad'),
-            peso_promedio=peso_promedio,
-            temperatura_promedio=temperatura_promedio,
-            humedad=humedad,
-            observaciones=data.get('observaciones')
+            observaciones=data.get('observaciones'),
+            **valores
         )
         
-        print(f"✅ DEBUG - Registro creado en memoria")
         db.session.add(registro)
         
-        # Actualizar cantidad actual del lote si hay mortalidad
+        # Descontar la mortalidad con un UPDATE atómico (sin leer-modificar-escribir en Python)
         if mortalidad > 0:
-            print(f"☠️ DEBUG - Actualizando mortalidad: -{mortalidad}")
-            cantidad_anterior = lote.cantidad_actual or lote.cantidad_inicial
-            lote.cantidad_actual = max(0, cantidad_anterior - mortalidad)
-            lote.updated_at = datetime.utcnow()
-            print(f"🔢 DEBUG - Cantidad actualizada: {cantidad_anterior} -> {lote.cantidad_actual}")
+            ajustar_cantidad_actual(id, mortalidad)
         
-        print(f"💾 DEBUG - Guardando en base de datos...")
         db.session.commit()
-        print(f"✅ DEBUG - Registro guardado exitosamente con ID: {registro.id}")
+        log.debug("Registro %s creado para lote %s (mortalidad %s)", registro.id, id, mortalidad,
+                  extra={'muestrear': True})
         
         return jsonify({'mensaje': 'Registro creado exitosamente', 'id': registro.id}), 201
     except Exception as e:
-        print(f"❌ DEBUG - Error: {str(e)}")
-        print(f"❌ DEBUG - Tipo de error: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error al crear registro para lote %s", id)
         db.session.rollback()
         return jsonify({'mensaje': f'Error al crear registro: {str(e)}'}), 500
 
@@ -816,7 +1630,9 @@ def actualizar_registro(current_user, id):
         if data.get('agua_litros') is not None:
             registro.agua_litros = float(data['agua_litros'])
         if data.get('mortalidad') is not None:
-            registro.mortalidad = int(data['mortalidad'])
+            nueva_mortalidad = int(data['mortalidad'])
+            ajustar_cantidad_actual(registro.lote_id, nueva_mortalidad - (registro.mortalidad or 0))
+            registro.mortalidad = nueva_mortalidad
         if data.get('causa_mortalidad') is not None:
             registro.causa_mortalidad = data['causa_mortalidad']
         if data.get('peso_promedio') is not None:
@@ -840,6 +1656,7 @@ def actualizar_registro(current_user, id):
 def eliminar_registro(current_user, id):
     try:
         registro = RegistroDiario.query.get_or_404(id)
+        ajustar_cantidad_actual(registro.lote_id, -(registro.mortalidad or 0))
         db.session.delete(registro)
         db.session.commit()
         
@@ -886,7 +1703,9 @@ def actualizar_registro_lote(current_user, lote_id, registro_id):
         if 'agua_litros' in data:
             registro.agua_litros = float(data['agua_litros']) if data['agua_litros'] else None
         if 'mortalidad' in data:
-            registro.mortalidad = int(data['mortalidad']) if data['mortalidad'] else 0
+            nueva_mortalidad = int(data['mortalidad']) if data['mortalidad'] else 0
+            ajustar_cantidad_actual(lote_id, nueva_mortalidad - (registro.mortalidad or 0))
+            registro.mortalidad = nueva_mortalidad
         if 'causa_mortalidad' in data:
             registro.causa_mortalidad = data['causa_mortalidad']
         if 'peso_promedio' in data:
@@ -910,6 +1729,7 @@ def actualizar_registro_lote(current_user, lote_id, registro_id):
 def eliminar_registro_lote(current_user, lote_id, registro_id):
     try:
         registro = RegistroDiario.query.filter_by(id=registro_id, lote_id=lote_id).first_or_404()
+        ajustar_cantidad_actual(lote_id, -(registro.mortalidad or 0))
         db.session.delete(registro)
         db.session.commit()
         
@@ -918,21 +1738,186 @@ def eliminar_registro_lote(current_user, lote_id, registro_id):
         db.session.rollback()
         return jsonify({'mensaje': f'Error al eliminar registro: {str(e)}'}), 500
 
+# ============= RUTAS - INGESTA DIFERIDA (SENSORES / CARGA MASIVA) =============
+
+def parsear_registro_ingesta(data):
+    """Valida un registro diario recibido por ingesta y lo normaliza a un dict serializable."""
+    if not isinstance(data, dict):
+        raise ValueError('Cada registro debe ser un objeto JSON')
+    if data.get('lote_id') in (None, ''):
+        raise ValueError('Falta lote_id')
+    if not data.get('fecha'):
+        raise ValueError('Falta la fecha')
+    try:
+        fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValueError('Formato de fecha inválido. Use YYYY-MM-DD')
+    try:
+        valores = valores_numericos_registro(data)
+        lote_id = int(data['lote_id'])
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'Error en datos numéricos: {str(e)}')
+    return {
+        'lote_id': lote_id,
+        'fecha': fecha.isoformat(),
+        'causa_mortalidad': data.get('causa_mortalidad'),
+        'observaciones': data.get('observaciones'),
+        **valores
+    }
+
+def persistir_registros_ingesta(items):
+    """Inserta un lote de registros encolados en una sola transacción.
+    Devuelve los elementos rechazados (lote inexistente o fecha duplicada)."""
+    with app.app_context():
+        try:
+            rechazados = []
+            lote_ids = {it['lote_id'] for it in items}
+            fechas = {date.fromisoformat(it['fecha']) for it in items}
+            lotes = {lid for (lid,) in db.session.query(Lote.id).filter(Lote.id.in_(lote_ids)).all()}
+            archivados = lotes_archivados_entre(lotes)
+            existentes = set(
+                db.session.query(RegistroDiario.lote_id, RegistroDiario.fecha)
+                .filter(RegistroDiario.lote_id.in_(lote_ids), RegistroDiario.fecha.in_(fechas))
+                .all()
+            )
+
+            filas = []
+            mortalidad_por_lote = defaultdict(int)
+            for it in items:
+                clave = (it['lote_id'], date.fromisoformat(it['fecha']))
+                if it['lote_id'] not in lotes:
+                    rechazados.append({**it, 'motivo': 'Lote no encontrado'})
+                    continue
+                if it['lote_id'] in archivados:
+                    rechazados.append({**it, 'motivo': 'Lote archivado'})
+                    continue
+                if clave in existentes:
+                    rechazados.append({**it, 'motivo': 'Ya existe un registro para esta fecha'})
+                    continue
+                existentes.add(clave)
+                filas.append({**it, 'fecha': clave[1]})
+                mortalidad_por_lote[it['lote_id']] += it['mortalidad'] or 0
+
+            if filas:
+                ids = db.session.scalars(
+                    insert(RegistroDiario).returning(RegistroDiario.id, sort_by_parameter_order=True), filas
+                ).all()
+                registrar_cambios(RegistroDiario, zip(ids, (f['lote_id'] for f in filas)))
+
+            # Descontar la mortalidad con un UPDATE atómico por lote
+            for lote_id, mortalidad in mortalidad_por_lote.items():
+                ajustar_cantidad_actual(lote_id, mortalidad)
+
+            db.session.commit()
+            return rechazados
+        except Exception:
+            db.session.rollback()
+            log.exception("Error al persistir %s registros de ingesta; se reintentarán", len(items))
+            raise
+
+buffer_ingesta = BufferIngesta(
+    persistir_registros_ingesta,
+    max_cola=app.config['INGESTA_MAX_COLA'],
+    tam_lote=app.config['INGESTA_TAM_LOTE'],
+    intervalo=app.config['INGESTA_INTERVALO_SEG'],
+    spool_dir=app.config.get('SPOOL_FOLDER') if app.config['INGESTA_SPOOL'] else None,
+    fsync=app.config['INGESTA_FSYNC'],
+    max_intentos=app.config['INGESTA_MAX_INTENTOS'],
+    spool_compactar_bytes=app.config['INGESTA_SPOOL_COMPACTAR_KB'] * 1024,
+    # Base caída o bloqueada: se reintenta sin límite, no es culpa de los registros
+    es_transitorio=lambda exc: isinstance(exc, OperationalError)
+)
+
+@app.route('/api/ingesta/registros', methods=['POST'])
+@token_required
+def ingestar_registros(current_user):
+    """Recibe uno o varios registros diarios ({lote_id, fecha, ...}) para persistencia diferida.
+    Responde 202 en cuanto quedan encolados y 429 si la cola está llena.
+    Con INGESTA_HABILITADA=False se persisten en la misma petición (201)."""
+    try:
+        data = request.get_json()
+        items = data if isinstance(data, list) else [data]
+        if not data or not items:
+            return jsonify({'mensaje': 'No se recibieron registros'}), 400
+        if len(items) > app.config['INGESTA_MAX_COLA']:
+            return jsonify({'mensaje': f"Máximo {app.config['INGESTA_MAX_COLA']} registros por petición"}), 400
+
+        validos = []
+        errores = []
+        for idx, item in enumerate(items):
+            try:
+                validos.append(parsear_registro_ingesta(item))
+            except ValueError as e:
+                errores.append({'indice': idx, 'mensaje': str(e)})
+        if errores:
+            return jsonify({'mensaje': 'Registros inválidos', 'errores': errores}), 400
+
+        if not app.config['INGESTA_HABILITADA']:
+            rechazados = persistir_registros_ingesta(validos)
+            return jsonify({
+                'mensaje': 'Registros guardados',
+                'guardados': len(validos) - len(rechazados),
+                'rechazados': rechazados
+            }), 201
+
+        try:
+            profundidad = buffer_ingesta.encolar(validos)
+        except ColaLlenaError as e:
+            resp = jsonify({'mensaje': f'Ingesta saturada, reintente más tarde: {str(e)}'})
+            resp.headers['Retry-After'] = str(max(1, int(app.config['INGESTA_INTERVALO_SEG'])))
+            return resp, 429
+
+        return jsonify({
+            'mensaje': 'Registros encolados',
+            'aceptados': len(validos),
+            'profundidad_cola': profundidad
+        }), 202
+    except Exception as e:
+        return jsonify({'mensaje': f'Error en ingesta: {str(e)}'}), 500
+
+@app.route('/api/ingesta/metricas', methods=['GET'])
+@token_required
+def metricas_ingesta(current_user):
+    """Profundidad de cola, latencia de vaciado y contadores del buffer de este worker."""
+    return jsonify({'habilitada': app.config['INGESTA_HABILITADA'], **buffer_ingesta.metricas()})
+
+@app.route('/api/db/metricas', methods=['GET'])
+@token_required
+def metricas_base_datos(current_user):
+    """Espera de checkout y saturación del pool de conexiones de este worker."""
+    respuesta = {'motor': db.engine.dialect.name, 'pool': metricas_pool(db.engine)}
+    if BIND_REPLICA in db.engines:
+        respuesta['replica'] = {
+            'pool': metricas_pool(db.engines[BIND_REPLICA]),
+            **app.extensions['enrutador_replica'].metricas()
+        }
+    return jsonify(respuesta)
+
+def iniciar_ingesta():
+    """Arranca el hilo de vaciado y recupera los spools de workers caídos.
+
+    Solo lo llaman los procesos que sirven la API (run.py y el hook post_worker_init
+    de gunicorn.conf.py); si no, arranca con la primera petición de ingesta. Los
+    scripts que importan la app (migrar.py, benchmark.py...) no tocan el spool."""
+    if app.config['INGESTA_HABILITADA']:
+        buffer_ingesta.iniciar()
+
+atexit.register(buffer_ingesta.detener)
+
 # ============= RUTAS - ECONOMÍA =============
 
 @app.route('/api/lotes/<int:id>/costos', methods=['GET'])
+@presupuesto_consultas(4)  # +1 con total=true, +1 si sale vacío (¿lote archivado?)
 @token_required
 def get_costos(current_user, id):
+    """Filtros: categoria, desde/hasta. Paginación: limit, cursor, total."""
     try:
-        costos = Costo.query.filter_by(lote_id=id).order_by(Costo.fecha.desc()).all()
-        return jsonify([{
-            'id': c.id,
-            'categoria': c.categoria,
-            'concepto': c.concepto,
-            'monto': c.monto,
-            'fecha': c.fecha.isoformat(),
-            'observaciones': c.observaciones
-        } for c in costos])
+        consulta = Costo.query.filter(Costo.lote_id == id, *filtro_fechas(Costo.fecha))
+        if request.args.get('categoria'):
+            consulta = consulta.filter(Costo.categoria == request.args['categoria'])
+        return responder_listado(consulta, (Costo.fecha, Costo.id), serializar_costo, lote_id=id)
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 400
     except Exception as e:
         return jsonify({'mensaje': f'Error al obtener costos: {str(e)}'}), 500
 
@@ -944,6 +1929,8 @@ def crear_costo(current_user, id):
         
         if not data or not data.get('categoria') or not data.get('concepto') or not data.get('monto') or not data.get('fecha'):
             return jsonify({'mensaje': 'Faltan datos requeridos'}), 400
+        if lotes_archivados_entre([id]):
+            return respuesta_lote_archivado(id)
         
         costo = Costo(
             lote_id=id,
@@ -962,6 +1949,120 @@ def crear_costo(current_user, id):
         db.session.rollback()
         return jsonify({'mensaje': f'Error al registrar costo: {str(e)}'}), 500
 
+def parsear_linea_costo(data):
+    """Valida una línea de costo de carga masiva y la convierte en fila para insertar."""
+    if not isinstance(data, dict):
+        raise ValueError('Cada línea debe ser un objeto JSON')
+    if not data.get('lote_id') or not data.get('categoria') or not data.get('concepto') or not data.get('monto') or not data.get('fecha'):
+        raise ValueError('Faltan datos requeridos (lote_id, categoria, concepto, monto, fecha)')
+    try:
+        fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValueError('Formato de fecha inválido. Use YYYY-MM-DD')
+    try:
+        lote_id = int(data['lote_id'])
+        monto = float(data['monto'])
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'Error en datos numéricos: {str(e)}')
+    return {
+        'lote_id': lote_id,
+        'categoria': data['categoria'],
+        'concepto': data['concepto'],
+        'monto': monto,
+        'fecha': fecha,
+        'observaciones': data.get('observaciones')
+    }
+
+def parsear_linea_ingreso(data):
+    """Valida una línea de ingreso de carga masiva y calcula su total."""
+    if not isinstance(data, dict):
+        raise ValueError('Cada línea debe ser un objeto JSON')
+    if not data.get('lote_id') or not data.get('cantidad_vendida') or not data.get('peso_promedio') or not data.get('precio_por_kg') or not data.get('fecha'):
+        raise ValueError('Faltan datos requeridos (lote_id, cantidad_vendida, peso_promedio, precio_por_kg, fecha)')
+    try:
+        fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        raise ValueError('Formato de fecha inválido. Use YYYY-MM-DD')
+    try:
+        lote_id = int(data['lote_id'])
+        cantidad = int(data['cantidad_vendida'])
+        peso = float(data['peso_promedio'])
+        precio = float(data['precio_por_kg'])
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'Error en datos numéricos: {str(e)}')
+    return {
+        'lote_id': lote_id,
+        'cantidad_vendida': cantidad,
+        'peso_promedio': peso,
+        'precio_por_kg': precio,
+        'total': (cantidad * peso * precio) / 1000,  # kg
+        'fecha': fecha,
+        'cliente': data.get('cliente'),
+        'observaciones': data.get('observaciones')
+    }
+
+MAX_LINEAS_BULK = 2000
+
+def _crear_lineas_bulk(modelo, parsear, nombre):
+    """Valida todas las líneas, las inserta en una sola transacción y devuelve
+    el resumen económico de cada lote afectado (calculado una vez por lote)."""
+    data = request.get_json()
+    lineas = data.get('lineas') if isinstance(data, dict) else data
+    if not isinstance(lineas, list) or not lineas:
+        return jsonify({'mensaje': 'Se espera una lista de líneas'}), 400
+    if len(lineas) > MAX_LINEAS_BULK:
+        return jsonify({'mensaje': f'Máximo {MAX_LINEAS_BULK} líneas por petición'}), 400
+
+    filas = []
+    errores = []
+    for idx, linea in enumerate(lineas):
+        try:
+            filas.append((idx, parsear(linea)))
+        except ValueError as e:
+            errores.append({'indice': idx, 'mensaje': str(e)})
+
+    lote_ids = {f['lote_id'] for _, f in filas}
+    existentes = {lid for (lid,) in db.session.query(Lote.id).filter(Lote.id.in_(lote_ids)).all()}
+    archivados = lotes_archivados_entre(existentes)
+    for idx, fila in filas:
+        if fila['lote_id'] not in existentes:
+            errores.append({'indice': idx, 'mensaje': f"Lote {fila['lote_id']} no encontrado"})
+        elif fila['lote_id'] in archivados:
+            errores.append({'indice': idx, 'mensaje': f"Lote {fila['lote_id']} archivado: restáurelo antes de modificarlo"})
+    if errores:
+        errores.sort(key=lambda e: e['indice'])
+        return jsonify({'mensaje': f'Líneas de {nombre} inválidas; no se guardó ninguna', 'errores': errores}), 400
+    filas = [f for _, f in filas]
+
+    ids = list(db.session.scalars(insert(modelo).returning(modelo.id, sort_by_parameter_order=True), filas))
+    db.session.execute(
+        update(Lote)
+        .where(Lote.id.in_(lote_ids))
+        .values(updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    registrar_cambios(modelo, zip(ids, (f['lote_id'] for f in filas)))
+    registrar_cambios(Lote, [(lid, lid) for lid in lote_ids])
+    db.session.commit()
+
+    return jsonify({
+        'mensaje': f'{len(ids)} {nombre} registrados exitosamente',
+        'ids': ids,
+        'resumenes': resumenes_economicos(sorted(lote_ids))
+    }), 201
+
+@app.route('/api/costos/bulk', methods=['POST'])
+@token_required
+def crear_costos_bulk(current_user):
+    """Registra muchas líneas de costo (de uno o varios lotes) en una sola transacción.
+    Body: [{lote_id, categoria, concepto, monto, fecha, observaciones?}, ...] o {"lineas": [...]}"""
+    try:
+        return _crear_lineas_bulk(Costo, parsear_linea_costo, 'costos')
+    except Exception as e:
+        db.session.rollback()
+        log.exception("Error en carga masiva de costos")
+        return jsonify({'mensaje': f'Error al registrar costos: {str(e)}'}), 500
+
 @app.route('/api/costos/<int:id>', methods=['DELETE'])
 @token_required
 def eliminar_costo(current_user, id):
@@ -1034,20 +2135,15 @@ def eliminar_costo_lote(current_user, lote_id, costo_id):
         return jsonify({'mensaje': f'Error al eliminar costo: {str(e)}'}), 500
 
 @app.route('/api/lotes/<int:id>/ingresos', methods=['GET'])
+@presupuesto_consultas(4)  # +1 con total=true, +1 si sale vacío (¿lote archivado?)
 @token_required
 def get_ingresos(current_user, id):
+    """Filtros: desde/hasta. Paginación: limit, cursor, total."""
     try:
-        ingresos = Ingreso.query.filter_by(lote_id=id).order_by(Ingreso.fecha.desc()).all()
-        return jsonify([{
-            'id': i.id,
-            'cantidad_vendida': i.cantidad_vendida,
-            'peso_promedio': i.peso_promedio,
-            'precio_por_kg': i.precio_por_kg,
-            'total': i.total,
-            'fecha': i.fecha.isoformat(),
-            'cliente': i.cliente,
-            'observaciones': i.observaciones
-        } for i in ingresos])
+        consulta = Ingreso.query.filter(Ingreso.lote_id == id, *filtro_fechas(Ingreso.fecha))
+        return responder_listado(consulta, (Ingreso.fecha, Ingreso.id), serializar_ingreso, lote_id=id)
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 400
     except Exception as e:
         return jsonify({'mensaje': f'Error al obtener ingresos: {str(e)}'}), 500
 
@@ -1059,6 +2155,8 @@ def crear_ingreso(current_user, id):
         
         if not data or not data.get('cantidad_vendida') or not data.get('peso_promedio') or not data.get('precio_por_kg') or not data.get('fecha'):
             return jsonify({'mensaje': 'Faltan datos requeridos'}), 400
+        if lotes_archivados_entre([id]):
+            return respuesta_lote_archivado(id)
         
         cantidad = int(data['cantidad_vendida'])
         peso = float(data['peso_promedio'])
@@ -1084,6 +2182,18 @@ def crear_ingreso(current_user, id):
         db.session.rollback()
         return jsonify({'mensaje': f'Error al registrar ingreso: {str(e)}'}), 500
 
+@app.route('/api/ingresos/bulk', methods=['POST'])
+@token_required
+def crear_ingresos_bulk(current_user):
+    """Registra muchas ventas (de uno o varios lotes) en una sola transacción.
+    Body: [{lote_id, cantidad_vendida, peso_promedio, precio_por_kg, fecha, cliente?, observaciones?}, ...]"""
+    try:
+        return _crear_lineas_bulk(Ingreso, parsear_linea_ingreso, 'ingresos')
+    except Exception as e:
+        db.session.rollback()
+        log.exception("Error en carga masiva de ingresos")
+        return jsonify({'mensaje': f'Error al registrar ingresos: {str(e)}'}), 500
+
 @app.route('/api/lotes/<int:lote_id>/ingresos/<int:ingreso_id>', methods=['GET'])
 @token_required
 def get_ingreso(current_user, lote_id, ingreso_id):
@@ -1144,52 +2254,75 @@ def eliminar_ingreso(current_user, lote_id, ingreso_id):
         db.session.rollback()
         return jsonify({'mensaje': f'Error al eliminar ingreso: {str(e)}'}), 500
 
+def resumenes_economicos(lote_ids):
+    """Resumen económico de varios lotes con dos consultas agregadas (GROUP BY),
+    sin cargar cada costo o ingreso en memoria."""
+    resumenes = {lid: {'costos_por_categoria': {}, 'total_costos': 0, 'total_ingresos': 0, 'cantidad_ventas': 0}
+                 for lid in lote_ids}
+    if not resumenes:
+        return resumenes
+
+    costos = (
+        db.session.query(Costo.lote_id, Costo.categoria, func.sum(Costo.monto))
+        .filter(Costo.lote_id.in_(resumenes.keys()))
+        .group_by(Costo.lote_id, Costo.categoria)
+        .all()
+    )
+    for lote_id, categoria, monto in costos:
+        resumenes[lote_id]['costos_por_categoria'][categoria] = monto
+        resumenes[lote_id]['total_costos'] += monto
+
+    ingresos = (
+        db.session.query(Ingreso.lote_id, func.sum(Ingreso.total), func.count(Ingreso.id))
+        .filter(Ingreso.lote_id.in_(resumenes.keys()))
+        .group_by(Ingreso.lote_id)
+        .all()
+    )
+    for lote_id, total, cantidad in ingresos:
+        resumenes[lote_id]['total_ingresos'] = total or 0
+        resumenes[lote_id]['cantidad_ventas'] = cantidad
+
+    for r in resumenes.values():
+        r['ganancia'] = round(r['total_ingresos'] - r['total_costos'], 2)
+        r['total_costos'] = round(r['total_costos'], 2)
+        r['total_ingresos'] = round(r['total_ingresos'], 2)
+
+    # Lotes archivados: resumen congelado al archivarlos
+    archivados = (
+        db.session.query(LoteArchivado.lote_id, LoteArchivado.resumen)
+        .filter(LoteArchivado.lote_id.in_(resumenes.keys()))
+        .all()
+    )
+    for lote_id, resumen in archivados:
+        resumenes[lote_id] = json.loads(resumen)['economia']
+    return resumenes
+
 @app.route('/api/lotes/<int:id>/resumen-economico', methods=['GET'])
+@presupuesto_consultas(5)
 @token_required
 def get_resumen_economico(current_user, id):
     try:
-        lote = Lote.query.get_or_404(id)
-        
-        # Agrupar costos por categoría
-        costos_por_categoria = {}
-        for costo in lote.costos:
-            if costo.categoria not in costos_por_categoria:
-                costos_por_categoria[costo.categoria] = 0
-            costos_por_categoria[costo.categoria] += costo.monto
-        
-        total_costos = sum(c.monto for c in lote.costos)
-        total_ingresos = sum(i.total for i in lote.ingresos)
-        
-        return jsonify({
-            'total_costos': round(total_costos, 2),
-            'total_ingresos': round(total_ingresos, 2),
-            'ganancia': round(total_ingresos - total_costos, 2),
-            'costos_por_categoria': costos_por_categoria,
-            'cantidad_ventas': len(lote.ingresos)
-        })
+        Lote.query.get_or_404(id)
+        return jsonify(resumenes_economicos([id])[id])
     except Exception as e:
         return jsonify({'mensaje': f'Error al obtener resumen económico: {str(e)}'}), 500
 
 # ============= RUTAS - SANIDAD =============
 
 @app.route('/api/lotes/<int:id>/sanidad', methods=['GET'])
+@presupuesto_consultas(4)  # +1 con total=true, +1 si sale vacío (¿lote archivado?)
 @token_required
 def get_sanidad(current_user, id):
+    """Filtros: tipo, desde/hasta. Paginación: limit, cursor, total."""
     try:
-        sanidad = Sanidad.query.filter_by(lote_id=id).order_by(Sanidad.fecha.desc()).all()
-        return jsonify([{
-            'id': s.id,
-            'tipo': s.tipo,
-            'producto': s.producto,
-            'dosis': s.dosis,
-            'fecha': s.fecha.isoformat(),
-            'edad_dias': s.edad_dias,
-            'via_administracion': s.via_administracion,
-            'retiro_dias': s.retiro_dias,
-            'enfermedad_id': s.enfermedad_id,
-            'enfermedad_nombre': s.enfermedad.nombre if s.enfermedad_id else None,
-            'observaciones': s.observaciones
-        } for s in sanidad])
+        consulta = Sanidad.query.options(joinedload(Sanidad.enfermedad)).filter(
+            Sanidad.lote_id == id, *filtro_fechas(Sanidad.fecha)
+        )
+        if request.args.get('tipo'):
+            consulta = consulta.filter(Sanidad.tipo == request.args['tipo'])
+        return responder_listado(consulta, (Sanidad.fecha, Sanidad.id), serializar_sanidad, lote_id=id)
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 400
     except Exception as e:
         return jsonify({'mensaje': f'Error al obtener registros sanitarios: {str(e)}'}), 500
 
@@ -1201,6 +2334,8 @@ def crear_sanidad(current_user, id):
         
         if not data or not data.get('tipo') or not data.get('producto') or not data.get('fecha'):
             return jsonify({'mensaje': 'Faltan datos requeridos'}), 400
+        if lotes_archivados_entre([id]):
+            return respuesta_lote_archivado(id)
         
         sanidad = Sanidad(
             lote_id=id,
@@ -1241,7 +2376,7 @@ def eliminar_sanidad(current_user, id):
 @token_required
 def get_sanidad_lote(current_user, lote_id, sanidad_id):
     try:
-        sanidad = Sanidad.query.filter_by(id=sanidad_id, lote_id=lote_id).first_or_404()
+        sanidad = Sanidad.query.options(joinedload(Sanidad.enfermedad)).filter_by(id=sanidad_id, lote_id=lote_id).first_or_404()
         
         return jsonify({
             'id': sanidad.id,
@@ -1310,6 +2445,7 @@ def eliminar_sanidad_lote(current_user, lote_id, sanidad_id):
 # ============= RUTAS - ESTADÍSTICAS Y REPORTES =============
 
 @app.route('/api/lotes/<int:id>/estadisticas', methods=['GET'])
+@presupuesto_consultas(5)
 @token_required
 def get_estadisticas(current_user, id):
     try:
@@ -1320,6 +2456,7 @@ def get_estadisticas(current_user, id):
         return jsonify({'mensaje': f'Error al calcular estadísticas: {str(e)}'}), 500
 
 @app.route('/api/lotes/<int:id>/curva-peso', methods=['GET'])
+@presupuesto_consultas(3)
 @token_required
 def get_curva_peso(current_user, id):
     try:
@@ -1394,6 +2531,7 @@ def get_curva_peso(current_user, id):
         return jsonify({'mensaje': f'Error al obtener curva de peso: {str(e)}'}), 500
 
 @app.route('/api/lotes/<int:id>/curva-mortalidad', methods=['GET'])
+@presupuesto_consultas(3)
 @token_required
 def get_curva_mortalidad(current_user, id):
     try:
@@ -1420,10 +2558,12 @@ def get_curva_mortalidad(current_user, id):
         return jsonify({'mensaje': f'Error al obtener curva de mortalidad: {str(e)}'}), 500
 
 @app.route('/api/dashboard', methods=['GET'])
+@presupuesto_consultas(5)
 @token_required
 def get_dashboard(current_user):
     try:
         lotes_activos = Lote.query.filter_by(estado='activo').all()
+        estadisticas = estadisticas_lotes(lotes_activos)
         
         dashboard_data = {
             'total_lotes_activos': len(lotes_activos),
@@ -1433,7 +2573,7 @@ def get_dashboard(current_user):
         
         for lote in lotes_activos:
             try:
-                stats = calcular_estadisticas(lote)
+                stats = estadisticas[lote.id]
                 dashboard_data['lotes'].append({
                     'id': lote.id,
                     'nombre': lote.nombre,
@@ -1448,19 +2588,16 @@ def get_dashboard(current_user):
                     'rentabilidad': stats['rentabilidad']
                 })
             except Exception as e:
-                print(f"Error procesando lote {lote.id} en dashboard: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                log.exception("Error procesando lote %s en dashboard", lote.id)
                 continue
         
         return jsonify(dashboard_data)
     except Exception as e:
-        print(f"Error en get_dashboard: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error en get_dashboard")
         return jsonify({'mensaje': f'Error al obtener dashboard: {str(e)}'}), 500
 
 @app.route('/api/lotes/<int:id>/alertas', methods=['GET'])
+@presupuesto_consultas(7)
 @token_required
 def get_alertas(current_user, id):
     """
@@ -1491,92 +2628,21 @@ def get_alertas(current_user, id):
        - Nota: Esta es mortalidad de UN DÍA, no acumulada
     """
     try:
+        cfg = get_configuracion_valores()
         lote = Lote.query.get_or_404(id)
         stats = calcular_estadisticas(lote)
-        cfg = get_configuracion_valores()
-        alertas = []
 
         # Último registro para condiciones ambientales y consumo diario
         ultimo = RegistroDiario.query.filter_by(lote_id=id).order_by(RegistroDiario.fecha.desc()).first()
-        
-        # Si no hay registros, no hay alertas que generar
-        if not ultimo:
-            return jsonify(alertas)
-
-        # ALERTA 1: Temperatura fuera de rango
-        if ultimo.temperatura_promedio is not None and ultimo.temperatura_promedio > 0:
-            temp_ideal = (cfg['temp_min'] + cfg['temp_max']) / 2
-            desviacion = abs(ultimo.temperatura_promedio - temp_ideal)
-            
-            if ultimo.temperatura_promedio < cfg['temp_min'] or ultimo.temperatura_promedio > cfg['temp_max']:
-                alertas.append({
-                    'tipo': 'ADVERTENCIA',
-                    'categoria': 'TEMPERATURA',
-                    'mensaje': f"Temperatura fuera de rango: {ultimo.temperatura_promedio}°C (ideal {cfg['temp_min']}-{cfg['temp_max']}°C)",
-                    'valor': ultimo.temperatura_promedio,
-                    'prioridad': 'alta' if desviacion > 3 else 'media'
-                })
-
-        # ALERTA 2: Humedad fuera de rango
-        if ultimo.humedad is not None and ultimo.humedad > 0:
-            humedad_ideal = (cfg['humedad_min'] + cfg['humedad_max']) / 2
-            desviacion = abs(ultimo.humedad - humedad_ideal)
-            
-            if ultimo.humedad < cfg['humedad_min'] or ultimo.humedad > cfg['humedad_max']:
-                alertas.append({
-                    'tipo': 'ADVERTENCIA',
-                    'categoria': 'HUMEDAD',
-                    'mensaje': f"Humedad fuera de rango: {ultimo.humedad}% (ideal {cfg['humedad_min']}-{cfg['humedad_max']}%)",
-                    'valor': ultimo.humedad,
-                    'prioridad': 'alta' if desviacion > 10 else 'media'
-                })
-
-        # ALERTA 3: Consumo por ave bajo (solo si hay registro de alimento)
-        if ultimo.alimento_kg is not None and ultimo.alimento_kg > 0:
-            cantidad_actual = stats['cantidad_actual'] or lote.cantidad_inicial
-            if cantidad_actual > 0:
-                # Fórmula: gramos por ave por día = (kg de alimento * 1000) / número de aves
-                consumo_g_dia = (ultimo.alimento_kg * 1000) / cantidad_actual
-                
-                if consumo_g_dia < cfg['consumo_min_g_dia']:
-                    alertas.append({
-                        'tipo': 'ADVERTENCIA',
-                        'categoria': 'CONSUMO',
-                        'mensaje': f"Consumo bajo: {round(consumo_g_dia,1)} g/ave/día (mín {cfg['consumo_min_g_dia']} g)",
-                        'valor': round(consumo_g_dia, 1),
-                        'prioridad': 'media'
-                    })
-
-        # ALERTA 4: Mortalidad diaria alta (solo si hay mortalidad registrada)
-        if ultimo.mortalidad is not None and ultimo.mortalidad > 0:
-            # Usamos cantidad_actual como base para el cálculo
-            # Nota: Idealmente debería ser la cantidad ANTES de ese día, pero cantidad_actual es aproximación
-            cantidad_base = stats['cantidad_actual'] or lote.cantidad_inicial
-            
-            if cantidad_base > 0:
-                # Fórmula: % mortalidad diaria = (aves muertas ese día / aves vivas) * 100
-                pct_mortalidad_diaria = (ultimo.mortalidad / cantidad_base) * 100
-                
-                # Solo alertar si supera el umbral configurado
-                if pct_mortalidad_diaria > cfg['mortalidad_diaria_max_pct']:
-                    es_critico = pct_mortalidad_diaria > (cfg['mortalidad_diaria_max_pct'] * 2)
-                    
-                    alertas.append({
-                        'tipo': 'CRÍTICO' if es_critico else 'ADVERTENCIA',
-                        'categoria': 'MORTALIDAD',
-                        'mensaje': f"Mortalidad diaria alta: {round(pct_mortalidad_diaria,2)}% (máx {cfg['mortalidad_diaria_max_pct']}%) - {ultimo.mortalidad} aves el {ultimo.fecha.strftime('%d/%m')}",
-                        'valor': round(pct_mortalidad_diaria, 2),
-                        'prioridad': 'alta' if es_critico else 'media'
-                    })
+        alertas = evaluar_alertas(lote, stats, ultimo, cfg)
 
         return jsonify(alertas)
     except Exception as e:
-        print(f"Error en get_alertas: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error en get_alertas para lote %s", id)
         return jsonify({'mensaje': f'Error al obtener alertas: {str(e)}'}), 500
 
 @app.route('/api/alertas', methods=['GET'])
+@presupuesto_consultas(7)
 @token_required
 def get_alertas_generales(current_user):
     """
@@ -1589,14 +2655,18 @@ def get_alertas_generales(current_user):
             # Filtrar por lote específico
             return get_alertas(current_user, lote_id)
 
-        lotes = Lote.query.filter_by(estado='activo').all()
+        # Antes de cargar los lotes: si crea la configuración, su commit expiraría lo cargado
         cfg = get_configuracion_valores()
+        lotes = Lote.query.filter_by(estado='activo').all()
         resultados = []
         
+        ultimos = ultimos_registros([l.id for l in lotes])
+        estadisticas = estadisticas_lotes(lotes)
+        
         for lote in lotes:
             try:
-                stats = calcular_estadisticas(lote)
-                ultimo = RegistroDiario.query.filter_by(lote_id=lote.id).order_by(RegistroDiario.fecha.desc()).first()
+                stats = estadisticas[lote.id]
+                ultimo = ultimos.get(lote.id)
                 
                 # Si no hay registros para este lote, continuar con el siguiente
                 if not ultimo:
@@ -1672,16 +2742,12 @@ def get_alertas_generales(current_user):
                             })
                 
             except Exception as e:
-                print(f"Error procesando alertas para lote {lote.id}: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                log.exception("Error procesando alertas para lote %s", lote.id)
                 continue
         
         return jsonify(resultados)
     except Exception as e:
-        print(f"Error en get_alertas_generales: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error en get_alertas_generales")
         return jsonify({'mensaje': f'Error al obtener alertas: {str(e)}'}), 500
 
 @app.route('/api/configuracion', methods=['GET'])
@@ -1726,18 +2792,13 @@ def update_configuracion_api(current_user):
 # ============= RUTAS - ENFERMEDADES =============
 
 @app.route('/api/enfermedades', methods=['GET'])
+@presupuesto_consultas(3)  # +1 con total=true
 @token_required
 def listar_enfermedades(current_user):
+    """Orden alfabético. Paginación: limit, cursor, total."""
     try:
-        enfermedades = Enfermedad.query.order_by(Enfermedad.nombre.asc()).all()
-        return jsonify([{
-            'id': e.id,
-            'nombre': e.nombre,
-            'sintomas': e.sintomas,
-            'prevencion': e.prevencion,
-            'tratamiento': e.tratamiento,
-            'medicamentos': e.medicamentos
-        } for e in enfermedades])
+        return responder_listado(Enfermedad.query, (Enfermedad.nombre, Enfermedad.id), serializar_enfermedad,
+                                 descendente=False)
     except Exception as e:
         return jsonify({'mensaje': f'Error al listar enfermedades: {str(e)}'}), 500
 
@@ -1806,6 +2867,10 @@ def actualizar_enfermedad(current_user, id):
 def eliminar_enfermedad(current_user, id):
     try:
         e = Enfermedad.query.get_or_404(id)
+        # Desvincular los registros sanitarios que la referencian (respeta la clave foránea)
+        referencia = Sanidad.enfermedad_id == id
+        registrar_cambios_por_consulta(Sanidad, referencia)
+        Sanidad.query.filter(referencia).update({'enfermedad_id': None}, synchronize_session=False)
         db.session.delete(e)
         db.session.commit()
         return jsonify({'mensaje': 'Enfermedad eliminada'})
@@ -1814,151 +2879,182 @@ def eliminar_enfermedad(current_user, id):
         return jsonify({'mensaje': f'Error al eliminar enfermedad: {str(e)}'}), 500
 
 # ============= RUTA - QR POR LOTE =============
+
+# Imágenes QR generadas una vez y reutilizadas desde EXPORT_FOLDER/qr
+cache_qr = CacheQR(os.path.join(app.config.get('EXPORT_FOLDER') or os.path.join(BASE_DIR, 'instance', 'exports'), 'qr'))
+
+def url_publica_lote(lote_id):
+    """URL que va dentro del QR: PUBLIC_LOTE_BASE_URL/<id> si está configurada; si no, la página pública de este host"""
+    base_public_url = os.environ.get('PUBLIC_LOTE_BASE_URL')
+    if base_public_url:
+        return f"{base_public_url.rstrip('/')}/{lote_id}"
+    return request.host_url.rstrip('/') + f"/public/lote/{lote_id}"
+
+def responder_qr_no_disponible():
+    return jsonify({
+        'mensaje': 'Dependencia qrcode no instalada',
+        'detalle': 'Ejecutar: pip install qrcode[pil]'
+    }), 500
+
 @app.route('/api/lotes/<int:id>/qr', methods=['GET'])
+@presupuesto_consultas(2)
 @token_required
 def generar_qr_lote(current_user, id):
-    """Genera un PNG con un QR que contiene una URL pública del lote.
-    La URL base puede configurarse con PUBLIC_LOTE_BASE_URL; por defecto, ejemplo genérico."""
-    if not QRCODE_AVAILABLE:
-        return jsonify({
-            'mensaje': 'Dependencia qrcode no instalada',
-            'detalle': 'Ejecutar: pip install qrcode[pil]'
-        }), 500
-    
+    """Imagen del QR con la URL pública del lote. formato=png (por defecto) | svg.
+    La imagen se genera una sola vez por URL y formato; luego se envía desde disco."""
+    if not QRCODE_DISPONIBLE:
+        return responder_qr_no_disponible()
+
     try:
-        lote = Lote.query.get_or_404(id)
-        # Construir URL pública: si existe env var se usa, si no se usa la propia página pública local
-        base_public_url = os.environ.get('PUBLIC_LOTE_BASE_URL')
-        if base_public_url:
-            payload_url = f"{base_public_url.rstrip('/')}/{lote.id}"
-        else:
-            # Usar host actual para la página pública HTML
-            payload_url = request.host_url.rstrip('/') + f"/public/lote/{lote.id}"
-        
-        # Generar QR
-        img = qrcode.make(payload_url)
-        buf = io.BytesIO()
-        img.save(buf, format='PNG')
-        buf.seek(0)
-        return send_file(buf, mimetype='image/png', download_name=f'lote_{lote.id}_qr.png')
-    except Exception as e:
-        print(f"Error generando QR para lote {id}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        formato = (request.args.get('formato') or 'png').lower()
+        if formato not in FORMATOS_QR:
+            return jsonify({'mensaje': f"formato debe ser uno de: {', '.join(FORMATOS_QR)}"}), 400
+        if db.session.get(Lote, id, options=[load_only(Lote.id)]) is None:
+            return jsonify({'mensaje': 'Lote no encontrado'}), 404
+        ruta = cache_qr.obtener(url_publica_lote(id), formato)
+        respuesta = send_file(ruta, mimetype=FORMATOS_QR[formato], download_name=f'lote_{id}_qr.{formato}',
+                              conditional=True, etag=True, max_age=None)
+        respuesta.headers['Cache-Control'] = 'private, max-age=86400'
+        return respuesta
+    except Exception as e:
+        log.exception("Error generando QR para lote %s", id)
         return jsonify({'mensaje': f'Error al generar QR: {str(e)}'}), 500
 
+@app.route('/api/lotes/etiquetas-qr', methods=['GET'])
+@presupuesto_consultas(2)
+@token_required
+def etiquetas_qr_lotes(current_user):
+    """PDF para imprimir con una etiqueta QR por lote (12 por hoja A4).
+    Parámetros: ids=1,2,3 para elegir lotes; sin ids se usan todos los lotes activos."""
+    if not QRCODE_DISPONIBLE:
+        return responder_qr_no_disponible()
+    if not REPORTLAB_DISPONIBLE:
+        return jsonify({'mensaje': 'reportlab no instalado', 'detalle': 'Ejecutar: pip install reportlab'}), 500
+
+    try:
+        consulta = Lote.query.options(load_only(Lote.id, Lote.nombre, Lote.galpon, Lote.genetica, Lote.fecha_inicio))
+        if request.args.get('ids'):
+            try:
+                ids = [int(v) for v in request.args['ids'].split(',') if v.strip()]
+            except ValueError:
+                return jsonify({'mensaje': 'ids debe ser una lista de números separados por coma'}), 400
+            consulta = consulta.filter(Lote.id.in_(ids))
+        else:
+            consulta = consulta.filter(Lote.estado == 'activo')
+        lotes = consulta.order_by(Lote.galpon, Lote.nombre, Lote.id).all()
+        if not lotes:
+            return jsonify({'mensaje': 'No hay lotes para imprimir'}), 404
+
+        etiquetas = [{
+            'url': url_publica_lote(l.id),
+            'titulo': l.nombre,
+            'lineas': [
+                f"Lote #{l.id}" + (f" · Galpón {l.galpon}" if l.galpon else ''),
+                f"Inicio {l.fecha_inicio.strftime('%d/%m/%Y')}" + (f" · {l.genetica}" if l.genetica else ''),
+            ],
+        } for l in lotes]
+        pdf = hoja_etiquetas_pdf(etiquetas, cache_qr, titulo='Etiquetas QR de lotes')
+        return send_file(io.BytesIO(pdf), mimetype='application/pdf',
+                         download_name=f"etiquetas_qr_{datetime.now().strftime('%Y%m%d')}.pdf")
+    except Exception as e:
+        log.exception("Error generando etiquetas QR")
+        return jsonify({'mensaje': f'Error al generar etiquetas QR: {str(e)}'}), 500
+
 # ============= RUTA PÚBLICA - RESUMEN DE LOTE =============
+
+# Se abren escaneando QR, sin token: respuesta en caché unos segundos y límite de peticiones por IP
+cache_publico = CacheTTL(app.config['PUBLICO_CACHE_SEG'])
+limitador_publico = LimitadorTokens(app.config['PUBLICO_LIMITE_POR_MINUTO'], app.config['PUBLICO_LIMITE_RAFAGA'])
+
+def resumen_publico(lote):
+    """Resumen del lote sin datos sensibles ni costos/ingresos detallados"""
+    stats = calcular_estadisticas(lote)
+    return {
+        'id': lote.id,
+        'nombre': lote.nombre,
+        'fecha_inicio': lote.fecha_inicio.isoformat(),
+        'fecha_sacrificio': (lote.fecha_inicio + timedelta(days=lote.dias_ciclo or 42)).isoformat(),
+        'dias_ciclo': lote.dias_ciclo or 42,
+        'dias_transcurridos': stats.get('dias_transcurridos'),
+        'dias_restantes': (lote.dias_ciclo or 42) - stats.get('dias_transcurridos', 0),
+        'genetica': lote.genetica,
+        'cantidad_inicial': lote.cantidad_inicial,
+        'cantidad_actual': stats.get('cantidad_actual'),
+        'peso_promedio_actual_g': stats.get('peso_actual'),
+        'fcr': stats.get('fcr'),
+        'adg_g_dia': stats.get('adg'),
+        'mortalidad_porcentaje': stats.get('mortalidad_porcentaje')
+    }
+
 @app.route('/api/public/lotes/<int:id>', methods=['GET'])
+@presupuesto_consultas(4)
+@limitar_peticiones(limitador_publico)
 def obtener_lote_publico(id):
     """Endpoint público (sin token) que expone un resumen del lote.
-    No incluye datos sensibles ni costos/ingresos detallados."""
+    La respuesta (también el 404) se guarda PUBLICO_CACHE_SEG segundos y sale con
+    Cache-Control público y ETag, para que navegadores y proxies también la reutilicen."""
     try:
-        lote = Lote.query.get_or_404(id)
-        stats = calcular_estadisticas(lote)
-        resumen = {
-            'id': lote.id,
-            'nombre': lote.nombre,
-            'fecha_inicio': lote.fecha_inicio.isoformat(),
-            'fecha_sacrificio': (lote.fecha_inicio + timedelta(days=lote.dias_ciclo or 42)).isoformat(),
-            'dias_ciclo': lote.dias_ciclo or 42,
-            'dias_transcurridos': stats.get('dias_transcurridos'),
-            'dias_restantes': (lote.dias_ciclo or 42) - stats.get('dias_transcurridos', 0),
-            'genetica': lote.genetica,
-            'cantidad_inicial': lote.cantidad_inicial,
-            'cantidad_actual': stats.get('cantidad_actual'),
-            'peso_promedio_actual_g': stats.get('peso_actual'),
-            'fcr': stats.get('fcr'),
-            'adg_g_dia': stats.get('adg'),
-            'mortalidad_porcentaje': stats.get('mortalidad_porcentaje')
-        }
-        return jsonify(resumen)
+        guardada = cache_publico.obtener(id)
+        if guardada is None:
+            lote = Lote.query.filter_by(id=id).first()
+            if lote is None:
+                guardada = (404, app.json.dumps({'mensaje': 'Lote no encontrado'}))
+            else:
+                guardada = (200, app.json.dumps(resumen_publico(lote)))
+            cache_publico.guardar(id, guardada)
+
+        status, cuerpo = guardada
+        respuesta = app.response_class(cuerpo, status=status, mimetype='application/json')
+        respuesta.headers['Cache-Control'] = f"public, max-age={app.config['PUBLICO_CACHE_SEG']}"
+        if status == 200:
+            respuesta.add_etag()
+            respuesta.make_conditional(request)
+        return respuesta
     except Exception as e:
         return jsonify({'mensaje': f'Error al obtener lote público: {str(e)}'}), 500
 
+def renderizar_pagina_publica(lote_id):
+    """HTML de la página pública del lote, o None si no existe. Desde el hilo de fondo
+    (sin petición) lee siempre del primario."""
+    with app.app_context():
+        lote = Lote.query.filter_by(id=lote_id).first()
+        return renderizar_pagina_lote(resumen_publico(lote)) if lote is not None else None
+
+# Páginas ya renderizadas en DATA_DIR/publico; se regeneran al confirmar cambios del lote
+paginas_publicas = PaginasPublicas(
+    app.config.get('PUBLICO_FOLDER') or os.path.join(BASE_DIR, 'instance', 'publico'),
+    renderizar_pagina_publica
+)
+
 @app.route('/public/lote/<int:id>', methods=['GET'])
+@limitar_peticiones(limitador_publico)
 def pagina_publica_lote(id):
-        """Página pública simple en HTML que consume el JSON del lote."""
-        try:
-                # Verificar existencia del lote para responder 404 si no existe
-                Lote.query.get_or_404(id)
-                # HTML minimalista con fetch al endpoint público JSON
-                html = f"""<!DOCTYPE html>
-<html lang='es'>
-<head>
-    <meta charset='utf-8'>
-    <meta name='viewport' content='width=device-width, initial-scale=1'>
-    <title>Reporte público del lote #{id}</title>
-    <style>
-        :root {{
-            --bg: #0f172a; --card:#0b1220; --text:#e2e8f0; --muted:#94a3b8; --border:#334155; --accent:#2563eb;
-        }}
-        body {{ margin:0; font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; background: var(--bg); color: var(--text); }}
-        .container {{ max-width: 720px; margin: 0 auto; padding: 1.25rem; }}
-        .card {{ background: var(--card); border:1px solid var(--border); border-radius:12px; padding:1.25rem; box-shadow: 0 1px 3px rgba(0,0,0,.5); }}
-        h1 {{ font-size:1.5rem; margin: 0 0 0.75rem; color: var(--text); }}
-        .muted {{ color: var(--muted); }}
-        .grid {{ display:grid; grid-template-columns: repeat(auto-fit, minmax(200px,1fr)); gap:.75rem; margin-top: .75rem; }}
-        .stat {{ background:#0f172a; border:1px solid var(--border); border-radius:10px; padding:.75rem; }}
-        .label {{ font-size:.75rem; color:var(--muted); text-transform:uppercase; letter-spacing:.04em; }}
-        .value {{ font-size:1.1rem; font-weight:600; }}
-        .header {{ display:flex; align-items:center; justify-content:space-between; margin-bottom: .75rem; }}
-        a.btn {{ display:inline-block; background:var(--accent); color:white; padding:.5rem .75rem; border-radius:8px; text-decoration:none; font-weight:600; }}
-    </style>
-    <script>
-        async function load() {{
-            try {{
-                const res = await fetch('/api/public/lotes/{id}');
-                if (!res.ok) throw new Error('No encontrado');
-                const d = await res.json();
-                document.getElementById('title').textContent = `Lote #${{d.id}} · ${{d.nombre || ''}}`;
-                document.getElementById('inicio').textContent = new Date(d.fecha_inicio).toLocaleDateString('es-CO');
-                document.getElementById('sacrificio').textContent = new Date(d.fecha_sacrificio).toLocaleDateString('es-CO');
-                document.getElementById('dias').textContent = `${{d.dias_transcurridos}} / ${{d.dias_ciclo}} días`;
-                document.getElementById('restantes').textContent = d.dias_restantes;
-                document.getElementById('genetica').textContent = d.genetica || '-';
-                document.getElementById('aves').textContent = `${{d.cantidad_actual}} / ${{d.cantidad_inicial}}`;
-                document.getElementById('peso').textContent = (d.peso_promedio_actual_g ?? '-') + ' g';
-                document.getElementById('fcr').textContent = d.fcr ?? '-';
-                document.getElementById('adg').textContent = (d.adg_g_dia ?? '-') + ' g/día';
-                document.getElementById('mort').textContent = (d.mortalidad_porcentaje ?? 0) + '%';
-            }} catch(e) {{
-                document.getElementById('root').innerHTML = '<div class="card"><p>⚠️ Lote no disponible o enlace inválido.</p></div>';
-            }}
-        }}
-        addEventListener('DOMContentLoaded', load);
-    </script>
-</head>
-<body>
-    <div class='container'>
-        <div class='card'>
-            <div class='header'>
-                <h1 id='title'>Lote #{id}</h1>
-                <a class='btn' href='/api/public/lotes/{id}' target='_blank' rel='noopener'>Ver JSON</a>
-            </div>
-            <div class='grid'>
-                <div class='stat'><div class='label'>Inicio</div><div class='value' id='inicio'>-</div></div>
-                <div class='stat'><div class='label'>Sacrificio</div><div class='value' id='sacrificio'>-</div></div>
-                <div class='stat'><div class='label'>Ciclo</div><div class='value' id='dias'>-</div></div>
-                <div class='stat'><div class='label'>Restantes</div><div class='value' id='restantes'>-</div></div>
-                <div class='stat'><div class='label'>Genética</div><div class='value' id='genetica'>-</div></div>
-                <div class='stat'><div class='label'>Aves</div><div class='value' id='aves'>-</div></div>
-                <div class='stat'><div class='label'>Peso Prom.</div><div class='value' id='peso'>-</div></div>
-                <div class='stat'><div class='label'>FCR</div><div class='value' id='fcr'>-</div></div>
-                <div class='stat'><div class='label'>ADG</div><div class='value' id='adg'>-</div></div>
-                <div class='stat'><div class='label'>Mortalidad</div><div class='value' id='mort'>-</div></div>
-            </div>
-            <p class='muted' style='margin-top:.75rem;'>Enlace generado automáticamente. Compartible sin iniciar sesión.</p>
-        </div>
-    </div>
-</body>
-</html>"""
-                return app.response_class(html, mimetype='text/html')
-        except Exception as e:
-                return jsonify({'mensaje': f'Error al cargar página pública del lote: {str(e)}'}), 500
+    """Página pública del lote (la que abre el QR) con el resumen ya incluido en el HTML.
+    Se envía el archivo pre-renderizado. Si falta o es de otro día se renderiza solo para
+    esta respuesta y se encola su regeneración: la petición puede leer de la réplica,
+    así que nunca escribe el archivo (lo hace el hilo de fondo, que lee del primario)."""
+    try:
+        ruta = paginas_publicas.vigente(id)
+        if ruta is not None:
+            respuesta = send_file(ruta, mimetype='text/html', conditional=True, etag=True, max_age=None)
+        else:
+            html = renderizar_pagina_publica(id)
+            if html is None:
+                return app.response_class(PAGINA_NO_DISPONIBLE, status=404, mimetype='text/html')
+            paginas_publicas.programar([id])
+            respuesta = app.response_class(html, mimetype='text/html')
+            respuesta.add_etag()
+            respuesta.make_conditional(request)
+        respuesta.headers['Cache-Control'] = f"public, max-age={app.config['PUBLICO_CACHE_SEG']}"
+        return respuesta
+    except Exception as e:
+        log.exception("Error en página pública del lote %s", id)
+        return jsonify({'mensaje': f'Error al cargar página pública del lote: {str(e)}'}), 500
 
 # ============= RUTAS - COMPARACIÓN Y ANÁLISIS =============
 
 @app.route('/api/comparar-lotes', methods=['POST'])
+@presupuesto_consultas(5)
 @token_required
 def comparar_lotes(current_user):
     try:
@@ -1969,11 +3065,13 @@ def comparar_lotes(current_user):
             return jsonify({'mensaje': 'Se requieren al menos 2 lotes para comparar'}), 400
         
         comparacion = []
+        lotes = {l.id: l for l in Lote.query.filter(Lote.id.in_([int(i) for i in lote_ids]))}
+        estadisticas = estadisticas_lotes(lotes.values())
         
         for lote_id in lote_ids:
-            lote = Lote.query.get(lote_id)
+            lote = lotes.get(int(lote_id))
             if lote:
-                stats = calcular_estadisticas(lote)
+                stats = estadisticas[lote.id]
                 comparacion.append({
                     'id': lote.id,
                     'nombre': lote.nombre,
@@ -1990,6 +3088,7 @@ def comparar_lotes(current_user):
         return jsonify({'mensaje': f'Error al comparar lotes: {str(e)}'}), 500
 
 @app.route('/api/estadisticas-generales', methods=['GET'])
+@presupuesto_consultas(5)
 @token_required
 def get_estadisticas_generales(current_user):
     try:
@@ -2008,7 +3107,7 @@ def get_estadisticas_generales(current_user):
         
         # Promedios de lotes finalizados
         if lotes_finalizados:
-            stats_finalizados = [calcular_estadisticas(l) for l in lotes_finalizados]
+            stats_finalizados = list(estadisticas_lotes(lotes_finalizados).values())
             fcr_promedio = sum(s['fcr'] for s in stats_finalizados) / len(stats_finalizados)
             mortalidad_promedio = sum(s['mortalidad_porcentaje'] for s in stats_finalizados) / len(stats_finalizados)
             rentabilidad_promedio = sum(s['rentabilidad'] for s in stats_finalizados) / len(stats_finalizados)
@@ -2032,6 +3131,7 @@ def get_estadisticas_generales(current_user):
 # ============= RUTAS - EXPORTACIÓN =============
 
 @app.route('/api/lotes/<int:id>/export', methods=['GET'])
+@presupuesto_consultas(5)
 @token_required
 def exportar_lote_semana(current_user, id):
     """Exporta un resumen semanal del lote en PDF o Excel.
@@ -2074,7 +3174,7 @@ def exportar_lote_semana(current_user, id):
             Costo.fecha <= end_date
         ).order_by(Costo.fecha.asc()).all()
 
-        sanidad_semana = Sanidad.query.filter(
+        sanidad_semana = Sanidad.query.options(joinedload(Sanidad.enfermedad)).filter(
             Sanidad.lote_id == id,
             Sanidad.fecha >= start_date,
             Sanidad.fecha <= end_date
@@ -2293,6 +3393,7 @@ def exportar_lote_semana(current_user, id):
         return jsonify({'mensaje': f'Error al exportar: {str(e)}'}), 500
 
 @app.route('/api/lotes/<int:id>/exportar-csv', methods=['GET'])
+@presupuesto_consultas(3)
 @token_required
 def exportar_csv(current_user, id):
     try:
@@ -2330,13 +3431,393 @@ def exportar_csv(current_user, id):
     except Exception as e:
         return jsonify({'mensaje': f'Error al exportar CSV: {str(e)}'}), 500
 
+# ============= SERVICIOS - ARCHIVO DE LOTES FINALIZADOS =============
+
+# Tablas de detalle que se mueven al archivo (nombre de tabla -> modelo)
+TABLAS_ARCHIVABLES = {
+    'registros_diarios': RegistroDiario,
+    'costos': Costo,
+    'ingresos': Ingreso,
+    'sanidad': Sanidad,
+}
+
+def archivar_lote(lote):
+    """Congela el resumen del lote, guarda su detalle comprimido en lotes_archivados y lo borra
+    de las tablas calientes. No hace commit."""
+    if lote.estado != 'finalizado':
+        raise ValueError('Solo se pueden archivar lotes finalizados')
+    if lotes_archivados_entre([lote.id]):
+        raise ValueError('El lote ya está archivado')
+
+    resumen = {
+        'estadisticas': calcular_estadisticas(lote, {}),
+        'economia': resumenes_economicos([lote.id])[lote.id],
+    }
+    filas = {}
+    for nombre, modelo in TABLAS_ARCHIVABLES.items():
+        tabla = modelo.__table__
+        filas[nombre] = [dict(f) for f in db.session.execute(select(tabla).where(tabla.c.lote_id == lote.id)).mappings()]
+    resumen['filas'] = {nombre: len(v) for nombre, v in filas.items()}
+    datos = comprimir_filas(filas)
+
+    db.session.add(LoteArchivado(
+        lote_id=lote.id,
+        resumen=json.dumps(resumen),
+        filas=sum(resumen['filas'].values()),
+        bytes_comprimidos=len(datos),
+        datos=datos
+    ))
+    for modelo in TABLAS_ARCHIVABLES.values():
+        registrar_cambios_por_consulta(modelo, modelo.lote_id == lote.id, operacion='delete')
+        modelo.query.filter_by(lote_id=lote.id).delete(synchronize_session=False)
+    db.session.expire(lote, ['registros', 'costos', 'ingresos', 'sanidad'])
+    return resumen
+
+def restaurar_lote(lote_id):
+    """Devuelve el detalle archivado del lote a las tablas calientes con sus ids originales. No hace commit."""
+    archivo = db.session.get(LoteArchivado, lote_id)
+    if archivo is None:
+        raise ValueError('El lote no está archivado')
+    filas = descomprimir_filas(archivo.datos, {n: m.__table__ for n, m in TABLAS_ARCHIVABLES.items()})
+
+    # Enfermedades borradas mientras el lote estaba archivado
+    enfermedades = {eid for (eid,) in db.session.query(Enfermedad.id).all()}
+    for fila in filas.get('sanidad', []):
+        if fila.get('enfermedad_id') not in enfermedades:
+            fila['enfermedad_id'] = None
+
+    restauradas = {}
+    for nombre, modelo in TABLAS_ARCHIVABLES.items():
+        lista = filas.get(nombre) or []
+        if lista:
+            db.session.execute(insert(modelo.__table__), lista)
+            registrar_cambios(modelo, [(f['id'], lote_id) for f in lista])
+        restauradas[nombre] = len(lista)
+    db.session.delete(archivo)
+    return restauradas
+
+def archivar_lotes_antiguos(meses):
+    """Archiva los lotes finalizados hace más de `meses` meses, un lote por transacción."""
+    corte = datetime.now().date() - timedelta(days=int(meses * 30.44))
+    candidatos = (
+        Lote.query.outerjoin(LoteArchivado)
+        .filter(
+            Lote.estado == 'finalizado',
+            LoteArchivado.lote_id.is_(None),
+            func.coalesce(Lote.fecha_fin, Lote.fecha_inicio) < corte
+        )
+        .order_by(Lote.id)
+        .all()
+    )
+    archivados = []
+    for lote in candidatos:
+        try:
+            resumen = archivar_lote(lote)
+            db.session.commit()
+            archivados.append({'lote_id': lote.id, 'nombre': lote.nombre, 'filas': resumen['filas']})
+        except Exception:
+            db.session.rollback()
+            log.exception("No se pudo archivar el lote %s", lote.id)
+    if archivados:
+        log.info("Lotes archivados: %s", ', '.join(str(a['lote_id']) for a in archivados))
+    return {'corte': corte.isoformat(), 'archivados': archivados}
+
+# ============= RUTAS - ARCHIVO DE LOTES =============
+
+@app.route('/api/lotes/archivados', methods=['GET'])
+@presupuesto_consultas(2)
+@token_required
+def listar_lotes_archivados(current_user):
+    """Lotes archivados con su resumen congelado (estadísticas y economía)."""
+    try:
+        archivos = (
+            db.session.query(Lote, LoteArchivado)
+            .join(LoteArchivado, LoteArchivado.lote_id == Lote.id)
+            .order_by(Lote.fecha_inicio.desc())
+            .all()
+        )
+        return jsonify([{
+            **serializar_lote(lote),
+            'archivado_en': archivo.archivado_en.isoformat(),
+            'filas_archivadas': archivo.filas,
+            'bytes_comprimidos': archivo.bytes_comprimidos,
+            'resumen': json.loads(archivo.resumen)
+        } for lote, archivo in archivos])
+    except Exception as e:
+        return jsonify({'mensaje': f'Error al listar lotes archivados: {str(e)}'}), 500
+
+@app.route('/api/lotes/<int:id>/archivar', methods=['POST'])
+@token_required
+def archivar_lote_ruta(current_user, id):
+    try:
+        lote = Lote.query.get_or_404(id)
+        try:
+            resumen = archivar_lote(lote)
+        except ValueError as e:
+            return jsonify({'mensaje': str(e)}), 400
+        db.session.commit()
+        return jsonify({'mensaje': 'Lote archivado exitosamente', 'filas': resumen['filas']})
+    except Exception as e:
+        db.session.rollback()
+        log.exception("Error al archivar lote %s", id)
+        return jsonify({'mensaje': f'Error al archivar lote: {str(e)}'}), 500
+
+@app.route('/api/lotes/<int:id>/restaurar', methods=['POST'])
+@token_required
+def restaurar_lote_ruta(current_user, id):
+    try:
+        Lote.query.get_or_404(id)
+        try:
+            restauradas = restaurar_lote(id)
+        except ValueError as e:
+            return jsonify({'mensaje': str(e)}), 400
+        db.session.commit()
+        return jsonify({'mensaje': 'Lote restaurado exitosamente', 'filas': restauradas})
+    except Exception as e:
+        db.session.rollback()
+        log.exception("Error al restaurar lote %s", id)
+        return jsonify({'mensaje': f'Error al restaurar lote: {str(e)}'}), 500
+
+# ============= RUTAS - SINCRONIZACIÓN INCREMENTAL =============
+
+SERIALIZADORES_SYNC = {
+    'lotes': (Lote, serializar_lote),
+    'registros': (RegistroDiario, serializar_registro),
+    'costos': (Costo, serializar_costo),
+    'ingresos': (Ingreso, serializar_ingreso),
+    'sanidad': (Sanidad, serializar_sanidad),
+    'enfermedades': (Enfermedad, serializar_enfermedad),
+}
+
+@app.route('/api/sync', methods=['GET'])
+@presupuesto_consultas(2 + len(SERIALIZADORES_SYNC))  # usuario, bitácora y una por entidad con cambios
+@token_required
+def sincronizar(current_user):
+    """Devuelve las filas creadas, modificadas o eliminadas desde el cursor `since`.
+    Parámetros:
+      - since: cursor devuelto por la llamada anterior (0 o ausente = réplica completa)
+      - limit: cambios por página (máx SYNC_MAX_PAGINA)
+    Si `hay_mas` es true, volver a llamar con el nuevo `cursor`. Responde 410 si el cursor
+    es anterior a bajas ya podadas de la bitácora: hay que volver a empezar con since=0.
+    Los ids de la bitácora siguen el orden de confirmación (ver bloquear_bitacora), así que
+    el cursor nunca deja atrás una transacción que confirme más tarde."""
+    try:
+        since = request.args.get('since', 0, type=int)
+        limite = min(max(request.args.get('limit', 500, type=int), 1), app.config['SYNC_MAX_PAGINA'])
+
+        cambios = (
+            Cambio.query
+            .filter(Cambio.id > since)
+            .order_by(Cambio.id)
+            .limit(limite + 1)
+            .all()
+        )
+        hay_mas = len(cambios) > limite
+        cambios = cambios[:limite]
+
+        # Último estado por fila dentro de la página
+        ultimo = {}
+        for c in cambios:
+            if c.operacion == 'poda':
+                # Marca de podar_bitacora: las bajas hasta entidad_id ya no están
+                if since and c.entidad_id > since:
+                    return jsonify({'mensaje': 'Cursor demasiado antiguo: sincronizar de nuevo desde since=0',
+                                    'reiniciar': True}), 410
+                continue
+            ultimo[(c.entidad, c.entidad_id)] = c.operacion
+
+        resultado = {entidad: {'upsert': [], 'delete': []} for entidad in SERIALIZADORES_SYNC}
+        pendientes = defaultdict(list)
+        for (entidad, entidad_id), operacion in ultimo.items():
+            if entidad not in resultado:
+                continue
+            if operacion == 'delete':
+                resultado[entidad]['delete'].append(entidad_id)
+            else:
+                pendientes[entidad].append(entidad_id)
+
+        # Una consulta por entidad para el estado actual de las filas modificadas
+        for entidad, ids in pendientes.items():
+            modelo, serializar = SERIALIZADORES_SYNC[entidad]
+            consulta = modelo.query.filter(modelo.id.in_(ids))
+            if modelo is Sanidad:
+                consulta = consulta.options(joinedload(Sanidad.enfermedad))
+            filas = consulta.all()
+            encontrados = set()
+            for fila in filas:
+                encontrados.add(fila.id)
+                resultado[entidad]['upsert'].append(serializar(fila))
+            # Borradas después del cambio registrado (su baja llegará en una página posterior)
+            resultado[entidad]['delete'].extend(i for i in ids if i not in encontrados)
+
+        return jsonify({
+            'cursor': cambios[-1].id if cambios else since,
+            'hay_mas': hay_mas,
+            'cambios': {k: v for k, v in resultado.items() if v['upsert'] or v['delete']}
+        })
+    except Exception as e:
+        log.exception("Error en sincronización")
+        return jsonify({'mensaje': f'Error al sincronizar: {str(e)}'}), 500
+
+def podar_bitacora(retencion_dias):
+    """
+    Acota la bitácora de /api/sync. Borra las filas que otra posterior de la misma entidad
+    deja sin efecto (el cliente recibe igual el estado final) y las bajas con más de
+    `retencion_dias` días. Si borra bajas deja una marca 'poda' con el mayor id borrado:
+    los clientes con un cursor anterior reciben 410 y vuelven a sincronizar desde cero.
+    """
+    corte = datetime.utcnow() - timedelta(days=retencion_dias)
+    posterior = aliased(Cambio)
+    reemplazadas = db.session.execute(
+        delete(Cambio)
+        .where(Cambio.operacion != 'poda', select(posterior.id).where(
+            posterior.entidad == Cambio.entidad,
+            posterior.entidad_id == Cambio.entidad_id,
+            posterior.id > Cambio.id
+        ).exists())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    tope = db.session.scalar(
+        select(func.max(Cambio.id)).where(Cambio.operacion == 'delete', Cambio.created_at < corte)
+    )
+    bajas = 0
+    if tope is not None:
+        # La marca va antes de borrar: la fila con el mayor id nunca se borra y SQLite no reutiliza ids
+        conexion = conexion_bitacora(db.session)
+        bloquear_bitacora(conexion)
+        marca = conexion.execute(
+            insert(Cambio.__table__).values(entidad='bitacora', entidad_id=tope, operacion='poda')
+        ).inserted_primary_key[0]
+        bajas = db.session.execute(
+            delete(Cambio)
+            .where(Cambio.operacion == 'delete', Cambio.id <= tope)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.execute(
+            delete(Cambio)
+            .where(Cambio.operacion == 'poda', Cambio.id < marca)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    log.info("Bitácora podada: %s cambios reemplazados y %s bajas anteriores a %s", reemplazadas, bajas, corte)
+    return {'corte': corte.isoformat(), 'reemplazadas': reemplazadas, 'bajas': bajas, 'tope_bajas': tope}
+
+# ============= RUTAS - PETICIONES AGRUPADAS =============
+
+def ruta_batch(ruta):
+    """Ruta de la API (/api/...) de una petición agrupada; acepta también rutas relativas a /api"""
+    if not isinstance(ruta, str) or not ruta.startswith('/') or ruta.startswith('//'):
+        raise ValueError(f'Ruta inválida: {ruta!r} (debe empezar con /)')
+    if not ruta.startswith('/api/'):
+        ruta = '/api' + ruta
+    if ruta.split('?')[0].rstrip('/') == '/api/batch':
+        raise ValueError('No se puede anidar /api/batch')
+    return ruta
+
+def ejecutar_subpeticion(ruta, cabeceras):
+    """
+    Ejecuta GET `ruta` sin salir del contexto de aplicación actual: comparte la
+    sesión de base de datos (y su identity map) con las demás subpeticiones.
+    Devuelve (endpoint, status, cuerpo).
+    """
+    with app.test_request_context(ruta, method='GET', base_url=request.host_url, headers=cabeceras,
+                                  environ_base={'REMOTE_ADDR': request.remote_addr}):
+        try:
+            rv = app.preprocess_request()
+            if rv is None:
+                rv = app.dispatch_request()
+            respuesta = app.make_response(rv)
+        except HTTPException as e:
+            return request.endpoint, e.code, {'mensaje': e.description}
+        except Exception as e:
+            respuesta = app.make_response(app.handle_user_exception(e))
+        status = respuesta.status_code
+        try:
+            if respuesta.is_json:
+                cuerpo = respuesta.get_json()
+            elif respuesta.mimetype.startswith('text/'):
+                cuerpo = respuesta.get_data(as_text=True)
+            else:
+                # Archivos binarios (xlsx, pdf, png): pedirlos directamente
+                status, cuerpo = 406, {'mensaje': f'Respuesta {respuesta.mimetype} no disponible en /api/batch'}
+        finally:
+            respuesta.close()
+        return request.endpoint, status, cuerpo
+
+@app.route('/api/batch', methods=['POST'])
+@token_required
+def peticiones_agrupadas(current_user):
+    """
+    Ejecuta varios GET de la API en una sola petición.
+    Body: {"peticiones": ["/lotes/1", "/lotes/1/estadisticas", ...]} (rutas con o sin /api).
+    Todas usan el token de esta petición, la misma sesión de base de datos y
+    la verificación de usuario ya hecha. Responde {"respuestas": [{ruta, status, cuerpo}]}
+    en el mismo orden; el status de cada una es independiente.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        peticiones = data.get('peticiones') if isinstance(data, dict) else data
+        if not isinstance(peticiones, list) or not peticiones:
+            return jsonify({'mensaje': 'peticiones debe ser una lista de rutas GET'}), 400
+        if len(peticiones) > app.config['BATCH_MAX_PETICIONES']:
+            return jsonify({'mensaje': f"Máximo {app.config['BATCH_MAX_PETICIONES']} peticiones por batch"}), 400
+        rutas = [ruta_batch(r) for r in peticiones]
+
+        cabeceras = {'Authorization': request.headers['Authorization'], 'X-Request-ID': g.get('request_id', '')}
+        if request.headers.get('Cookie'):
+            cabeceras['Cookie'] = request.headers['Cookie']
+
+        respuestas = []
+        presupuesto = 1
+        for original, ruta in zip(peticiones, rutas):
+            endpoint, status, cuerpo = ejecutar_subpeticion(ruta, cabeceras)
+            respuestas.append({'ruta': original, 'status': status, 'cuerpo': cuerpo})
+            parcial = presupuesto_de(app, endpoint)
+            presupuesto = presupuesto + parcial if presupuesto is not None and parcial is not None else None
+        fijar_presupuesto(presupuesto)
+        return jsonify({'respuestas': respuestas})
+    except ValueError as e:
+        return jsonify({'mensaje': str(e)}), 400
+    except Exception as e:
+        log.exception("Error en /api/batch")
+        return jsonify({'mensaje': f'Error al ejecutar batch: {str(e)}'}), 500
+
+# ============= RUTAS - MANTENIMIENTO =============
+
+@app.route('/api/mantenimiento/reconciliar-cantidades', methods=['POST'])
+@token_required
+def reconciliar_cantidades(current_user):
+    """Verifica cantidad_actual de todos los lotes contra la mortalidad registrada.
+    Body opcional: {"corregir": true} para reescribir los lotes descuadrados."""
+    try:
+        data = request.get_json(silent=True) or {}
+        return jsonify(reconciliar_cantidad_actual(corregir=bool(data.get('corregir'))))
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'mensaje': f'Error al reconciliar cantidades: {str(e)}'}), 500
+
+@app.route('/api/mantenimiento/archivar', methods=['POST'])
+@token_required
+def archivar_lotes_finalizados(current_user):
+    """Archiva los lotes finalizados hace más de N meses.
+    Body opcional: {"meses": 12} (por defecto ARCHIVO_MESES)."""
+    try:
+        data = request.get_json(silent=True) or {}
+        meses = float(data.get('meses', app.config['ARCHIVO_MESES']))
+        return jsonify(archivar_lotes_antiguos(meses))
+    except (TypeError, ValueError):
+        return jsonify({'mensaje': 'meses debe ser numérico'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'mensaje': f'Error al archivar lotes: {str(e)}'}), 500
+
 # ============= INICIALIZACIÓN =============
 
 @app.route('/api/init', methods=['POST'])
 def init_database():
     """Inicializa la base de datos con un usuario por defecto"""
     try:
-        db.create_all()
+        migraciones.aplicar(db.engine, log=log)
         
         # Verificar si ya existe un usuario
         if Usuario.query.first():
@@ -2366,9 +3847,9 @@ def init_database():
 
 @app.route('/', methods=['GET'])
 def serve_frontend():
-    """Sirve la SPA del frontend (index.html)."""
+    """Sirve la SPA del frontend (index.html), del build precomprimido si existe."""
     try:
-        return app.send_static_file('index.html')
+        return app.view_functions['static'](filename='index.html')
     except Exception:
         return jsonify({'mensaje': 'Frontend no encontrado', 'ruta': FRONTEND_DIR}), 404
 
@@ -2387,6 +3868,8 @@ def api_info():
             'estadisticas': '/api/lotes/:id/estadisticas',
             'dashboard': '/api/dashboard',
             'alertas': '/api/alertas?lote_id=:id',
+            'ingesta': '/api/ingesta/registros, /api/ingesta/metricas',
+            'sync': '/api/sync?since=:cursor',
             'configuracion': '/api/configuracion',
             'enfermedades': '/api/enfermedades'
         }
@@ -2425,7 +3908,7 @@ def health_check():
     """Endpoint para verificar el estado del servidor"""
     try:
         # Verificar conexión a BD
-        db.session.execute('SELECT 1')
+        db.session.execute(text('SELECT 1'))
         
         # Contar registros básicos
         usuarios_count = Usuario.query.count()
@@ -2440,7 +3923,8 @@ def health_check():
                 'conectado': True,
                 'usuarios': usuarios_count,
                 'lotes': lotes_count,
-                'registros': registros_count
+                'registros': registros_count,
+                'pool': metricas_pool(db.engine)
             },
             'version': '1.0.0'
         }), 200
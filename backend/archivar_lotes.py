@@ -0,0 +1,39 @@
+"""
+Job de archivo de lotes finalizados (detalle comprimido + resumen congelado)
+
+Uso (desde la carpeta backend):
+    python archivar_lotes.py                # archiva los finalizados hace más de ARCHIVO_MESES meses
+    python archivar_lotes.py --meses 6
+    python archivar_lotes.py --restaurar 42 # devuelve el detalle del lote 42 a las tablas
+"""
+import argparse
+import os
+import sys
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import app, db, archivar_lotes_antiguos, restaurar_lote
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Archivo frío de lotes finalizados')
+    parser.add_argument('--meses', type=float, default=app.config['ARCHIVO_MESES'])
+    parser.add_argument('--restaurar', type=int, metavar='LOTE_ID')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.restaurar:
+            try:
+                filas = restaurar_lote(args.restaurar)
+                db.session.commit()
+            except ValueError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            print(f"✅ Lote {args.restaurar} restaurado: {filas}")
+            sys.exit(0)
+
+        resultado = archivar_lotes_antiguos(args.meses)
+
+    print(f"Lotes finalizados antes de {resultado['corte']}: {len(resultado['archivados'])} archivados")
+    for a in resultado['archivados']:
+        print(f"  Lote {a['lote_id']} ({a['nombre']}): {a['filas']}")
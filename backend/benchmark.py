@@ -0,0 +1,350 @@
+"""
+Benchmarks de rendimiento del backend
+
+Uso (desde la carpeta backend):
+    python benchmark.py logging [--peticiones 300]
+    python benchmark.py sqlite [--hilos 8] [--segundos 5]
+    python benchmark.py eliminar [--lotes 200]
+    python benchmark.py json [--filas 2000] [--lotes 30] [--peticiones 100]
+    python benchmark.py compresion [--filas 2000] [--peticiones 100]
+    python benchmark.py auth [--peticiones 300]
+
+Cada benchmark usa una base SQLite temporal y el cliente de pruebas de Flask,
+por lo que no toca la base de datos real ni necesita el servidor corriendo.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Base de datos y carpeta de datos temporales antes de importar la app
+_TMP = tempfile.mkdtemp(prefix='pollo_bench_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_TMP, 'bench.db')}")
+os.environ.setdefault('DATA_DIR', _TMP)
+os.environ.setdefault('INGESTA_SPOOL', 'False')
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import app as backend  # noqa: E402
+from services.logs import configurar_logging  # noqa: E402
+
+
+def _cliente():
+    """Cliente de pruebas autenticado como admin"""
+    cliente = backend.app.test_client()
+    resp = cliente.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    token = resp.get_json()['token']
+    return cliente, {'Authorization': f'Bearer {token}'}
+
+
+def _crear_lote(cliente, headers, nombre='Lote benchmark', cantidad=5000):
+    resp = cliente.post('/api/lotes', json={
+        'nombre': nombre,
+        'fecha_inicio': '2020-01-01',
+        'cantidad_inicial': cantidad,
+        'peso_inicial': 40
+    }, headers=headers)
+    return resp.get_json()['id']
+
+
+def _medir(funcion, repeticiones):
+    """Ejecuta `funcion(i)` y devuelve las latencias en milisegundos"""
+    tiempos = []
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(i)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def _resumen(nombre, tiempos):
+    ordenados = sorted(tiempos)
+    p95 = ordenados[int(len(ordenados) * 0.95) - 1]
+    print(f"  {nombre:<44} media {statistics.mean(tiempos):7.3f} ms · "
+          f"p50 {statistics.median(tiempos):7.3f} ms · p95 {p95:7.3f} ms", file=sys.stderr)
+
+
+def bench_logging(args):
+    """Latencia por petición de crear_registro/actualizar_lote según el modo de logging.
+
+    'sincrono-debug' escribe cada línea de depuración en el hilo de la petición con
+    un StreamHandler. No es el print() que había antes en los handlers (ese código
+    ya no existe y no se puede medir desde aquí); es la referencia más cercana: la
+    misma salida, con la escritura bloqueando la respuesta. Redirigir stdout a un
+    terminal o a un pipe lento para ver la diferencia: python benchmark.py logging | cat
+    """
+    cliente, headers = _cliente()
+    modos = [
+        ('sincrono-debug (StreamHandler)', dict(nivel='DEBUG', asincrono=False)),
+        ('asincrono-debug (QueueHandler)', dict(nivel='DEBUG', asincrono=True)),
+        ('asincrono-info + muestreo 5%', dict(nivel='INFO', asincrono=True, muestreo=0.05)),
+    ]
+    print(f"\nLogging · {args.peticiones} peticiones por modo", file=sys.stderr)
+    for nombre, opciones in modos:
+        configurar_logging(backend.app, formato='texto', **opciones)
+        lote_id = _crear_lote(cliente, headers, nombre=nombre)
+
+        def crear(i):
+            fecha = time.strftime('%Y-%m-%d', time.gmtime(1577836800 + i * 86400))
+            cliente.post(f'/api/lotes/{lote_id}/registros', json={
+                'fecha': fecha, 'alimento_kg': 120.5, 'agua_litros': 240,
+                'mortalidad': 1, 'peso_promedio': 900, 'observaciones': 'benchmark ' * 20
+            }, headers=headers)
+
+        def actualizar(i):
+            cliente.put(f'/api/lotes/{lote_id}', json={'nombre': f'{nombre} {i}'}, headers=headers)
+
+        _resumen(f'{nombre} POST registro', _medir(crear, args.peticiones))
+        _resumen(f'{nombre} PUT lote', _medir(actualizar, args.peticiones))
+
+
+def _carga_concurrente(args):
+    """Mitad de los hilos escribe registros diarios y la otra mitad lee listados, durante `segundos`"""
+    cliente, headers = _cliente()
+    lotes = [_crear_lote(cliente, headers, nombre=f'Lote concurrente {i}') for i in range(args.hilos)]
+    conteo = {'lecturas': 0, 'escrituras': 0, 'errores': 0}
+    lock = threading.Lock()
+    fin = time.monotonic() + args.segundos
+
+    def escritor(lote_id):
+        c = backend.app.test_client()
+        i = 0
+        while time.monotonic() < fin:
+            fecha = time.strftime('%Y-%m-%d', time.gmtime(1577836800 + i * 86400))
+            resp = c.post(f'/api/lotes/{lote_id}/registros', json={
+                'fecha': fecha, 'alimento_kg': 120.5, 'agua_litros': 240, 'mortalidad': 1, 'peso_promedio': 900
+            }, headers=headers)
+            with lock:
+                conteo['escrituras' if resp.status_code == 201 else 'errores'] += 1
+            i += 1
+
+    def lector(lote_id):
+        c = backend.app.test_client()
+        while time.monotonic() < fin:
+            resp = c.get(f'/api/lotes/{lote_id}/registros', headers=headers)
+            resp2 = c.get('/api/lotes', headers=headers)
+            with lock:
+                for r in (resp, resp2):
+                    conteo['lecturas' if r.status_code == 200 else 'errores'] += 1
+
+    hilos = []
+    for i, lote_id in enumerate(lotes):
+        destino = escritor if i % 2 == 0 else lector
+        # Los lectores consultan el lote de un escritor para leer mientras crece
+        hilos.append(threading.Thread(target=destino, args=(lotes[i - i % 2],)))
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return conteo
+
+
+def bench_sqlite(args):
+    """Throughput de lecturas/escrituras concurrentes con y sin el perfil SQLite (WAL, synchronous=NORMAL...).
+
+    Cada perfil corre en un subproceso con su propia base temporal, porque los
+    PRAGMA se aplican al crear las conexiones del motor.
+    """
+    if args.perfil:
+        conteo = _carga_concurrente(args)
+        with backend.app.app_context():
+            modo = backend.db.session.execute(backend.text('PRAGMA journal_mode')).scalar()
+        print(f"  {args.perfil:<12} journal={modo:<8} "
+              f"lecturas {conteo['lecturas'] / args.segundos:8.1f}/s · "
+              f"escrituras {conteo['escrituras'] / args.segundos:7.1f}/s · "
+              f"errores {conteo['errores']}", file=sys.stderr)
+        return
+
+    print(f"\nSQLite · {args.hilos} hilos ({args.hilos // 2 + args.hilos % 2} escritores) · {args.segundos}s por perfil",
+          file=sys.stderr)
+    for perfil, optimizado in (('por-defecto', 'False'), ('optimizado', 'True')):
+        entorno = {k: v for k, v in os.environ.items() if k not in ('DATABASE_URL', 'DATA_DIR')}
+        entorno.update({'SQLITE_OPTIMIZADO': optimizado, 'LOG_LEVEL': 'WARNING'})
+        subprocess.run([sys.executable, os.path.abspath(__file__), 'sqlite', '--perfil', perfil,
+                        '--hilos', str(args.hilos), '--segundos', str(args.segundos)],
+                       env=entorno, check=True)
+
+
+def _sembrar_lotes(cantidad, dias=42):
+    """Inserta `cantidad` lotes con un ciclo completo de registros, costos, ingresos y sanidad"""
+    from datetime import date, timedelta
+    inicio = date(2020, 1, 1)
+    with backend.app.app_context():
+        sesion = backend.db.session
+        ids = sesion.execute(backend.insert(backend.Lote).returning(backend.Lote.id), [
+            {'nombre': f'Granja prueba {i}', 'fecha_inicio': inicio, 'cantidad_inicial': 5000,
+             'cantidad_actual': 5000, 'estado': 'finalizado'} for i in range(cantidad)
+        ]).scalars().all()
+        for lote_id in ids:
+            dias_lote = [inicio + timedelta(days=d) for d in range(dias)]
+            sesion.execute(backend.insert(backend.RegistroDiario), [
+                {'lote_id': lote_id, 'fecha': f, 'alimento_kg': 120.0, 'mortalidad': 1} for f in dias_lote])
+            sesion.execute(backend.insert(backend.Costo), [
+                {'lote_id': lote_id, 'categoria': 'Alimento', 'concepto': 'Bulto', 'monto': 100.0, 'fecha': f}
+                for f in dias_lote[::7]])
+            sesion.execute(backend.insert(backend.Ingreso), [
+                {'lote_id': lote_id, 'cantidad_vendida': 4800, 'peso_promedio': 2.5, 'precio_por_kg': 7.0,
+                 'total': 84000.0, 'fecha': dias_lote[-1]}])
+            sesion.execute(backend.insert(backend.Sanidad), [
+                {'lote_id': lote_id, 'tipo': 'Vacuna', 'producto': 'Newcastle', 'fecha': f} for f in dias_lote[::14]])
+        sesion.commit()
+    return ids
+
+
+def bench_eliminar(args):
+    """Borrar una granja de prueba: un DELETE por lote frente a DELETE /api/lotes?ids=... en una transacción"""
+    cliente, headers = _cliente()
+    cantidad = args.lotes or 200
+    print(f"\nEliminar {cantidad} lotes con ciclo completo (42 registros + costos, ingresos y sanidad)",
+          file=sys.stderr)
+
+    ids = _sembrar_lotes(cantidad)
+    inicio = time.perf_counter()
+    for lote_id in ids:
+        cliente.delete(f'/api/lotes/{lote_id}', headers=headers)
+    uno_a_uno = time.perf_counter() - inicio
+    print(f"  {'DELETE /api/lotes/<id> x ' + str(len(ids)):<44} {uno_a_uno * 1000:9.1f} ms", file=sys.stderr)
+
+    ids = _sembrar_lotes(cantidad)
+    inicio = time.perf_counter()
+    resp = cliente.delete(f"/api/lotes?ids={','.join(map(str, ids))}", headers=headers)
+    masivo = time.perf_counter() - inicio
+    print(f"  {'DELETE /api/lotes?ids=... (1 petición)':<44} {masivo * 1000:9.1f} ms · "
+          f"{len(resp.get_json()['eliminados'])} eliminados", file=sys.stderr)
+
+    with backend.app.app_context():
+        restantes = sum(backend.db.session.query(m).count()
+                        for m in (backend.RegistroDiario, backend.Costo, backend.Ingreso, backend.Sanidad))
+    print(f"  Filas hijas restantes: {restantes}", file=sys.stderr)
+
+
+def bench_json(args):
+    """Serialización de /registros y /dashboard: json estándar frente a orjson (ProveedorJSON)"""
+    from services.json_api import ORJSON_DISPONIBLE
+    from datetime import date, timedelta
+    cliente, headers = _cliente()
+    backend.app.json.compact = True  # Como en producción: sin indentar
+
+    lote_id = _crear_lote(cliente, headers, nombre='Lote JSON')
+    with backend.app.app_context():
+        inicio = date(2000, 1, 1)
+        backend.db.session.execute(backend.insert(backend.RegistroDiario), [
+            {'lote_id': lote_id, 'fecha': inicio + timedelta(days=d), 'alimento_kg': 120.5, 'agua_litros': 240.0,
+             'mortalidad': 1, 'peso_promedio': 900.0, 'temperatura_promedio': 30.5, 'humedad': 60.0,
+             'observaciones': 'Sin novedad'} for d in range(args.filas)])
+        backend.db.session.commit()
+    lotes = args.lotes or 30
+    for i in range(lotes - 1):
+        _crear_lote(cliente, headers, nombre=f'Lote JSON {i}')
+
+    with backend.app.app_context():
+        # Payload tal como lo arma el handler: fechas como date, no como texto
+        registros = [backend.serializar_registro(r) for r in
+                     backend.RegistroDiario.query.filter_by(lote_id=lote_id).all()]
+    dashboard = backend.app.json.loads(cliente.get('/api/dashboard', headers=headers).data)
+    rutas = [(f'/api/lotes/{lote_id}/registros ({args.filas} filas)', f'/api/lotes/{lote_id}/registros', registros),
+             (f'/api/dashboard ({lotes} lotes)', '/api/dashboard', dashboard)]
+    modos = [('json estándar', False)] + ([('orjson', True)] if ORJSON_DISPONIBLE else [])
+    if not ORJSON_DISPONIBLE:
+        print("  orjson no está instalado: solo se mide el json estándar (pip install orjson)", file=sys.stderr)
+
+    print(f"\nJSON · {args.peticiones} peticiones por ruta y modo", file=sys.stderr)
+    for nombre_ruta, ruta, datos in rutas:
+        for nombre_modo, usar in modos:
+            backend.app.json.usar_orjson = usar
+            tamano = len(cliente.get(ruta, headers=headers).data)
+            _resumen(f'{nombre_ruta} · {nombre_modo} (petición, {tamano // 1024} KB)',
+                     _medir(lambda i: cliente.get(ruta, headers=headers), args.peticiones))
+            with backend.app.app_context():
+                _resumen(f'{nombre_ruta} · {nombre_modo} (solo serializar)',
+                         _medir(lambda i: backend.app.json.response(datos), args.peticiones))
+    backend.app.json.usar_orjson = ORJSON_DISPONIBLE
+
+
+
+def bench_compresion(args):
+    """Bytes transferidos y latencia sin comprimir, con gzip y con brotli (si está instalado)"""
+    from services.compresion import BROTLI_DISPONIBLE
+    from datetime import date, timedelta
+    cliente, headers = _cliente()
+    backend.app.json.compact = True
+
+    lote_id = _crear_lote(cliente, headers, nombre='Lote compresión')
+    with backend.app.app_context():
+        inicio = date(2000, 1, 1)
+        backend.db.session.execute(backend.insert(backend.RegistroDiario), [
+            {'lote_id': lote_id, 'fecha': inicio + timedelta(days=d), 'alimento_kg': 120.5 + d % 7,
+             'agua_litros': 240.0, 'mortalidad': d % 3, 'peso_promedio': 40.0 + d, 'temperatura_promedio': 30.5,
+             'humedad': 60.0, 'observaciones': 'Sin novedad'} for d in range(args.filas)])
+        backend.db.session.commit()
+
+    rutas = [f'/api/lotes/{lote_id}/registros', f'/api/lotes/{lote_id}/curva-peso',
+             f'/api/lotes/{lote_id}/exportar-csv', '/', '/chart.min.js']
+    modos = [('sin comprimir', 'identity'), ('gzip', 'gzip')] + ([('brotli', 'br')] if BROTLI_DISPONIBLE else [])
+    if not BROTLI_DISPONIBLE:
+        print("  brotli no está instalado: solo se mide gzip (pip install Brotli)", file=sys.stderr)
+
+    print(f"\nCompresión · {args.filas} registros · {args.peticiones} peticiones por ruta y modo", file=sys.stderr)
+    for ruta in rutas:
+        for nombre_modo, codificacion in modos:
+            cabeceras = {**headers, 'Accept-Encoding': codificacion}
+            tamano = len(cliente.get(ruta, headers=cabeceras).get_data())
+            _resumen(f'{ruta.split("/")[-1] or "index.html"} · {nombre_modo} ({tamano / 1024:.1f} KB)',
+                     _medir(lambda i: cliente.get(ruta, headers=cabeceras).get_data(), args.peticiones))
+
+
+def bench_auth(args):
+    """Costo de token_required por petición: usuario leído de la base en cada una frente a la caché"""
+    from sqlalchemy import event
+    cliente, headers = _cliente()
+    consultas = []
+    with backend.app.app_context():
+        event.listen(backend.db.engine, 'before_cursor_execute', lambda *a: consultas.append(1))
+    protegida = backend.token_required(lambda usuario: usuario)
+
+    def solo_auth(i):
+        with backend.app.test_request_context('/api/ping', headers=headers):
+            protegida()
+
+    ttl = backend.app.config['AUTH_CACHE_SEG'] or 60
+    print(f"\nAutenticación · {args.peticiones} peticiones por modo", file=sys.stderr)
+    for nombre_modo, segundos in [('sin caché', 0), (f'caché {ttl} s', ttl)]:
+        backend.cache_usuarios.ttl_seg = segundos
+        backend.cache_usuarios.invalidar()
+        consultas.clear()
+        tiempos = _medir(solo_auth, args.peticiones)
+        _resumen(f'token_required · {nombre_modo} ({len(consultas) / args.peticiones:.2f} consultas)', tiempos)
+        consultas.clear()
+        tiempos = _medir(lambda i: cliente.get('/api/lotes?fields=id,nombre', headers=headers), args.peticiones)
+        _resumen(f'GET /api/lotes · {nombre_modo} ({len(consultas) / args.peticiones:.2f} consultas)', tiempos)
+
+
+BENCHMARKS = {
+    'logging': bench_logging,
+    'sqlite': bench_sqlite,
+    'eliminar': bench_eliminar,
+    'json': bench_json,
+    'compresion': bench_compresion,
+    'auth': bench_auth,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks del backend de Pollo Control')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--peticiones', type=int, default=300, help='Peticiones por escenario')
+    parser.add_argument('--hilos', type=int, default=8, help='Hilos concurrentes (benchmarks de concurrencia)')
+    parser.add_argument('--segundos', type=float, default=5.0, help='Duración de cada escenario concurrente')
+    parser.add_argument('--lotes', type=int, help='Lotes a crear (eliminar: 200, json: 30)')
+    parser.add_argument('--filas', type=int, default=2000, help='Registros diarios del lote (benchmarks json y compresion)')
+    parser.add_argument('--perfil', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Build del frontend: nombres con huella de contenido y variantes .gz/.br
+
+Uso (desde la carpeta backend):
+    python construir_frontend.py                   # frontend/ -> build/frontend/
+    python construir_frontend.py --destino /tmp/fe
+
+Flask sirve el build automáticamente cuando existe (FRONTEND_BUILD_DIR):
+recursos con huella con caché inmutable y el HTML con un TTL corto. Volver a
+ejecutarlo tras cada cambio del frontend; sin build se sirve frontend/ tal cual.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from config import get_config  # noqa: E402
+from services.estaticos import BROTLI_DISPONIBLE, construir_frontend  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', 'frontend'))
+BUILD_DIR = os.path.abspath(os.path.join(BASE_DIR, '..', 'build', 'frontend'))
+
+
+def _tamano(ruta):
+    return os.path.getsize(ruta) if os.path.isfile(ruta) else None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build con huella y precomprimido del frontend')
+    parser.add_argument('--origen', default=FRONTEND_DIR)
+    parser.add_argument('--destino', default=get_config().FRONTEND_BUILD_DIR or BUILD_DIR)
+    args = parser.parse_args()
+
+    if not BROTLI_DISPONIBLE:
+        print("⚠️  brotli no está instalado: solo se generan variantes .gz (pip install Brotli)")
+    manifiesto = construir_frontend(args.origen, args.destino)
+
+    for original in ['index.html'] + sorted(manifiesto):
+        final = os.path.join(args.destino, manifiesto.get(original, original))
+        tamanos = [_tamano(final + sufijo) for sufijo in ('', '.gz', '.br')]
+        print(f"  {manifiesto.get(original, original):<40} {tamanos[0] / 1024:8.1f} KB"
+              + ''.join(f" · {nombre} {t / 1024:6.1f} KB" for nombre, t in zip(('gz', 'br'), tamanos[1:]) if t))
+    print(f"✅ Frontend construido en {args.destino} ({len(manifiesto)} recursos con huella)")
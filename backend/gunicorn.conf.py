@@ -0,0 +1,12 @@
+"""
+Configuración de gunicorn (gunicorn -c backend/gunicorn.conf.py backend.app:app)
+
+Los hilos de fondo de la app no se arrancan al importarla, porque también la
+importan los scripts (migrar.py, benchmark.py...): cada worker los arranca aquí
+una vez cargada la app.
+"""
+import sys
+
+
+def post_worker_init(worker):
+    sys.modules[worker.wsgi.import_name].iniciar_ingesta()
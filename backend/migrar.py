@@ -0,0 +1,40 @@
+"""
+Aplica las migraciones de esquema pendientes (SQLite o PostgreSQL según DATABASE_URL)
+
+En PostgreSQL también crea por adelantado las particiones anuales que falten.
+
+Uso (una vez por despliegue, antes de arrancar los workers):
+    python backend/migrar.py           # aplica lo pendiente
+    python backend/migrar.py --estado  # lista versiones aplicadas y pendientes
+"""
+import os
+import sys
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+# La app no debe migrar por su cuenta al importarse: lo hace este script
+os.environ['MIGRAR_AL_INICIAR'] = 'False'
+
+from app import app, db, migraciones, aplicar_migraciones, mantener_particiones, log
+
+if __name__ == '__main__':
+    if '--estado' in sys.argv:
+        with app.app_context():
+            aplicadas = migraciones.aplicadas(db.engine)
+        for m in migraciones.todas:
+            fila = aplicadas.get(m.version)
+            estado = f"✅ {fila.aplicada_en:%Y-%m-%d %H:%M}" if fila else "⏳ pendiente"
+            print(f"  {m.version:>3}  {estado:<20} {m.descripcion}")
+        sys.exit(0 if len(aplicadas) >= len(migraciones.todas) else 1)
+
+    try:
+        aplicadas = aplicar_migraciones()
+        mantener_particiones()
+    except Exception:
+        log.exception("Error aplicando migraciones")
+        sys.exit(1)
+    if aplicadas:
+        print(f"✅ {len(aplicadas)} migraciones aplicadas; esquema en versión {migraciones.ultima_version}")
+    else:
+        print(f"ℹ️  Esquema al día (versión {migraciones.ultima_version})")
@@ -0,0 +1,47 @@
+"""
+Administración de las particiones anuales de registros_diarios (solo PostgreSQL)
+
+Uso (desde la carpeta backend):
+    python particiones.py                      # lista particiones y filas estimadas
+    python particiones.py --asegurar           # crea las de los próximos años
+    python particiones.py --desacoplar 2019    # separa el año 2019 de la tabla (para archivarlo)
+"""
+import argparse
+import os
+import sys
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+os.environ['MIGRAR_AL_INICIAR'] = 'False'
+
+from app import app, db, mantener_particiones
+from services.particiones import tablas_particionables, listar_particiones, desacoplar_particion
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Particiones anuales (PostgreSQL)')
+    parser.add_argument('--asegurar', action='store_true', help='Crear las particiones de los próximos años')
+    parser.add_argument('--desacoplar', type=int, metavar='AÑO', help='Separar la partición de ese año')
+    parser.add_argument('--tabla', default='registros_diarios')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            print("ℹ️  El particionado solo aplica a PostgreSQL; en SQLite la tabla no se divide")
+            sys.exit(0)
+
+        if args.asegurar:
+            creadas = mantener_particiones()
+            print(f"✅ {len(creadas)} particiones creadas" + (f": {', '.join(creadas)}" if creadas else ''))
+
+        if args.desacoplar:
+            with db.engine.begin() as conn:
+                nombre = desacoplar_particion(conn, args.tabla, args.desacoplar)
+            print(f"✅ {nombre} separada de {args.tabla}. Sus filas siguen en la tabla {nombre}: "
+                  f"respaldar con pg_dump -t {nombre} y luego DROP TABLE {nombre}")
+
+        with db.engine.connect() as conn:
+            for tabla, _ in tablas_particionables(db.metadata):
+                print(f"\n{tabla.name}:")
+                for p in listar_particiones(conn, tabla.name):
+                    print(f"  {p['nombre']:<28} {p['rango']:<60} ~{p['filas_estimadas']} filas")
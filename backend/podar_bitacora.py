@@ -0,0 +1,26 @@
+"""
+Job de poda de la bitácora de cambios de /api/sync
+
+Uso (desde la carpeta backend):
+    python podar_bitacora.py              # poda bajas con más de SYNC_RETENCION_DIAS días
+    python podar_bitacora.py --dias 30
+"""
+import argparse
+import os
+import sys
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import app, podar_bitacora
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Poda de la bitácora de sincronización')
+    parser.add_argument('--dias', type=int, default=app.config['SYNC_RETENCION_DIAS'])
+    args = parser.parse_args()
+
+    with app.app_context():
+        resultado = podar_bitacora(args.dias)
+
+    print(f"Cambios reemplazados por otros posteriores: {resultado['reemplazadas']}")
+    print(f"Bajas anteriores a {resultado['corte']}: {resultado['bajas']}")
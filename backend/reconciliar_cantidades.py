@@ -0,0 +1,31 @@
+"""
+Job de reconciliación de Lote.cantidad_actual contra la mortalidad registrada
+
+Uso (desde la carpeta backend):
+    python reconciliar_cantidades.py            # solo informa
+    python reconciliar_cantidades.py --corregir # corrige los descuadres
+"""
+import os
+import sys
+
+# Agregar el directorio actual al path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import app, reconciliar_cantidad_actual
+
+if __name__ == '__main__':
+    corregir = '--corregir' in sys.argv
+    with app.app_context():
+        resultado = reconciliar_cantidad_actual(corregir=corregir)
+
+    print(f"Lotes revisados: {resultado['lotes_revisados']}")
+    for d in resultado['descuadres']:
+        print(f"  Lote {d['lote_id']} ({d['nombre']}): cantidad_actual={d['cantidad_actual']} "
+              f"esperada={d['cantidad_esperada']} (mortalidad {d['total_mortalidad']})")
+    if not resultado['descuadres']:
+        print("✅ Sin descuadres")
+    elif corregir:
+        print(f"✅ {resultado['corregidos']} lotes corregidos")
+    else:
+        print("ℹ️  Ejecutar con --corregir para aplicar los valores esperados")
+        sys.exit(1)
@@ -14,21 +14,17 @@ if sys.platform.startswith('win'):
 # Agregar el directorio actual al path
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from app import app, db, Usuario, ensure_database_schema
+from app import app, db, Usuario, aplicar_migraciones, iniciar_ingesta
 from config import get_config
 
 def init_database():
-    """Inicializa la base de datos y crea tablas"""
+    """Inicializa la base de datos aplicando las migraciones pendientes"""
     print("🔧 Inicializando base de datos...")
     
+    aplicadas = aplicar_migraciones()
+    print(f"✅ Esquema al día ({len(aplicadas)} migraciones aplicadas)")
+    
     with app.app_context():
-        # Crear todas las tablas
-        db.create_all()
-        print("✅ Tablas creadas exitosamente")
-
-        # Asegurar migraciones ligeras
-        ensure_database_schema()
-        
         # Verificar si existe el usuario admin
         admin = Usuario.query.filter_by(username='admin').first()
         
@@ -212,6 +208,10 @@ def main():
         # Autoreload activado por defecto; desactivar con RELOAD=0
         use_reloader = os.environ.get('RELOAD', '1') != '0'
 
+        # Con el recargador este proceso solo vigila archivos: la ingesta arranca en el hijo que sirve
+        if not use_reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            iniciar_ingesta()
+
         print(f"🚀 Iniciando servidor en http://{host}:{port}")
         print("   Presiona CTRL+C para detener\n")
         
@@ -0,0 +1,39 @@
+"""
+Empaquetado comprimido de filas de detalle para el archivo frío de lotes
+"""
+import gzip
+import json
+from datetime import date, datetime
+from typing import Dict, List
+
+from sqlalchemy import Date, DateTime
+
+
+def _a_json(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f'Tipo no serializable: {type(valor).__name__}')
+
+
+def comprimir_filas(filas_por_tabla: Dict[str, List[dict]]) -> bytes:
+    """JSON comprimido con gzip de {tabla: [fila, ...]}"""
+    contenido = json.dumps(filas_por_tabla, default=_a_json, ensure_ascii=False, separators=(',', ':'))
+    return gzip.compress(contenido.encode('utf-8'), compresslevel=9)
+
+
+def descomprimir_filas(datos: bytes, tablas: Dict[str, object]) -> Dict[str, List[dict]]:
+    """Inverso de comprimir_filas; convierte de nuevo las columnas Date/DateTime de cada `Table`"""
+    filas_por_tabla = json.loads(gzip.decompress(datos).decode('utf-8'))
+    for nombre, filas in filas_por_tabla.items():
+        tabla = tablas[nombre]
+        conversiones = {}
+        for columna in tabla.columns:
+            if isinstance(columna.type, DateTime):
+                conversiones[columna.name] = datetime.fromisoformat
+            elif isinstance(columna.type, Date):
+                conversiones[columna.name] = date.fromisoformat
+        for fila in filas:
+            for campo, convertir in conversiones.items():
+                if fila.get(campo) is not None:
+                    fila[campo] = convertir(fila[campo])
+    return filas_por_tabla
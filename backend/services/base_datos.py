@@ -0,0 +1,232 @@
+"""
+Ajustes del motor de base de datos (perfil SQLite, pool de conexiones, réplica de lectura)
+"""
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session as SesionFlask
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+
+
+def pragmas_sqlite(synchronous='NORMAL', cache_kb=65536, mmap_mb=256, busy_timeout_ms=5000, wal=True):
+    """Sentencias PRAGMA del perfil de rendimiento, en el orden en que se aplican"""
+    sentencias = []
+    if wal:
+        # WAL: los lectores no bloquean al escritor ni viceversa
+        sentencias.append('PRAGMA journal_mode=WAL')
+    sentencias += [
+        f'PRAGMA synchronous={synchronous}',      # NORMAL en WAL: fsync solo en checkpoints
+        f'PRAGMA cache_size=-{int(cache_kb)}',    # Negativo = KiB en lugar de páginas
+        f'PRAGMA mmap_size={int(mmap_mb) * 1024 * 1024}',
+        'PRAGMA temp_store=MEMORY',
+        f'PRAGMA busy_timeout={int(busy_timeout_ms)}',
+        'PRAGMA foreign_keys=ON',                 # Las bajas de lotes dependen de ON DELETE CASCADE
+    ]
+    return sentencias
+
+
+def aplicar_perfil_sqlite(engine, **opciones):
+    """
+    Registra un listener 'connect' que ejecuta los PRAGMA del perfil en cada
+    conexión nueva del pool. No hace nada si el motor no es SQLite.
+    Devuelve la lista de sentencias aplicadas.
+    """
+    if engine.dialect.name != 'sqlite':
+        return []
+    en_memoria = engine.url.database in (None, '', ':memory:')
+    return _ejecutar_al_conectar(engine, pragmas_sqlite(wal=not en_memoria, **opciones))
+
+
+def activar_claves_foraneas_sqlite(engine):
+    """
+    SQLite no aplica las FOREIGN KEY (ni ON DELETE CASCADE) salvo que cada
+    conexión lo pida. Es lo mínimo que se activa sin el perfil de rendimiento.
+    """
+    if engine.dialect.name != 'sqlite':
+        return []
+    return _ejecutar_al_conectar(engine, ['PRAGMA foreign_keys=ON'])
+
+
+def _ejecutar_al_conectar(engine, sentencias):
+    @event.listens_for(engine, 'connect')
+    def _aplicar_pragmas(dbapi_conn, _registro):
+        cursor = dbapi_conn.cursor()
+        try:
+            for sentencia in sentencias:
+                cursor.execute(sentencia)
+        finally:
+            cursor.close()
+
+    return sentencias
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout por una conexión libre"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_metricas = threading.Lock()
+        self._metricas = {
+            'checkouts_total': 0,
+            'timeouts_total': 0,
+            'espera_total_ms': 0.0,
+            'espera_max_ms': 0.0,
+            'esperas_lentas': 0,  # checkouts que esperaron más de 100 ms
+        }
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._lock_metricas:
+                self._metricas['timeouts_total'] += 1
+            raise
+        finally:
+            espera = (time.perf_counter() - inicio) * 1000
+            with self._lock_metricas:
+                m = self._metricas
+                m['checkouts_total'] += 1
+                m['espera_total_ms'] += espera
+                m['espera_max_ms'] = max(m['espera_max_ms'], espera)
+                if espera > 100:
+                    m['esperas_lentas'] += 1
+
+    def metricas(self):
+        """Instantánea del uso del pool de este proceso"""
+        with self._lock_metricas:
+            m = dict(self._metricas)
+        en_uso = self.checkedout()
+        capacidad = self.size() + max(self._max_overflow, 0)
+        total = m.pop('espera_total_ms')
+        m.update({
+            'espera_promedio_ms': round(total / m['checkouts_total'], 3) if m['checkouts_total'] else None,
+            'espera_max_ms': round(m['espera_max_ms'], 3),
+            'en_uso': en_uso,
+            'libres': self.checkedin(),
+            'tamano': self.size(),
+            'max_overflow': self._max_overflow,
+            'overflow_actual': max(self.overflow(), 0),
+            'saturacion': round(en_uso / capacidad, 3) if capacidad > 0 else None,
+        })
+        return m
+
+
+def opciones_motor(url, pool_size=4, max_overflow=4, pool_timeout=10, pool_recycle=280,
+                   pool_pre_ping=True, statement_timeout_ms=30000, connect_timeout=10):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS según el motor de la URL.
+
+    PostgreSQL: pool dimensionado por worker, pre-ping y reciclado para las
+    conexiones que el servidor cierra tras un periodo inactivo, y
+    statement_timeout por conexión. SQLite en archivo: solo el pool medido.
+    """
+    if url.startswith('postgresql'):
+        connect_args = {'connect_timeout': connect_timeout}
+        if statement_timeout_ms:
+            connect_args['options'] = f'-c statement_timeout={int(statement_timeout_ms)}'
+        return {
+            'poolclass': PoolMedido,
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': pool_timeout,
+            'pool_recycle': pool_recycle,
+            'pool_pre_ping': pool_pre_ping,
+            'connect_args': connect_args,
+        }
+    if url.startswith('sqlite') and ':memory:' not in url and url.rstrip('/') not in ('sqlite:', 'sqlite:/'):
+        return {'poolclass': PoolMedido}
+    return {}
+
+
+def metricas_pool(engine):
+    """Métricas del pool si el motor usa PoolMedido; None en otro caso"""
+    pool = engine.pool
+    return pool.metricas() if isinstance(pool, PoolMedido) else None
+
+
+BIND_REPLICA = 'replica'
+COOKIE_ESCRITURA = 'pc_ultima_escritura'
+
+
+class EnrutadorReplica:
+    """
+    Recuerda quién escribió hace poco para leer sus propios cambios del primario.
+
+    La marca se guarda por usuario en memoria del proceso y además viaja en
+    una cookie, de modo que también la respeta otro worker de gunicorn.
+    """
+
+    def __init__(self, ventana_seg: float = 5.0):
+        self.ventana_seg = ventana_seg
+        self._lock = threading.Lock()
+        self._escrituras = {}
+        self._contadores = {'lecturas_replica': 0, 'lecturas_primario': 0}
+
+    def registrar_escritura(self, usuario_id):
+        ahora = time.time()
+        with self._lock:
+            if usuario_id is not None:
+                self._escrituras[usuario_id] = ahora
+            # Purga ocasional de marcas vencidas
+            if len(self._escrituras) > 1000:
+                limite = ahora - self.ventana_seg
+                self._escrituras = {k: v for k, v in self._escrituras.items() if v >= limite}
+        return ahora
+
+    def escritura_reciente(self, usuario_id=None, marca_cookie=None) -> bool:
+        limite = time.time() - self.ventana_seg
+        with self._lock:
+            if usuario_id is not None and self._escrituras.get(usuario_id, 0) >= limite:
+                return True
+        try:
+            return marca_cookie is not None and float(marca_cookie) >= limite
+        except ValueError:
+            return False
+
+    def contar(self, replica: bool):
+        with self._lock:
+            self._contadores['lecturas_replica' if replica else 'lecturas_primario'] += 1
+
+    def metricas(self):
+        with self._lock:
+            return {'ventana_seg': self.ventana_seg, **self._contadores}
+
+
+class SesionEnrutada(SesionFlask):
+    """
+    Sesión que envía a la réplica las lecturas de peticiones GET/HEAD.
+
+    Van al primario: cualquier escritura (flush, insert/update/delete), todo
+    lo que la misma sesión lea después de escribir, el trabajo fuera de una
+    petición (hilos de fondo, migraciones) y las peticiones de un usuario que
+    escribió hace menos de `ventana_seg` segundos (read-your-writes).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and BIND_REPLICA in self._db.engines:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info['escribio'] = True
+            elif self._leer_de_replica():
+                return self._db.engines[BIND_REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _leer_de_replica(self) -> bool:
+        if self.info.get('escribio') or not has_request_context():
+            return False
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if 'replica' not in self.info:
+            # Se decide una vez por petición para no mezclar lecturas de ambos motores
+            enrutador = current_app.extensions.get('enrutador_replica')
+            usar = enrutador is not None and not enrutador.escritura_reciente(
+                g.get('usuario_id'), request.cookies.get(COOKIE_ESCRITURA)
+            )
+            if enrutador is not None:
+                enrutador.contar(usar)
+            self.info['replica'] = usar
+        return self.info['replica']
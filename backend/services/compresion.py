@@ -0,0 +1,115 @@
+"""
+Compresión de respuestas HTTP (brotli o gzip según Accept-Encoding)
+
+Se elige la codificación con mayor q que acepte el cliente (brotli gana en
+empate y solo si el paquete está instalado). Las respuestas en memoria se
+comprimen enteras y solo si superan el tamaño mínimo; las de send_file y
+los generadores se comprimen por bloques mientras se envían, sin cargar el
+archivo completo en memoria. No se tocan respuestas parciales (206), ya
+codificadas ni tipos que ya vienen comprimidos (PNG, PDF, XLSX).
+"""
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+    BROTLI_DISPONIBLE = True
+except ImportError:
+    try:
+        import brotlicffi as brotli
+        BROTLI_DISPONIBLE = True
+    except ImportError:
+        BROTLI_DISPONIBLE = False
+
+TIPOS_COMPRIMIBLES = (
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/manifest+json',
+    'image/svg+xml',
+)
+
+
+def elegir_codificacion(aceptadas, brotli_habilitado=True):
+    """'br', 'gzip' o None según las calidades de Accept-Encoding"""
+    candidatas = (['br'] if brotli_habilitado and BROTLI_DISPONIBLE else []) + ['gzip']
+    mejor, mejor_q = None, 0
+    for codificacion in candidatas:
+        q = aceptadas.quality(codificacion)
+        if q > mejor_q:
+            mejor, mejor_q = codificacion, q
+    return mejor
+
+
+def _compresor(codificacion, nivel_gzip, nivel_brotli):
+    """Objeto con process/finish para comprimir por bloques"""
+    if codificacion == 'br':
+        comp = brotli.Compressor(quality=nivel_brotli)
+        return comp.process, comp.finish
+    # wbits 16+ = envoltura gzip (cabecera y CRC) sobre deflate
+    comp = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return comp.compress, comp.flush
+
+
+def comprimir(datos: bytes, codificacion: str, nivel_gzip=6, nivel_brotli=5) -> bytes:
+    procesar, terminar = _compresor(codificacion, nivel_gzip, nivel_brotli)
+    return procesar(datos) + terminar()
+
+
+def _comprimir_flujo(iterable, codificacion, nivel_gzip, nivel_brotli):
+    procesar, terminar = _compresor(codificacion, nivel_gzip, nivel_brotli)
+    for bloque in iterable:
+        if isinstance(bloque, str):
+            bloque = bloque.encode('utf-8')
+        salida = procesar(bloque)
+        if salida:
+            yield salida
+    yield terminar()
+
+
+def configurar_compresion(app, min_bytes=1024, nivel_gzip=6, nivel_brotli=5,
+                          brotli_habilitado=True, tipos=TIPOS_COMPRIMIBLES):
+    """Registra el after_request que comprime las respuestas de `app`"""
+    tipos = frozenset(tipos)
+
+    @app.after_request
+    def comprimir_respuesta(response):
+        if response.mimetype not in tipos:
+            return response
+        response.vary.add('Accept-Encoding')
+        if (request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers or 'Content-Range' in response.headers):
+            return response
+        codificacion = elegir_codificacion(request.accept_encodings, brotli_habilitado)
+        if codificacion is None:
+            return response
+
+        largo = response.content_length
+        if largo is not None and largo < min_bytes:
+            return response
+
+        if response.direct_passthrough or response.is_streamed:
+            # send_file / generadores: comprimir al vuelo y cerrar el archivo original al terminar
+            original = response.response
+            if hasattr(original, 'close'):
+                response.call_on_close(original.close)
+            response.response = _comprimir_flujo(original, codificacion, nivel_gzip, nivel_brotli)
+            response.direct_passthrough = False
+            response.headers.pop('Content-Length', None)
+        else:
+            datos = response.get_data()
+            if len(datos) < min_bytes:
+                return response
+            comprimido = comprimir(datos, codificacion, nivel_gzip, nivel_brotli)
+            if len(comprimido) >= len(datos):
+                return response
+            response.set_data(comprimido)
+
+        response.headers['Content-Encoding'] = codificacion
+        response.headers.pop('Accept-Ranges', None)
+        # Misma entidad con otra codificación: ETag débil (los 304 siguen funcionando)
+        etag, _ = response.get_etag()
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return comprimir_respuesta
@@ -0,0 +1,60 @@
+"""
+Conteo de sentencias SQL por petición y presupuesto de consultas por endpoint
+
+Un endpoint declara cuántas sentencias puede ejecutar como máximo con
+@presupuesto_consultas(n). Con la vigilancia activa, cada respuesta lleva la
+cabecera X-Consultas y se registra una advertencia cuando una petición se
+pasa de su presupuesto (señal típica de un N+1 por carga perezosa).
+"""
+import logging
+from functools import wraps
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+log = logging.getLogger('pollo_control')
+
+CABECERA_CONSULTAS = 'X-Consultas'
+
+
+def presupuesto_consultas(maximo: int):
+    """Declara el máximo de sentencias SQL por petición del endpoint decorado"""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            return funcion(*args, **kwargs)
+        envoltura.presupuesto_consultas = maximo
+        return envoltura
+    return decorador
+
+
+def presupuesto_de(app, endpoint):
+    """Presupuesto declarado por la vista de `endpoint` (None si no declara)"""
+    vista = app.view_functions.get(endpoint)
+    return getattr(vista, 'presupuesto_consultas', None)
+
+
+def fijar_presupuesto(maximo):
+    """Presupuesto de la petición en curso cuando depende de su contenido (p. ej. /api/batch)"""
+    g.presupuesto_consultas = maximo
+
+
+def _al_ejecutar(conn, cursor, sentencia, parametros, contexto, executemany):
+    if has_request_context():
+        g.consultas = g.get('consultas', 0) + 1
+
+
+def vigilar_consultas(app, engines):
+    """Cuenta las sentencias de cada petición en `engines` y compara con el presupuesto del endpoint"""
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _al_ejecutar)
+
+    @app.after_request
+    def revisar_presupuesto(response):
+        consultas = g.get('consultas', 0)
+        response.headers[CABECERA_CONSULTAS] = str(consultas)
+        presupuesto = g.get('presupuesto_consultas') or presupuesto_de(app, request.endpoint)
+        if presupuesto is not None and consultas > presupuesto:
+            log.warning("%s %s ejecutó %s consultas SQL (presupuesto %s)",
+                        request.method, request.path, consultas, presupuesto)
+        return response
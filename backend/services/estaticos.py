@@ -0,0 +1,188 @@
+"""
+Frontend estático con huella de contenido y variantes precomprimidas
+
+`construir_frontend` copia frontend/ a la carpeta de build renombrando cada
+recurso (JS, CSS, imágenes...) como `nombre.<hash>.ext`, reescribe las
+referencias en el HTML y en los demás recursos, y deja junto a cada archivo
+su `.gz` y, si está instalado brotli, su `.br`. El HTML conserva su nombre
+y cada recurso queda también con el original (TTL corto) para HTML viejo en
+caché y enlaces externos.
+
+`configurar_estaticos` reemplaza la vista `static` de Flask: si existe el
+build, entrega directamente la variante precomprimida que acepte el cliente
+con caché inmutable para los recursos con huella y un TTL corto para el
+HTML; sin build se sirve frontend/ tal cual, como hasta ahora.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+    BROTLI_DISPONIBLE = True
+except ImportError:
+    BROTLI_DISPONIBLE = False
+
+MANIFIESTO = 'manifest.json'
+EXTENSIONES_PRECOMPRIMIBLES = ('.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.map')
+EXTENSIONES_REFERENCIABLES = ('.html', '.js', '.mjs', '.css')
+_HUELLA = re.compile(r'\.[0-9a-f]{10}\.[^./]+$')
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def _huella(contenido: bytes) -> str:
+    return hashlib.sha256(contenido).hexdigest()[:10]
+
+
+def _con_huella(ruta: str, huella: str) -> str:
+    base, ext = os.path.splitext(ruta)
+    return f'{base}.{huella}{ext}'
+
+
+def _listar(origen):
+    """Rutas relativas (con /) de los archivos de `origen`, sin ocultos"""
+    rutas = []
+    for raiz, carpetas, archivos in os.walk(origen):
+        carpetas[:] = sorted(c for c in carpetas if not c.startswith('.'))
+        for archivo in sorted(archivos):
+            if not archivo.startswith('.'):
+                rutas.append(os.path.relpath(os.path.join(raiz, archivo), origen).replace(os.sep, '/'))
+    return rutas
+
+
+def _referencias(texto: str, ruta: str, recursos):
+    """Recursos citados en `texto` (entre comillas o en url()), relativos a `ruta`"""
+    carpeta = os.path.dirname(ruta)
+    citados = set()
+    for otro in recursos:
+        if otro == ruta:
+            continue
+        relativo = os.path.relpath(otro, carpeta or '.').replace(os.sep, '/')
+        for forma in {relativo, './' + relativo, '/' + otro}:
+            if re.search(r'''["'(]''' + re.escape(forma) + r'''["')]''', texto):
+                citados.add((forma, otro))
+    return citados
+
+
+def _reescribir(texto: str, citados, nombres) -> str:
+    # Las formas más largas primero para no reemplazar un prefijo de otra
+    for forma, otro in sorted(citados, key=lambda c: -len(c[0])):
+        nueva = forma[:len(forma) - len(otro.split('/')[-1])] + nombres[otro].split('/')[-1]
+        texto = re.sub(r'''(["'(])''' + re.escape(forma) + r'''(["')])''',
+                       lambda m, nueva=nueva: m.group(1) + nueva + m.group(2), texto)
+    return texto
+
+
+def _precomprimir(destino: str, contenido: bytes, nivel_brotli=11):
+    """Escribe `destino`.gz y `destino`.br (solo si reducen el tamaño)"""
+    variantes = {'.gz': gzip.compress(contenido, compresslevel=9, mtime=0)}
+    if BROTLI_DISPONIBLE:
+        variantes['.br'] = brotli.compress(contenido, quality=nivel_brotli)
+    for sufijo, comprimido in variantes.items():
+        if len(comprimido) < len(contenido):
+            with open(destino + sufijo, 'wb') as f:
+                f.write(comprimido)
+
+
+def construir_frontend(origen: str, destino: str) -> dict:
+    """
+    Genera el build en `destino` (se vacía antes). Devuelve el manifiesto
+    {ruta original: ruta con huella}, que también queda en manifest.json.
+    """
+    rutas = _listar(origen)
+    html = [r for r in rutas if r.endswith('.html')]
+    recursos = [r for r in rutas if not r.endswith('.html')]
+    contenidos = {}
+    for ruta in rutas:
+        with open(os.path.join(origen, ruta), 'rb') as f:
+            contenidos[ruta] = f.read()
+
+    # Un recurso que cita a otros toma su huella después de reescribir esas citas
+    citas = {}
+    for ruta in rutas:
+        if ruta.endswith(EXTENSIONES_REFERENCIABLES):
+            citas[ruta] = _referencias(contenidos[ruta].decode('utf-8'), ruta, recursos)
+    nombres, finales, visitando = {}, {}, set()
+
+    def procesar(ruta):
+        if ruta in finales:
+            return
+        if ruta in visitando:
+            raise ValueError(f'referencia circular entre recursos: {ruta}')
+        visitando.add(ruta)
+        contenido = contenidos[ruta]
+        if citas.get(ruta):
+            for _, otro in citas[ruta]:
+                procesar(otro)
+            contenido = _reescribir(contenido.decode('utf-8'), citas[ruta], nombres).encode('utf-8')
+        finales[ruta] = contenido
+        nombres[ruta] = ruta if ruta.endswith('.html') else _con_huella(ruta, _huella(contenido))
+        visitando.discard(ruta)
+
+    for ruta in recursos + html:
+        procesar(ruta)
+
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    for ruta in rutas:
+        for nombre in {ruta, nombres[ruta]}:
+            archivo = os.path.join(destino, nombre)
+            os.makedirs(os.path.dirname(archivo), exist_ok=True)
+            with open(archivo, 'wb') as f:
+                f.write(finales[ruta])
+            if ruta.endswith(EXTENSIONES_PRECOMPRIMIBLES):
+                _precomprimir(archivo, finales[ruta])
+
+    manifiesto = {r: nombres[r] for r in recursos}
+    with open(os.path.join(destino, MANIFIESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, sort_keys=True)
+    return manifiesto
+
+
+def servir_precomprimido(directorio: str, ruta: str, max_age: int):
+    """
+    Envía `ruta` de `directorio`, o su .br/.gz si el cliente lo acepta.
+    Los archivos con huella llevan caché inmutable; el resto `max_age` segundos.
+    """
+    archivo = safe_join(directorio, ruta)
+    if archivo is None or not os.path.isfile(archivo):
+        abort(404)
+    mimetype = mimetypes.guess_type(ruta)[0] or 'application/octet-stream'
+    codificacion = None
+    for candidata, sufijo in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings.quality(candidata) > 0 and os.path.isfile(archivo + sufijo):
+            codificacion, archivo = candidata, archivo + sufijo
+            break
+
+    response = send_file(archivo, mimetype=mimetype, conditional=True, etag=True, max_age=None)
+    if codificacion:
+        response.headers['Content-Encoding'] = codificacion
+    response.vary.add('Accept-Encoding')
+    if _HUELLA.search(ruta):
+        response.headers['Cache-Control'] = CACHE_INMUTABLE
+    else:
+        response.headers['Cache-Control'] = f'public, max-age={max_age}, must-revalidate'
+    return response
+
+
+def configurar_estaticos(app, directorio_build: str, ttl_html: int = 300) -> bool:
+    """
+    Sirve el frontend desde `directorio_build` si fue construido. Devuelve
+    True si se usa el build, False si se mantiene el static_folder original.
+    """
+    if not os.path.isfile(os.path.join(directorio_build, 'index.html')):
+        return False
+
+    def static(filename):
+        return servir_precomprimido(directorio_build, filename, ttl_html)
+
+    app.static_folder = directorio_build
+    app.view_functions['static'] = static
+    return True
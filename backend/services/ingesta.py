@@ -0,0 +1,314 @@
+"""
+Servicio de ingesta diferida (write-behind) para tráfico de sensores y carga masiva
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+class ColaLlenaError(Exception):
+    """La cola de ingesta no tiene capacidad para los elementos recibidos"""
+
+
+def _proceso_activo(pid: int) -> bool:
+    """Indica si existe un proceso con ese PID (solo fiable en POSIX)"""
+    if os.name == 'nt':
+        # En Windows os.kill termina procesos; se asume activo por seguridad
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BufferIngesta:
+    """
+    Cola acotada en memoria que se persiste en lotes desde un hilo de fondo.
+
+    Los elementos se aceptan de inmediato y se vacían a la base de datos cuando
+    la cola alcanza `tam_lote` o cuando pasan `intervalo` segundos. Con
+    `spool_dir` cada elemento se escribe antes en un archivo append-only por
+    proceso, que se reproduce al arrancar si el proceso anterior terminó sin
+    vaciar la cola. El spool se compacta cuando la cola queda vacía o cuando
+    supera `spool_compactar_bytes` (y el doble de lo que ocupaba tras la
+    compactación anterior); hasta entonces puede contener elementos ya
+    guardados, que al reproducirse se descartan como duplicados.
+
+    `procesar_lote` recibe la lista de elementos, los persiste en una sola
+    transacción y devuelve los que rechazó (con su `motivo`). Si lanza una
+    excepción el lote se reintenta antes que el resto de la cola; tras
+    `max_intentos` fallos se parte en dos mitades que se reintentan por
+    separado, y un elemento suelto que sigue fallando va al archivo de
+    rechazados con el error. Las excepciones para las que `es_transitorio`
+    devuelve True (base caída, bloqueo) no cuentan como intento.
+    """
+
+    PREFIJO_SPOOL = 'ingesta-'
+    ARCHIVO_RECHAZADOS = 'ingesta-rechazados.jsonl'
+
+    def __init__(self, procesar_lote: Callable[[List[dict]], List[dict]],
+                 max_cola: int = 5000, tam_lote: int = 200, intervalo: float = 2.0,
+                 spool_dir: Optional[str] = None, fsync: bool = False, max_intentos: int = 5,
+                 spool_compactar_bytes: int = 1024 * 1024,
+                 es_transitorio: Optional[Callable[[Exception], bool]] = None):
+        self._procesar_lote = procesar_lote
+        self.max_cola = max_cola
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo
+        self.spool_dir = spool_dir
+        self.fsync = fsync
+        self.max_intentos = max(1, max_intentos)
+        self.spool_compactar_bytes = spool_compactar_bytes
+        self._es_transitorio = es_transitorio or (lambda exc: False)
+        self._reiniciar_estado()
+
+    def _reiniciar_estado(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._hay_datos = threading.Condition(self._lock)
+        self._cola = deque()
+        # Lotes que fallaron, con sus intentos: se reintentan antes que la cola
+        self._reintentos = deque()
+        # Elementos fuera de la cola aún sin guardar (el lote en curso y los reintentos)
+        self._en_vuelo = 0
+        self._hilo = None
+        self._detenido = False
+        self._spool = None
+        self._ruta_spool = None
+        self._tam_compactado = 0
+        self._metricas = {
+            'encolados_total': 0,
+            'rechazados_por_capacidad': 0,
+            'persistidos_total': 0,
+            'descartados_total': 0,
+            'recuperados_spool': 0,
+            'vaciados_total': 0,
+            'fallos_vaciado': 0,
+            'lotes_divididos': 0,
+            'descartados_por_error': 0,
+            'ultima_latencia_ms': None,
+            'latencia_max_ms': 0.0,
+            'latencia_acumulada_ms': 0.0,
+            'ultimo_vaciado': None,
+            'ultimo_error': None,
+        }
+
+    # ----- ciclo de vida -----
+
+    def iniciar(self):
+        """Abre el spool (recuperando pendientes) y arranca el hilo de vaciado"""
+        if self._pid != os.getpid():
+            # Proceso hijo tras un fork: el hilo y la cola del padre no existen aquí
+            self._reiniciar_estado()
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            if self.spool_dir and self._spool is None:
+                self._abrir_spool()
+            self._detenido = False
+            self._hilo = threading.Thread(target=self._bucle, name='ingesta-flush', daemon=True)
+            self._hilo.start()
+
+    def detener(self, timeout: float = 10.0):
+        """Vacía lo pendiente y detiene el hilo (usado al cerrar el proceso)"""
+        with self._hay_datos:
+            self._detenido = True
+            self._hay_datos.notify_all()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    # ----- API pública -----
+
+    def encolar(self, elementos: List[dict]) -> int:
+        """Agrega elementos a la cola; lanza ColaLlenaError si no caben todos"""
+        if self._pid != os.getpid() or self._hilo is None or not self._hilo.is_alive():
+            self.iniciar()
+        with self._hay_datos:
+            ocupados = len(self._cola) + self._en_vuelo
+            if ocupados + len(elementos) > self.max_cola:
+                self._metricas['rechazados_por_capacidad'] += len(elementos)
+                raise ColaLlenaError(f'Cola de ingesta llena ({ocupados}/{self.max_cola})')
+            if self._spool is not None:
+                self._escribir_spool(elementos)
+            self._cola.extend(elementos)
+            self._metricas['encolados_total'] += len(elementos)
+            if len(self._cola) >= self.tam_lote:
+                self._hay_datos.notify()
+            return len(self._cola)
+
+    def metricas(self) -> Dict:
+        """Instantánea de profundidad de cola y latencias de vaciado"""
+        with self._lock:
+            m = dict(self._metricas)
+            vaciados = m.pop('vaciados_total')
+            acumulada = m.pop('latencia_acumulada_ms')
+            m.update({
+                'profundidad_cola': len(self._cola),
+                'en_vuelo': self._en_vuelo,
+                'lotes_en_reintento': len(self._reintentos),
+                'capacidad': self.max_cola,
+                'tam_lote': self.tam_lote,
+                'intervalo_seg': self.intervalo,
+                'vaciados_total': vaciados,
+                'latencia_promedio_ms': round(acumulada / vaciados, 2) if vaciados else None,
+                'latencia_max_ms': round(m['latencia_max_ms'], 2),
+                'spool': self._ruta_spool,
+                'hilo_activo': bool(self._hilo and self._hilo.is_alive()),
+                'pid': self._pid,
+            })
+            return m
+
+    # ----- hilo de vaciado -----
+
+    def _bucle(self):
+        while True:
+            with self._hay_datos:
+                limite = time.monotonic() + self.intervalo
+                while not self._reintentos and len(self._cola) < self.tam_lote and not self._detenido:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._hay_datos.wait(restante)
+                if self._reintentos:
+                    lote, intentos = self._reintentos.popleft()
+                elif self._cola:
+                    n = min(self.tam_lote, len(self._cola))
+                    lote, intentos = [self._cola.popleft() for _ in range(n)], 0
+                    self._en_vuelo += n
+                else:
+                    if self._detenido:
+                        return
+                    continue
+            if not self._vaciar(lote, intentos):
+                if self._detenido:
+                    # Al cerrar no se reintenta: lo pendiente queda en el spool
+                    return
+                # Error transitorio de base de datos: esperar antes de reintentar
+                time.sleep(self.intervalo)
+
+    def _vaciar(self, lote: List[dict], intentos: int = 0) -> bool:
+        inicio = time.perf_counter()
+        try:
+            rechazados = self._procesar_lote(lote) or []
+        except Exception as exc:
+            if not self._es_transitorio(exc):
+                intentos += 1
+            with self._lock:
+                self._metricas['fallos_vaciado'] += 1
+                self._metricas['ultimo_error'] = str(exc)
+                if intentos < self.max_intentos:
+                    self._reintentos.appendleft((lote, intentos))
+                    return False
+                if len(lote) > 1:
+                    # Aislar el elemento que hace fallar al lote sin frenar a los demás
+                    mitad = len(lote) // 2
+                    self._reintentos.extendleft([(lote[mitad:], 0), (lote[:mitad], 0)])
+                    self._metricas['lotes_divididos'] += 1
+                    return True
+                self._en_vuelo -= 1
+                self._metricas['descartados_por_error'] += 1
+            self._guardar_rechazados([{**lote[0], 'motivo': f'Error al guardar tras {intentos} intentos: {exc}'}])
+            return True
+
+        latencia = (time.perf_counter() - inicio) * 1000
+        if rechazados:
+            self._guardar_rechazados(rechazados)
+        with self._lock:
+            self._en_vuelo -= len(lote)
+            m = self._metricas
+            m['vaciados_total'] += 1
+            m['persistidos_total'] += len(lote) - len(rechazados)
+            m['descartados_total'] += len(rechazados)
+            m['ultima_latencia_ms'] = round(latencia, 2)
+            m['latencia_max_ms'] = max(m['latencia_max_ms'], latencia)
+            m['latencia_acumulada_ms'] += latencia
+            m['ultimo_vaciado'] = datetime.utcnow().isoformat()
+            if self._spool is not None:
+                pendientes = len(self._cola) + self._en_vuelo
+                tam = self._spool.tell()
+                if not pendientes or tam >= max(self.spool_compactar_bytes, 2 * self._tam_compactado):
+                    self._compactar_spool()
+        return True
+
+    # ----- spool append-only -----
+
+    def _abrir_spool(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._ruta_spool = os.path.join(self.spool_dir, f'{self.PREFIJO_SPOOL}{self._pid}.jsonl')
+        pendientes = []
+        for nombre in sorted(os.listdir(self.spool_dir)):
+            if not (nombre.startswith(self.PREFIJO_SPOOL) and nombre.endswith('.jsonl')):
+                continue
+            pid_txt = nombre[len(self.PREFIJO_SPOOL):-len('.jsonl')]
+            if not pid_txt.isdigit():
+                continue
+            pid = int(pid_txt)
+            if pid != self._pid and _proceso_activo(pid):
+                continue
+            ruta = os.path.join(self.spool_dir, nombre)
+            # Reclamar el archivo huérfano antes de leerlo para que otro worker no lo duplique
+            reclamado = f'{ruta}.{self._pid}.recuperando'
+            try:
+                os.replace(ruta, reclamado)
+            except OSError:
+                continue
+            pendientes.extend(self._leer_spool(reclamado))
+            os.remove(reclamado)
+
+        self._cola.extend(pendientes)
+        self._metricas['recuperados_spool'] += len(pendientes)
+        self._spool = open(self._ruta_spool, 'a', encoding='utf-8')
+        if pendientes:
+            self._escribir_spool(pendientes)
+
+    @staticmethod
+    def _leer_spool(ruta: str) -> List[dict]:
+        elementos = []
+        with open(ruta, encoding='utf-8') as fh:
+            for linea in fh:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    elementos.append(json.loads(linea))
+                except ValueError:
+                    # Última línea truncada por la caída: se descarta
+                    continue
+        return elementos
+
+    def _escribir_spool(self, elementos: List[dict]):
+        self._spool.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in elementos))
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    def _compactar_spool(self):
+        """Reescribe el spool solo con lo que sigue pendiente (se llama con el lock tomado)"""
+        self._spool.close()
+        temporal = self._ruta_spool + '.tmp'
+        pendientes = [e for lote, _ in self._reintentos for e in lote] + list(self._cola)
+        with open(temporal, 'w', encoding='utf-8') as fh:
+            fh.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in pendientes))
+            fh.flush()
+            if self.fsync:
+                os.fsync(fh.fileno())
+        os.replace(temporal, self._ruta_spool)
+        self._spool = open(self._ruta_spool, 'a', encoding='utf-8')
+        self._tam_compactado = self._spool.tell()
+
+    def _guardar_rechazados(self, rechazados: List[dict]):
+        if not self.spool_dir:
+            return
+        try:
+            with open(os.path.join(self.spool_dir, self.ARCHIVO_RECHAZADOS), 'a', encoding='utf-8') as fh:
+                for r in rechazados:
+                    fh.write(json.dumps(r, ensure_ascii=False) + '\n')
+        except OSError:
+            pass
@@ -0,0 +1,75 @@
+"""
+Proveedor JSON de Flask respaldado por orjson (opcional)
+
+Con orjson instalado las respuestas se serializan en C y directamente a
+bytes; sin él se usa el json de la biblioteca estándar. En ambos casos
+date/datetime salen en ISO 8601 y Decimal como número, de modo que los
+handlers pueden devolver los valores de las filas tal cual.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_DISPONIBLE = True
+except ImportError:
+    ORJSON_DISPONIBLE = False
+
+
+def _por_defecto(valor):
+    """Tipos que ni orjson ni json serializan por sí mismos"""
+    if isinstance(valor, (date, datetime, time)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    if hasattr(valor, '__html__'):
+        return str(valor.__html__())
+    raise TypeError(f'Tipo no serializable a JSON: {type(valor).__name__}')
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """DefaultJSONProvider con orjson cuando está disponible y fechas en ISO 8601"""
+
+    sort_keys = False
+    usar_orjson = ORJSON_DISPONIBLE
+
+    def _opciones_orjson(self, sort_keys=None, indent=None):
+        opciones = orjson.OPT_NON_STR_KEYS
+        if sort_keys if sort_keys is not None else self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        if indent:
+            opciones |= orjson.OPT_INDENT_2
+        return opciones
+
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        if self.usar_orjson and not kwargs.keys() - {'sort_keys', 'indent', 'separators'}:
+            try:
+                return orjson.dumps(obj, default=_por_defecto, option=self._opciones_orjson(
+                    kwargs.get('sort_keys'), kwargs.get('indent')))
+            except TypeError:
+                # Enteros fuera de 64 bits u otros casos raros: la ruta estándar los resuelve
+                pass
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('default', _por_defecto)
+        return json.dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if self.usar_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Como DefaultJSONProvider.response pero sin pasar por str cuando se usa orjson"""
+        obj = self._prepare_response_obj(args, kwargs)
+        legible = (self.compact is None and self._app.debug) or self.compact is False
+        cuerpo = self.dumps_bytes(obj, indent=2) if legible else self.dumps_bytes(obj, separators=(',', ':'))
+        return self._app.response_class(cuerpo + b'\n', mimetype=self.mimetype)
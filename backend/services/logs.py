@@ -0,0 +1,153 @@
+"""
+Servicio de logging estructurado y no bloqueante
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+NOMBRE_LOGGER = 'pollo_control'
+
+_listener = None
+
+
+class FiltroContexto(logging.Filter):
+    """Agrega request_id, método y ruta de la petición en curso a cada registro"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id', '-')
+            record.metodo = request.method
+            record.ruta = request.path
+        else:
+            record.request_id = '-'
+            record.metodo = None
+            record.ruta = None
+        return True
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Deja pasar solo una fracción de los registros marcados con
+    extra={'muestrear': True}. WARNING y superiores nunca se descartan.
+    """
+
+    def __init__(self, tasa: float = 1.0):
+        super().__init__()
+        self.tasa = max(0.0, min(1.0, tasa))
+
+    def filter(self, record):
+        if self.tasa >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if not getattr(record, 'muestrear', False):
+            return True
+        return random.random() < self.tasa
+
+
+class ManejadorCola(QueueHandler):
+    """QueueHandler que resuelve mensaje y traza en el hilo de la petición y delega la E/S al listener"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por evento, apta para agregadores de logs"""
+
+    CAMPOS_EXTRA = ('request_id', 'metodo', 'ruta', 'lote_id', 'duracion_ms', 'status')
+
+    def format(self, record):
+        evento = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for campo in self.CAMPOS_EXTRA:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                evento[campo] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            evento['traza'] = record.exc_text
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+FORMATO_TEXTO = '%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s'
+
+
+def configurar_logging(app, nivel='INFO', formato='texto', muestreo=1.0, asincrono=True, stream=None):
+    """
+    Configura el logger de la aplicación.
+
+    Con `asincrono=True` los registros se encolan con un QueueHandler y un
+    QueueListener los escribe desde su propio hilo, de modo que la petición
+    nunca espera por stdout. Devuelve el logger configurado.
+    """
+    global _listener
+
+    logger = logging.getLogger(NOMBRE_LOGGER)
+    logger.setLevel(getattr(logging, str(nivel).upper(), logging.INFO))
+    logger.propagate = False
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    salida = logging.StreamHandler(stream or sys.stdout)
+    salida.setFormatter(FormateadorJSON() if formato == 'json' else logging.Formatter(FORMATO_TEXTO))
+
+    if asincrono:
+        cola = queue.SimpleQueue()
+        entrada = ManejadorCola(cola)
+        _listener = QueueListener(cola, salida, respect_handler_level=False)
+        _listener.start()
+    else:
+        entrada = salida
+
+    entrada.addFilter(FiltroContexto())
+    entrada.addFilter(FiltroMuestreo(muestreo))
+    logger.addHandler(entrada)
+
+    if 'pollo_logs' not in app.extensions:
+        app.extensions['pollo_logs'] = logger
+        app.before_request(_asignar_request_id)
+        app.after_request(_propagar_request_id)
+        atexit.register(detener_logging)
+
+    return logger
+
+
+def _asignar_request_id():
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:12]
+
+
+def _propagar_request_id(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+
+def detener_logging():
+    """Vacía la cola de logs pendiente (al cerrar el proceso)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,185 @@
+"""
+Migraciones de esquema versionadas (SQLite y PostgreSQL)
+"""
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select, text
+from sqlalchemy.schema import AddConstraint
+
+TABLA_VERSION = 'schema_version'
+
+_metadata = MetaData()
+version_esquema = Table(
+    TABLA_VERSION, _metadata,
+    Column('version', Integer, primary_key=True),
+    Column('descripcion', String(200), nullable=False),
+    Column('aplicada_en', DateTime, nullable=False),
+)
+
+# Clave arbitraria del advisory lock de PostgreSQL que serializa despliegues simultáneos
+_CLAVE_BLOQUEO = 20250131
+
+
+class Migracion(NamedTuple):
+    version: int
+    descripcion: str
+    aplicar: Callable
+
+
+class RegistroMigraciones:
+    """
+    Lista ordenada de migraciones y el ejecutor que las aplica.
+
+    Cada migración recibe una conexión dentro de su propia transacción y se
+    marca como aplicada en `schema_version` en esa misma transacción. Deben
+    ser idempotentes respecto del esquema base: una base nueva se crea con
+    los modelos actuales (versión 1) y luego recorre el resto de versiones.
+    """
+
+    def __init__(self):
+        self._migraciones = {}
+
+    def migracion(self, version: int, descripcion: str):
+        """Decorador que registra `funcion(conn)` como la migración `version`"""
+        def registrar(funcion):
+            if version in self._migraciones:
+                raise ValueError(f'Migración {version} duplicada')
+            self._migraciones[version] = Migracion(version, descripcion, funcion)
+            return funcion
+        return registrar
+
+    @property
+    def todas(self) -> List[Migracion]:
+        return [self._migraciones[v] for v in sorted(self._migraciones)]
+
+    @property
+    def ultima_version(self) -> int:
+        return max(self._migraciones, default=0)
+
+    @staticmethod
+    def version_actual(engine) -> int:
+        """Versión aplicada (0 si la tabla de versiones aún no existe). Una sola consulta, sin reflexión."""
+        try:
+            with engine.connect() as conn:
+                return conn.execute(select(func.max(version_esquema.c.version))).scalar() or 0
+        except Exception:
+            return 0
+
+    @staticmethod
+    def aplicadas(engine) -> dict:
+        with engine.connect() as conn:
+            if not inspect(conn).has_table(TABLA_VERSION):
+                return {}
+            return {fila.version: fila for fila in conn.execute(select(version_esquema))}
+
+    def aplicar(self, engine, log=None) -> List[Migracion]:
+        """Aplica en orden las migraciones pendientes y devuelve las aplicadas"""
+        _metadata.create_all(engine)
+        aplicadas = []
+        for m in self.todas:
+            with engine.begin() as conn:
+                if engine.dialect.name == 'postgresql':
+                    # Sin el statement_timeout de las peticiones: copiar o reconstruir tablas grandes
+                    # (migraciones 10 y 11) y esperar el candado puede tardar bastante más
+                    conn.execute(text('SET LOCAL statement_timeout = 0'))
+                    conn.execute(text('SELECT pg_advisory_xact_lock(:clave)'), {'clave': _CLAVE_BLOQUEO})
+                ya = conn.execute(
+                    select(version_esquema.c.version).where(version_esquema.c.version == m.version)
+                ).first()
+                if ya:
+                    continue
+                if log:
+                    log.info('Aplicando migración %s: %s', m.version, m.descripcion)
+                m.aplicar(conn)
+                conn.execute(insert(version_esquema).values(
+                    version=m.version, descripcion=m.descripcion, aplicada_en=datetime.utcnow()
+                ))
+            aplicadas.append(m)
+        return aplicadas
+
+
+def agregar_columna(conn, columna, default=None):
+    """ALTER TABLE ... ADD COLUMN para una columna declarada en un modelo, si aún no existe"""
+    tabla = columna.table.name
+    insp = inspect(conn)
+    if not insp.has_table(tabla):
+        return False
+    if columna.name in {c['name'] for c in insp.get_columns(tabla)}:
+        return False
+    tipo = columna.type.compile(dialect=conn.dialect)
+    sql = f'ALTER TABLE {tabla} ADD COLUMN {columna.name} {tipo}'
+    if default is not None:
+        sql += f' DEFAULT {default}'
+    conn.execute(text(sql))
+    return True
+
+
+def crear_indices_faltantes(conn, metadata):
+    """Crea los índices declarados en los modelos que no existen en tablas ya creadas"""
+    insp = inspect(conn)
+    creados = []
+    for tabla in metadata.sorted_tables:
+        if not tabla.indexes or not insp.has_table(tabla.name):
+            continue
+        existentes = {ix['name'] for ix in insp.get_indexes(tabla.name)}
+        for index in tabla.indexes:
+            if index.name not in existentes:
+                index.create(conn)
+                creados.append(index.name)
+    return creados
+
+
+def _ondelete(valor):
+    return (valor or 'NO ACTION').upper()
+
+
+def sincronizar_claves_foraneas(conn, tabla):
+    """
+    Alinea el ON DELETE de las FOREIGN KEY de `tabla` con el declarado en el modelo.
+    PostgreSQL: DROP/ADD CONSTRAINT. SQLite no permite alterar restricciones,
+    así que la tabla se reconstruye. Devuelve True si hubo que cambiar algo.
+    """
+    insp = inspect(conn)
+    if not insp.has_table(tabla.name):
+        return False
+    reflejadas = {tuple(fk['constrained_columns']): fk for fk in insp.get_foreign_keys(tabla.name)}
+    pendientes = []
+    for fk in tabla.foreign_key_constraints:
+        actual = reflejadas.get(tuple(fk.column_keys))
+        if actual is None or _ondelete(actual['options'].get('ondelete')) != _ondelete(fk.ondelete):
+            pendientes.append((fk, actual))
+    if not pendientes:
+        return False
+
+    if conn.dialect.name == 'sqlite':
+        reconstruir_tabla_sqlite(conn, tabla)
+        return True
+    for fk, actual in pendientes:
+        if actual is not None and actual.get('name'):
+            conn.execute(text(f'ALTER TABLE {tabla.name} DROP CONSTRAINT "{actual["name"]}"'))
+        conn.execute(AddConstraint(fk))
+    return True
+
+
+def reconstruir_tabla_sqlite(conn, tabla):
+    """
+    Recrea `tabla` con la definición actual del modelo y copia sus filas.
+    Las filas huérfanas (FK a un padre que ya no existe, posibles mientras
+    SQLite no aplicaba las claves foráneas) se descartan.
+    """
+    legado = f'{tabla.name}_legado'
+    for indice in tabla.indexes:
+        conn.execute(text(f'DROP INDEX IF EXISTS {indice.name}'))
+    conn.execute(text(f'ALTER TABLE {tabla.name} RENAME TO {legado}'))
+    tabla.create(conn)
+
+    existentes = {c['name'] for c in inspect(conn).get_columns(legado)}
+    columnas = ', '.join(c.name for c in tabla.columns if c.name in existentes)
+    condiciones = [
+        f'({fk.parent.name} IS NULL OR {fk.parent.name} IN (SELECT {fk.column.name} FROM {fk.column.table.name}))'
+        for fk in tabla.foreign_keys
+    ]
+    donde = f" WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    conn.execute(text(f'INSERT INTO {tabla.name} ({columnas}) SELECT {columnas} FROM {legado}{donde}'))
+    conn.execute(text(f'DROP TABLE {legado}'))
@@ -0,0 +1,63 @@
+"""
+Paginación por cursor (keyset) para los listados de la API
+
+La página siguiente se pide con el cursor que devuelve la anterior: la
+posición (fecha, id) de la última fila. La consulta sigue desde ahí con
+WHERE (fecha, id) < (:fecha, :id), que usa el índice igual en la página 1
+que en la 100, en lugar de saltarse filas con OFFSET.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import tuple_
+
+
+def codificar_cursor(valores) -> str:
+    """Cursor opaco a partir de los valores de orden de la última fila"""
+    crudo = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores],
+                       separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str, columnas) -> list:
+    """Valores de orden de un cursor, convertidos al tipo de cada columna. ValueError si no es válido."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+        if not isinstance(valores, list) or len(valores) != len(columnas):
+            raise ValueError('cursor inválido')
+        convertidos = []
+        for valor, columna in zip(valores, columnas):
+            tipo = columna.type.python_type
+            if valor is None:
+                convertidos.append(None)
+            elif tipo is date:
+                convertidos.append(date.fromisoformat(valor))
+            elif tipo is datetime:
+                convertidos.append(datetime.fromisoformat(valor))
+            else:
+                convertidos.append(tipo(valor))
+    except (ValueError, TypeError):
+        # Manipulado o de otro listado: mismo 400 para cualquier cursor que no se pueda usar
+        raise ValueError('cursor inválido')
+    return convertidos
+
+
+def paginar(consulta, columnas, limite: int, cursor: str = None, descendente: bool = True):
+    """
+    Aplica orden, cursor y límite a `consulta` sobre `columnas` (la última debe
+    ser única, normalmente el id). Devuelve (filas, cursor_siguiente); el cursor
+    es None cuando no hay más páginas.
+    """
+    clave = tuple_(*columnas)
+    if cursor:
+        posicion = tuple_(*decodificar_cursor(cursor, columnas))
+        consulta = consulta.filter(clave < posicion if descendente else clave > posicion)
+    orden = [c.desc() if descendente else c.asc() for c in columnas]
+    filas = consulta.order_by(*orden).limit(limite + 1).all()
+    if len(filas) <= limite:
+        return filas, None
+    filas = filas[:limite]
+    ultima = filas[-1]
+    return filas, codificar_cursor([getattr(ultima, c.key) for c in columnas])
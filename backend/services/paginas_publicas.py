@@ -0,0 +1,233 @@
+"""
+Páginas públicas de lote pre-renderizadas como archivos estáticos
+
+El QR de cada lote abre /public/lote/<id>. En lugar de una página vacía que
+luego pide el JSON, se guarda en disco el HTML ya completo con el resumen
+del lote y la ruta solo envía el archivo: un escaneo no consulta la base ni
+calcula estadísticas. Cuando cambian los datos de un lote su página se borra
+y se vuelve a generar en un hilo de fondo; además se regenera al cambiar el
+día, porque muestra días transcurridos y restantes.
+
+Solo el hilo de fondo escribe páginas. Cada invalidación deja además en
+`lote_<id>.version` el instante en que se produjo, y una página cuyo
+renderizado empezó antes de la última invalidación del lote no se guarda:
+así un renderizado lento con datos viejos (de otro worker, por ejemplo) no
+puede pisar la página nueva.
+"""
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Iterable, Optional
+
+from markupsafe import escape
+
+log = logging.getLogger('pollo_control')
+
+PLANTILLA = """<!DOCTYPE html>
+<html lang='es'>
+<head>
+    <meta charset='utf-8'>
+    <meta name='viewport' content='width=device-width, initial-scale=1'>
+    <title>Reporte público del lote #{id}</title>
+    <style>
+        :root {{
+            --bg: #0f172a; --card:#0b1220; --text:#e2e8f0; --muted:#94a3b8; --border:#334155; --accent:#2563eb;
+        }}
+        body {{ margin:0; font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; background: var(--bg); color: var(--text); }}
+        .container {{ max-width: 720px; margin: 0 auto; padding: 1.25rem; }}
+        .card {{ background: var(--card); border:1px solid var(--border); border-radius:12px; padding:1.25rem; box-shadow: 0 1px 3px rgba(0,0,0,.5); }}
+        h1 {{ font-size:1.5rem; margin: 0 0 0.75rem; color: var(--text); }}
+        .muted {{ color: var(--muted); }}
+        .grid {{ display:grid; grid-template-columns: repeat(auto-fit, minmax(200px,1fr)); gap:.75rem; margin-top: .75rem; }}
+        .stat {{ background:#0f172a; border:1px solid var(--border); border-radius:10px; padding:.75rem; }}
+        .label {{ font-size:.75rem; color:var(--muted); text-transform:uppercase; letter-spacing:.04em; }}
+        .value {{ font-size:1.1rem; font-weight:600; }}
+        .header {{ display:flex; align-items:center; justify-content:space-between; margin-bottom: .75rem; }}
+        a.btn {{ display:inline-block; background:var(--accent); color:white; padding:.5rem .75rem; border-radius:8px; text-decoration:none; font-weight:600; }}
+    </style>
+</head>
+<body>
+    <div class='container'>
+        <div class='card'>
+            <div class='header'>
+                <h1>Lote #{id} · {nombre}</h1>
+                <a class='btn' href='/api/public/lotes/{id}' target='_blank' rel='noopener'>Ver JSON</a>
+            </div>
+            <div class='grid'>
+                <div class='stat'><div class='label'>Inicio</div><div class='value'>{inicio}</div></div>
+                <div class='stat'><div class='label'>Sacrificio</div><div class='value'>{sacrificio}</div></div>
+                <div class='stat'><div class='label'>Ciclo</div><div class='value'>{dias_transcurridos} / {dias_ciclo} días</div></div>
+                <div class='stat'><div class='label'>Restantes</div><div class='value'>{dias_restantes}</div></div>
+                <div class='stat'><div class='label'>Genética</div><div class='value'>{genetica}</div></div>
+                <div class='stat'><div class='label'>Aves</div><div class='value'>{cantidad_actual} / {cantidad_inicial}</div></div>
+                <div class='stat'><div class='label'>Peso Prom.</div><div class='value'>{peso} g</div></div>
+                <div class='stat'><div class='label'>FCR</div><div class='value'>{fcr}</div></div>
+                <div class='stat'><div class='label'>ADG</div><div class='value'>{adg} g/día</div></div>
+                <div class='stat'><div class='label'>Mortalidad</div><div class='value'>{mortalidad}%</div></div>
+            </div>
+            <p class='muted' style='margin-top:.75rem;'>Actualizado el {actualizado}. Enlace generado automáticamente. Compartible sin iniciar sesión.</p>
+        </div>
+    </div>
+</body>
+</html>"""
+
+PAGINA_NO_DISPONIBLE = """<!DOCTYPE html>
+<html lang='es'><head><meta charset='utf-8'><meta name='viewport' content='width=device-width, initial-scale=1'>
+<title>Lote no disponible</title></head>
+<body style='font-family: system-ui, sans-serif; background:#0f172a; color:#e2e8f0; padding:1.25rem;'>
+<p>⚠️ Lote no disponible o enlace inválido.</p></body></html>"""
+
+
+def _fecha(valor: str) -> str:
+    return date.fromisoformat(valor).strftime('%d/%m/%Y')
+
+
+def _valor(valor, defecto='-'):
+    return escape(defecto if valor is None else valor)
+
+
+def renderizar_pagina_lote(resumen: dict) -> str:
+    """HTML completo de la página pública a partir del resumen de /api/public/lotes/<id>"""
+    return PLANTILLA.format(
+        id=int(resumen['id']),
+        nombre=_valor(resumen.get('nombre'), ''),
+        inicio=_fecha(resumen['fecha_inicio']),
+        sacrificio=_fecha(resumen['fecha_sacrificio']),
+        dias_transcurridos=_valor(resumen.get('dias_transcurridos')),
+        dias_ciclo=_valor(resumen.get('dias_ciclo')),
+        dias_restantes=_valor(resumen.get('dias_restantes')),
+        genetica=_valor(resumen.get('genetica') or None),
+        cantidad_actual=_valor(resumen.get('cantidad_actual')),
+        cantidad_inicial=_valor(resumen.get('cantidad_inicial')),
+        peso=_valor(resumen.get('peso_promedio_actual_g')),
+        fcr=_valor(resumen.get('fcr')),
+        adg=_valor(resumen.get('adg_g_dia')),
+        mortalidad=_valor(resumen.get('mortalidad_porcentaje'), 0),
+        actualizado=datetime.now().strftime('%d/%m/%Y %H:%M'),
+    )
+
+
+class PaginasPublicas:
+    """
+    Archivos `lote_<id>.html` en `directorio`. `renderizar(lote_id)` devuelve
+    el HTML del lote o None si no existe; el hilo de fondo lo llama al
+    generar una página, tras una invalidación o cuando la pide `programar`.
+    """
+
+    def __init__(self, directorio: str, renderizar: Callable[[int], Optional[str]]):
+        self.directorio = directorio
+        self._renderizar = renderizar
+        self._pendientes = queue.Queue()
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ruta(self, lote_id: int) -> str:
+        return os.path.join(self.directorio, f'lote_{int(lote_id)}.html')
+
+    def _ruta_version(self, lote_id: int) -> str:
+        return os.path.join(self.directorio, f'lote_{int(lote_id)}.version')
+
+    def _version(self, lote_id: int) -> int:
+        """Instante (ns) de la última invalidación del lote; 0 si nunca se invalidó"""
+        try:
+            with open(self._ruta_version(lote_id), encoding='utf-8') as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return 0
+
+    def vigente(self, lote_id: int) -> Optional[str]:
+        """Ruta de la página si existe y se generó hoy"""
+        ruta = self.ruta(lote_id)
+        try:
+            generada = date.fromtimestamp(os.path.getmtime(ruta))
+        except OSError:
+            return None
+        return ruta if generada == date.today() else None
+
+    def generar(self, lote_id: int) -> Optional[str]:
+        """
+        Renderiza y escribe la página (reemplazo atómico). None si el lote no
+        existe o si el lote se invalidó mientras se renderizaba: esa página
+        puede llevar datos anteriores al cambio y la regeneración que encoló
+        la invalidación escribirá la buena.
+        """
+        inicio = time.time_ns()
+        html = self._renderizar(lote_id)
+        ruta = self.ruta(lote_id)
+        if html is None:
+            self._borrar(ruta)
+            return None
+        if self._version(lote_id) >= inicio:
+            return None
+        self._escribir(ruta, html)
+        if self._version(lote_id) >= inicio:
+            # Invalidado entre la comprobación y el reemplazo
+            self._borrar(ruta)
+            return None
+        return ruta
+
+    def programar(self, lote_ids: Iterable[int]):
+        """Encola la regeneración en segundo plano de las páginas de `lote_ids` sin borrarlas"""
+        lote_ids = set(lote_ids)
+        if lote_ids:
+            self._asegurar_hilo()
+            for lote_id in lote_ids:
+                self._pendientes.put(lote_id)
+
+    def invalidar(self, lote_ids: Iterable[int], regenerar: bool = True):
+        """Borra las páginas de `lote_ids` y, si se pide, las regenera en segundo plano"""
+        lote_ids = set(lote_ids)
+        for lote_id in lote_ids:
+            # Primero la versión: un renderizado en curso ya no podrá guardar su página
+            self._escribir(self._ruta_version(lote_id), str(time.time_ns()))
+            self._borrar(self.ruta(lote_id))
+        if regenerar:
+            self.programar(lote_ids)
+
+    def _escribir(self, ruta, texto):
+        os.makedirs(self.directorio, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, prefix='.lote_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(texto)
+            os.replace(temporal, ruta)
+        except BaseException:
+            self._borrar(temporal)
+            raise
+
+    def _borrar(self, ruta):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+    def _asegurar_hilo(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Proceso hijo tras un fork: la cola y el hilo del padre no sirven aquí
+                self._pid = os.getpid()
+                self._pendientes = queue.Queue()
+                self._hilo = None
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name='paginas-publicas', daemon=True)
+                self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            # Varios cambios seguidos del mismo lote se resuelven con una sola regeneración
+            lote_ids = {self._pendientes.get()}
+            while True:
+                try:
+                    lote_ids.add(self._pendientes.get_nowait())
+                except queue.Empty:
+                    break
+            for lote_id in sorted(lote_ids):
+                try:
+                    self.generar(lote_id)
+                except Exception:
+                    log.exception("Error regenerando la página pública del lote %s", lote_id)
@@ -0,0 +1,150 @@
+"""
+Particionado por rango de fechas (anual) en PostgreSQL
+
+Las tablas se declaran en el modelo con
+    __table_args__ = (..., {'info': {'particion_rango': 'fecha'}})
+y conservan la misma API del ORM; en SQLite siguen siendo una sola tabla.
+Cada año vive en `<tabla>_<año>` y lo que quede fuera de los rangos creados
+cae en `<tabla>_default`.
+"""
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.schema import AddConstraint, CreateIndex, ForeignKeyConstraint, UniqueConstraint
+
+
+def tablas_particionables(metadata):
+    """(Table, columna) de las tablas que declaran info['particion_rango']"""
+    return [(t, t.info['particion_rango']) for t in metadata.sorted_tables if t.info.get('particion_rango')]
+
+
+def es_particionada(conn, tabla: str) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :tabla AND pg_table_is_visible(c.oid)"
+    ), {'tabla': tabla}).first() is not None
+
+
+def listar_particiones(conn, tabla: str) -> List[dict]:
+    """Particiones de `tabla` con su rango y filas estimadas"""
+    filas = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint "
+        "FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :tabla AND pg_table_is_visible(p.oid) "
+        "ORDER BY c.relname"
+    ), {'tabla': tabla}).all()
+    return [{'nombre': n, 'rango': rango, 'filas_estimadas': max(int(filas_est), 0)} for n, rango, filas_est in filas]
+
+
+def _rango(anio: int):
+    return date(anio, 1, 1).isoformat(), date(anio + 1, 1, 1).isoformat()
+
+
+def crear_particion(conn, tabla: str, columna: str, anio: int) -> bool:
+    """Crea la partición del año; si la partición por defecto ya tiene filas de ese rango, las traslada"""
+    nombre = f'{tabla}_{anio}'
+    if conn.execute(text("SELECT to_regclass(:n)"), {'n': nombre}).scalar() is not None:
+        return False
+    desde, hasta = _rango(anio)
+    defecto = f'{tabla}_default'
+    con_filas = False
+    if conn.execute(text("SELECT to_regclass(:n)"), {'n': defecto}).scalar() is not None:
+        con_filas = conn.execute(text(
+            f"SELECT 1 FROM {defecto} WHERE {columna} >= :desde AND {columna} < :hasta LIMIT 1"
+        ), {'desde': desde, 'hasta': hasta}).first() is not None
+
+    if not con_filas:
+        conn.execute(text(
+            f"CREATE TABLE {nombre} PARTITION OF {tabla} FOR VALUES FROM ('{desde}') TO ('{hasta}')"
+        ))
+        return True
+
+    # Adjuntar una tabla ya cargada: mover las filas fuera de la partición por defecto primero
+    conn.execute(text(f"CREATE TABLE {nombre} (LIKE {tabla} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(
+        f"WITH movidas AS (DELETE FROM {defecto} WHERE {columna} >= :desde AND {columna} < :hasta RETURNING *) "
+        f"INSERT INTO {nombre} SELECT * FROM movidas"
+    ), {'desde': desde, 'hasta': hasta})
+    conn.execute(text(
+        f"ALTER TABLE {tabla} ATTACH PARTITION {nombre} FOR VALUES FROM ('{desde}') TO ('{hasta}')"
+    ))
+    return True
+
+
+def asegurar_particiones(conn, tabla: str, columna: str, anios_adelante: int = 2) -> List[str]:
+    """Crea las particiones del año en curso y de los `anios_adelante` siguientes"""
+    actual = date.today().year
+    return [f'{tabla}_{anio}' for anio in range(actual, actual + anios_adelante + 1)
+            if crear_particion(conn, tabla, columna, anio)]
+
+
+def particionar_tabla(conn, tabla_sa, columna: str, anios_adelante: int = 2) -> bool:
+    """
+    Convierte una tabla existente en particionada por rango anual de `columna`.
+
+    La tabla original se renombra, se crea la particionada con las mismas
+    columnas y valores por defecto (incluida la secuencia del id), se crean
+    las particiones desde el año más antiguo con datos, se copian las filas y
+    se elimina la original. La clave primaria pasa a ser (id, columna) porque
+    PostgreSQL exige que incluya la clave de partición.
+    """
+    tabla = tabla_sa.name
+    if es_particionada(conn, tabla):
+        return False
+    legado = f'{tabla}_legado'
+
+    conn.execute(text(f"ALTER TABLE {tabla} RENAME TO {legado}"))
+    # Los nombres de restricciones e índices son globales al esquema: liberar los de la tabla original
+    for (restriccion,) in conn.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:t AS regclass)"
+    ), {'t': legado}).all():
+        conn.execute(text(f'ALTER TABLE {legado} RENAME CONSTRAINT "{restriccion}" TO "{restriccion}_legado"'))
+    for (indice,) in conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :t"
+    ), {'t': legado}).all():
+        if not indice.endswith('_legado'):
+            conn.execute(text(f'ALTER INDEX "{indice}" RENAME TO "{indice}_legado"'))
+
+    pk = [c.name for c in tabla_sa.primary_key.columns]
+    if columna not in pk:
+        pk.append(columna)
+    conn.execute(text(
+        f"CREATE TABLE {tabla} (LIKE {legado} INCLUDING DEFAULTS, PRIMARY KEY ({', '.join(pk)})) "
+        f"PARTITION BY RANGE ({columna})"
+    ))
+    for restriccion in tabla_sa.constraints:
+        if isinstance(restriccion, (UniqueConstraint, ForeignKeyConstraint)):
+            conn.execute(AddConstraint(restriccion))
+    for indice in tabla_sa.indexes:
+        conn.execute(CreateIndex(indice))
+
+    # La secuencia del id pasa a pertenecer a la tabla nueva antes de borrar la original
+    for col in tabla_sa.primary_key.columns:
+        secuencia = conn.execute(text("SELECT pg_get_serial_sequence(:t, :c)"), {'t': legado, 'c': col.name}).scalar()
+        if secuencia:
+            conn.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY {tabla}.{col.name}"))
+
+    minimo = conn.execute(text(f"SELECT MIN({columna}) FROM {legado}")).scalar()
+    actual = date.today().year
+    for anio in range(min(minimo.year, actual) if minimo else actual, actual + anios_adelante + 1):
+        crear_particion(conn, tabla, columna, anio)
+    conn.execute(text(f"CREATE TABLE {tabla}_default PARTITION OF {tabla} DEFAULT"))
+
+    columnas = ', '.join(c.name for c in tabla_sa.columns)
+    conn.execute(text(f"INSERT INTO {tabla} ({columnas}) SELECT {columnas} FROM {legado}"))
+    conn.execute(text(f"DROP TABLE {legado}"))
+    return True
+
+
+def desacoplar_particion(conn, tabla: str, anio: int) -> str:
+    """
+    Separa la partición de un año: sus filas dejan de verse en `tabla` pero
+    siguen en `<tabla>_<año>` como tabla independiente (para pg_dump/archivo).
+    Es una operación de catálogo, no copia filas.
+    """
+    nombre = f'{tabla}_{anio}'
+    conn.execute(text(f"ALTER TABLE {tabla} DETACH PARTITION {nombre}"))
+    return nombre
@@ -0,0 +1,107 @@
+"""
+Caché de respuestas y límite de peticiones por IP para los endpoints públicos
+
+Las páginas y el JSON público de un lote se abren escaneando QR impresos y
+no llevan token. `CacheTTL` guarda la respuesta ya serializada unos segundos
+para que un enlace compartido masivamente no recalcule estadísticas en cada
+visita, y `LimitadorTokens` (token bucket por clave, normalmente la IP)
+corta a los clientes que piden más de lo razonable, como un crawler que
+recorre ids. Ambos viven en memoria de cada proceso.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+
+
+class CacheTTL:
+    """Diccionario con vencimiento por entrada y tamaño máximo (descarta la más antigua)"""
+
+    def __init__(self, ttl_seg: float, max_entradas: int = 1024):
+        self.ttl_seg = ttl_seg
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Valor guardado o None si no existe o venció"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence <= time.monotonic():
+                del self._datos[clave]
+                return None
+            return valor
+
+    def guardar(self, clave, valor):
+        if self.ttl_seg <= 0:
+            return
+        with self._lock:
+            self._datos.pop(clave, None)
+            self._datos[clave] = (time.monotonic() + self.ttl_seg, valor)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, clave=None):
+        """Descarta `clave`, o todo si no se indica"""
+        with self._lock:
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
+
+
+class LimitadorTokens:
+    """
+    Token bucket por clave: cada clave acumula hasta `rafaga` fichas y recupera
+    `por_minuto` fichas por minuto; cada petición gasta una.
+    """
+
+    def __init__(self, por_minuto: float, rafaga: int, max_claves: int = 10000):
+        self.por_segundo = por_minuto / 60.0
+        self.rafaga = max(1, rafaga)
+        self.max_claves = max_claves
+        self._cubetas = {}
+        self._lock = threading.Lock()
+
+    def consumir(self, clave) -> float:
+        """0 si la petición entra; si no, segundos hasta que haya una ficha"""
+        ahora = time.monotonic()
+        with self._lock:
+            fichas, ultima = self._cubetas.get(clave, (self.rafaga, ahora))
+            fichas = min(self.rafaga, fichas + (ahora - ultima) * self.por_segundo)
+            if fichas < 1:
+                self._cubetas[clave] = (fichas, ahora)
+                return (1 - fichas) / self.por_segundo
+            self._cubetas[clave] = (fichas - 1, ahora)
+            if len(self._cubetas) > self.max_claves:
+                self._podar(ahora)
+            return 0
+
+    def _podar(self, ahora):
+        # Las cubetas que ya se habrían llenado equivalen a no tener cubeta
+        llenado = self.rafaga / self.por_segundo
+        for clave in [c for c, (_, ultima) in self._cubetas.items() if ahora - ultima >= llenado]:
+            del self._cubetas[clave]
+
+
+def limitar_peticiones(limitador: LimitadorTokens):
+    """Decorador: responde 429 con Retry-After cuando la IP del cliente agotó sus fichas"""
+    def decorador(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if limitador.por_segundo > 0:
+                espera = limitador.consumir(request.remote_addr or '-')
+                if espera:
+                    respuesta = jsonify({'mensaje': 'Demasiadas peticiones. Intente de nuevo en unos segundos.'})
+                    respuesta.status_code = 429
+                    respuesta.headers['Retry-After'] = str(math.ceil(espera))
+                    return respuesta
+            return f(*args, **kwargs)
+        return decorated
+    return decorador
@@ -0,0 +1,121 @@
+"""
+Imágenes QR en caché de disco y hoja de etiquetas en PDF
+
+Cada imagen se guarda una sola vez en la carpeta de exportes con un nombre
+derivado del contenido del QR (la URL pública del lote) y el formato, así que
+volver a pedirla solo envía el archivo. Si cambia la URL base cambia el
+nombre y se genera una imagen nueva. `hoja_etiquetas_pdf` arma en una sola
+pasada una hoja imprimible con una etiqueta por lote usando esas imágenes.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from typing import Iterable, Optional
+
+try:
+    import qrcode
+    import qrcode.image.svg
+    QRCODE_DISPONIBLE = True
+except ImportError:
+    QRCODE_DISPONIBLE = False
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas
+    REPORTLAB_DISPONIBLE = True
+except ImportError:
+    REPORTLAB_DISPONIBLE = False
+
+FORMATOS_QR = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+class CacheQR:
+    """Archivos `qr_<hash>.<formato>` en `directorio`, con el hash de (contenido, formato)"""
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+
+    def ruta(self, contenido: str, formato: str = 'png') -> str:
+        clave = hashlib.sha256(f'{formato}\n{contenido}'.encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.directorio, f'qr_{clave}.{formato}')
+
+    def obtener(self, contenido: str, formato: str = 'png') -> str:
+        """Ruta de la imagen del QR; la genera solo si aún no está en disco"""
+        if formato not in FORMATOS_QR:
+            raise ValueError(f"Formato de QR no soportado: {formato} (use {', '.join(FORMATOS_QR)})")
+        ruta = self.ruta(contenido, formato)
+        if not os.path.isfile(ruta):
+            self._escribir(ruta, _generar(contenido, formato))
+        return ruta
+
+    def _escribir(self, ruta: str, datos: bytes):
+        # Reemplazo atómico: otro proceso puede estar generando la misma imagen
+        os.makedirs(self.directorio, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, prefix='.qr_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+
+def _generar(contenido: str, formato: str) -> bytes:
+    if not QRCODE_DISPONIBLE:
+        raise ImportError('qrcode no está instalado. pip install qrcode[pil]')
+    buf = io.BytesIO()
+    if formato == 'svg':
+        qrcode.make(contenido, image_factory=qrcode.image.svg.SvgPathImage).save(buf)
+    else:
+        qrcode.make(contenido).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def hoja_etiquetas_pdf(etiquetas: Iterable[dict], cache: CacheQR, columnas: int = 3, filas: int = 4,
+                       titulo: Optional[str] = None) -> bytes:
+    """
+    PDF A4 con una cuadrícula de etiquetas. Cada etiqueta es un dict con
+    `url` (contenido del QR), `titulo` y opcionalmente `lineas` (textos bajo
+    el título). Las imágenes salen de `cache`, generándose solo las que faltan.
+    """
+    if not REPORTLAB_DISPONIBLE:
+        raise ImportError('reportlab no está instalado. pip install reportlab')
+    ancho, alto = A4
+    margen = 10 * mm
+    celda_w = (ancho - 2 * margen) / columnas
+    celda_h = (alto - 2 * margen) / filas
+    lado_qr = min(celda_w, celda_h) - 22 * mm
+
+    buf = io.BytesIO()
+    pdf = canvas.Canvas(buf, pagesize=A4)
+    pdf.setTitle(titulo or 'Etiquetas QR')
+    por_hoja = columnas * filas
+    for n, etiqueta in enumerate(etiquetas):
+        if n and n % por_hoja == 0:
+            pdf.showPage()
+        col, fila = n % columnas, (n % por_hoja) // columnas
+        x = margen + col * celda_w
+        y = alto - margen - (fila + 1) * celda_h
+
+        # Guía de corte
+        pdf.setStrokeGray(0.8)
+        pdf.setDash(2, 2)
+        pdf.rect(x, y, celda_w, celda_h)
+        pdf.setDash()
+
+        pdf.drawImage(cache.obtener(etiqueta['url'], 'png'), x + (celda_w - lado_qr) / 2, y + celda_h - lado_qr - 4 * mm,
+                      width=lado_qr, height=lado_qr)
+        centro = x + celda_w / 2
+        texto_y = y + celda_h - lado_qr - 9 * mm
+        pdf.setFont('Helvetica-Bold', 11)
+        pdf.drawCentredString(centro, texto_y, str(etiqueta['titulo'])[:40])
+        pdf.setFont('Helvetica', 8)
+        for linea in etiqueta.get('lineas', ())[:3]:
+            texto_y -= 4 * mm
+            pdf.drawCentredString(centro, texto_y, str(linea)[:55])
+    pdf.save()
+    return buf.getvalue()
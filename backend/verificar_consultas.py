@@ -0,0 +1,177 @@
+"""
+Verifica que los endpoints de lectura respetan su presupuesto de consultas SQL
+
+Uso (desde la carpeta backend):
+    python verificar_consultas.py [--detalle]
+
+Crea una base SQLite temporal, la llena con pocos lotes y luego con más, y
+llama a cada endpoint en ambos casos contando las sentencias ejecutadas.
+Falla si un endpoint supera el presupuesto declarado con
+@presupuesto_consultas o si el número de consultas crece con la cantidad de
+lotes o filas (N+1 por carga perezosa). Termina con código 1 si algo falla.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Base de datos y carpeta de datos temporales antes de importar la app
+_TMP = tempfile.mkdtemp(prefix='pollo_consultas_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_TMP, 'consultas.db')}"
+os.environ['DATA_DIR'] = _TMP
+os.environ.setdefault('INGESTA_SPOOL', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('PUBLICO_CACHE_SEG', '0')  # Medir el endpoint público sin su caché
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from sqlalchemy import event, insert  # noqa: E402
+from app import app, db, aplicar_migraciones, Lote, RegistroDiario, Costo, Ingreso, Sanidad, Enfermedad  # noqa: E402
+from services.consultas import presupuesto_de  # noqa: E402
+
+# (método, ruta, cuerpo JSON); {id} es el primer lote sembrado
+ENDPOINTS = [
+    ('GET', '/api/lotes', None),
+    ('GET', '/api/lotes?fields=id,nombre,dias_restantes', None),
+    ('GET', '/api/lotes?include=stats,alertas', None),
+    ('GET', '/api/lotes/{id}', None),
+    ('GET', '/api/lotes/{id}/registros', None),
+    ('GET', '/api/lotes/{id}/costos', None),
+    ('GET', '/api/lotes/{id}/ingresos', None),
+    ('GET', '/api/lotes/{id}/sanidad', None),
+    ('GET', '/api/lotes/{id}/estadisticas', None),
+    ('GET', '/api/lotes/{id}/curva-peso', None),
+    ('GET', '/api/lotes/{id}/curva-mortalidad', None),
+    ('GET', '/api/lotes/{id}/alertas', None),
+    ('GET', '/api/lotes/{id}/resumen-economico', None),
+    ('GET', '/api/lotes/{id}/export?formato=xlsx&semana={semana}', None),
+    ('GET', '/api/lotes/{id}/exportar-csv', None),
+    ('GET', '/api/dashboard', None),
+    ('GET', '/api/alertas', None),
+    ('GET', '/api/estadisticas-generales', None),
+    ('GET', '/api/enfermedades', None),
+    ('GET', '/api/lotes/archivados', None),
+    ('GET', '/api/sync', None),
+    ('GET', '/api/public/lotes/{id}', None),
+    ('GET', '/api/lotes/{id}/qr', None),
+    ('GET', '/api/lotes/etiquetas-qr', None),
+    ('POST', '/api/comparar-lotes', 'lotes'),
+    ('POST', '/api/batch', 'detalle'),
+]
+
+# Peticiones de /api/batch: lo que pide el detalle de un lote
+DETALLE_LOTE = ['/lotes/{id}', '/lotes/{id}/estadisticas', '/lotes/{id}/alertas', '/lotes/{id}/registros',
+                '/lotes/{id}/costos', '/lotes/{id}/ingresos', '/lotes/{id}/sanidad', '/lotes/{id}/curva-peso']
+
+INICIO = date.today() - timedelta(days=20)
+
+
+def sembrar(cantidad):
+    """Agrega `cantidad` lotes activos con registros, costos, ingresos y sanidad (con enfermedad)"""
+    with app.app_context():
+        sesion = db.session
+        enfermedad_ids = sesion.execute(insert(Enfermedad).returning(Enfermedad.id), [
+            {'nombre': f'Enfermedad {cantidad}-{i}'} for i in range(3)
+        ]).scalars().all()
+        ids = sesion.execute(insert(Lote).returning(Lote.id), [
+            {'nombre': f'Lote {i}', 'fecha_inicio': INICIO, 'cantidad_inicial': 1000,
+             'cantidad_actual': 1000, 'estado': 'activo', 'dias_ciclo': 42} for i in range(cantidad)
+        ]).scalars().all()
+        for lote_id in ids:
+            dias = [INICIO + timedelta(days=d) for d in range(21)]
+            sesion.execute(insert(RegistroDiario), [
+                {'lote_id': lote_id, 'fecha': f, 'alimento_kg': 50.0 + n, 'agua_litros': 100.0, 'mortalidad': 1,
+                 'peso_promedio': 40.0 + n * 50, 'temperatura_promedio': 30.0, 'humedad': 60.0}
+                for n, f in enumerate(dias)])
+            sesion.execute(insert(Costo), [
+                {'lote_id': lote_id, 'categoria': 'Alimento', 'concepto': 'Bulto', 'monto': 100.0, 'fecha': f}
+                for f in dias[::3]])
+            sesion.execute(insert(Ingreso), [
+                {'lote_id': lote_id, 'cantidad_vendida': 100, 'peso_promedio': 2.0, 'precio_por_kg': 7.0,
+                 'total': 1400.0, 'fecha': dias[-1]}])
+            sesion.execute(insert(Sanidad), [
+                {'lote_id': lote_id, 'tipo': 'Tratamiento', 'producto': 'Antibiótico', 'fecha': f,
+                 'enfermedad_id': enfermedad_ids[n % len(enfermedad_ids)]}
+                for n, f in enumerate(dias[::2])])
+        sesion.commit()
+    return ids
+
+
+def medir(cliente, headers, lote_ids):
+    """{(método, ruta): (status, [sentencias])} de cada endpoint; compara todos los `lote_ids`"""
+    sentencias = []
+
+    def capturar(conn, cursor, sentencia, parametros, contexto, executemany):
+        sentencias.append(sentencia)
+
+    semana = '{}-W{:02d}'.format(*date.today().isocalendar()[:2])
+    resultados = {}
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capturar)
+    try:
+        for metodo, ruta, cuerpo in ENDPOINTS:
+            url = ruta.format(id=lote_ids[0], semana=semana)
+            json_body = {'lotes': lote_ids} if cuerpo == 'lotes' else None
+            if cuerpo == 'detalle':
+                json_body = {'peticiones': [r.format(id=lote_ids[0]) for r in DETALLE_LOTE]}
+            sentencias.clear()
+            resp = cliente.open(url, method=metodo, json=json_body, headers=headers)
+            resultados[(metodo, ruta)] = (resp.status_code, list(sentencias))
+    finally:
+        event.remove(engine, 'before_cursor_execute', capturar)
+    return resultados
+
+
+def verificar(detalle=False):
+    aplicar_migraciones()
+
+    cliente = app.test_client()
+    token = cliente.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    pocos = sembrar(2)
+    antes = medir(cliente, headers, pocos)
+    despues = medir(cliente, headers, pocos + sembrar(10))
+
+    rutas = app.url_map.bind('localhost')
+    fallos = 0
+    for metodo, ruta, _ in ENDPOINTS:
+        status, sql_pocos = antes[(metodo, ruta)]
+        status2, sql_muchos = despues[(metodo, ruta)]
+        endpoint, _ = rutas.match(ruta.split('?')[0].format(id=pocos[0]), method=metodo)
+        presupuesto = presupuesto_de(app, endpoint)
+        if metodo == 'POST' and ruta == '/api/batch':
+            # Igual que la vista: 1 (token) + el presupuesto de cada subpetición
+            presupuesto = 1 + sum(presupuesto_de(app, rutas.match('/api' + r.format(id=pocos[0]))[0])
+                                  for r in DETALLE_LOTE)
+        problemas = []
+        if status >= 400 or status2 >= 400:
+            problemas.append(f'HTTP {status}/{status2}')
+        if presupuesto is None:
+            problemas.append('sin presupuesto declarado')
+        elif len(sql_muchos) > presupuesto:
+            problemas.append(f'excede el presupuesto ({len(sql_muchos)} > {presupuesto})')
+        if len(sql_muchos) > len(sql_pocos):
+            problemas.append(f'crece con los datos ({len(sql_pocos)} -> {len(sql_muchos)}): N+1')
+
+        marca = '❌' if problemas else '✅'
+        print(f"{marca} {metodo:<4} {ruta:<52} {len(sql_muchos):>3} consultas"
+              f" (presupuesto {presupuesto if presupuesto is not None else '-'})"
+              + (f" · {'; '.join(problemas)}" if problemas else ''))
+        if problemas:
+            fallos += 1
+        if detalle or problemas:
+            for sentencia in sql_muchos:
+                print('      ' + ' '.join(sentencia.split())[:160])
+
+    print(f"\n{len(ENDPOINTS) - fallos}/{len(ENDPOINTS)} endpoints dentro del presupuesto")
+    return fallos == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Presupuesto de consultas SQL por endpoint')
+    parser.add_argument('--detalle', action='store_true', help='Mostrar las sentencias de cada endpoint')
+    args = parser.parse_args()
+    sys.exit(0 if verificar(args.detalle) else 1)
@@ -0,0 +1,120 @@
+"""
+Verifica con EXPLAIN que las consultas principales de la API usan índices
+
+Uso (desde la carpeta backend, contra la base configurada en DATABASE_URL):
+    python verificar_indices.py [--detalle]
+
+En SQLite se usa EXPLAIN QUERY PLAN y falla si alguna consulta recorre una
+tabla completa (SCAN sin índice) u ordena con un B-tree temporal. En
+PostgreSQL se desactiva enable_seqscan para la sesión (con tablas pequeñas
+el planificador prefiere recorrerlas) y falla si aún aparece un Seq Scan.
+Termina con código 1 si alguna consulta no usa índice.
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, '.')
+from sqlalchemy import select, func, text, tuple_  # noqa: E402
+from app import app, db, Lote, RegistroDiario, Costo, Ingreso, Sanidad  # noqa: E402
+
+
+def consultas_principales():
+    """(descripción, sentencia) de las rutas calientes de la API"""
+    lote_id = 1
+    inicio = date.today() - timedelta(days=6)
+    fin = date.today()
+    return [
+        ('GET /api/lotes',
+         select(Lote).order_by(Lote.fecha_inicio.desc(), Lote.id.desc())),
+        ('GET /api/dashboard (lotes activos)',
+         select(Lote).where(Lote.estado == 'activo')),
+        ('GET /api/lotes/:id/registros',
+         select(RegistroDiario).where(RegistroDiario.lote_id == lote_id)
+         .order_by(RegistroDiario.fecha.desc(), RegistroDiario.id.desc())),
+        ('GET /api/lotes/:id/alertas (último registro)',
+         select(RegistroDiario).where(RegistroDiario.lote_id == lote_id)
+         .order_by(RegistroDiario.fecha.desc()).limit(1)),
+        ('GET /api/lotes/:id/costos',
+         select(Costo).where(Costo.lote_id == lote_id).order_by(Costo.fecha.desc(), Costo.id.desc())),
+        ('GET /api/lotes/:id/ingresos',
+         select(Ingreso).where(Ingreso.lote_id == lote_id).order_by(Ingreso.fecha.desc(), Ingreso.id.desc())),
+        ('GET /api/lotes/:id/sanidad',
+         select(Sanidad).where(Sanidad.lote_id == lote_id).order_by(Sanidad.fecha.desc(), Sanidad.id.desc())),
+        ('GET /api/lotes/:id/costos?limit&cursor (página siguiente)',
+         select(Costo).where(Costo.lote_id == lote_id, tuple_(Costo.fecha, Costo.id) < tuple_(fin, 10 ** 6))
+         .order_by(Costo.fecha.desc(), Costo.id.desc()).limit(51)),
+        ('GET /api/lotes/:id/registros?limit&cursor (página siguiente)',
+         select(RegistroDiario).where(RegistroDiario.lote_id == lote_id,
+                                      tuple_(RegistroDiario.fecha, RegistroDiario.id) < tuple_(fin, 10 ** 6))
+         .order_by(RegistroDiario.fecha.desc(), RegistroDiario.id.desc()).limit(51)),
+        ('GET /api/lotes/:id/export (semana) (registros)',
+         select(RegistroDiario).where(RegistroDiario.lote_id == lote_id,
+                                      RegistroDiario.fecha >= inicio, RegistroDiario.fecha <= fin)
+         .order_by(RegistroDiario.fecha.asc())),
+        ('GET /api/lotes/:id/export (semana) (costos)',
+         select(Costo).where(Costo.lote_id == lote_id, Costo.fecha >= inicio, Costo.fecha <= fin)
+         .order_by(Costo.fecha.asc())),
+        ('GET /api/lotes/:id/export (semana) (sanidad)',
+         select(Sanidad).where(Sanidad.lote_id == lote_id, Sanidad.fecha >= inicio, Sanidad.fecha <= fin)
+         .order_by(Sanidad.fecha.asc())),
+        ('GET /api/lotes/:id/resumen-economico (costos)',
+         select(Costo.lote_id, func.sum(Costo.monto)).where(Costo.lote_id.in_([lote_id])).group_by(Costo.lote_id)),
+        ('GET /api/lotes/:id/resumen-economico (ingresos)',
+         select(Ingreso.lote_id, func.sum(Ingreso.total)).where(Ingreso.lote_id.in_([lote_id]))
+         .group_by(Ingreso.lote_id)),
+        ('Mortalidad acumulada por lote',
+         select(RegistroDiario.lote_id, func.sum(RegistroDiario.mortalidad))
+         .where(RegistroDiario.lote_id == lote_id).group_by(RegistroDiario.lote_id)),
+    ]
+
+
+def _plan_sqlite(conn, sql):
+    filas = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+    plan = [fila[-1] for fila in filas]
+    problemas = [
+        linea for linea in plan
+        if (linea.startswith('SCAN') and 'USING' not in linea) or 'TEMP B-TREE FOR ORDER BY' in linea
+    ]
+    return plan, problemas
+
+
+def _plan_postgres(conn, sql):
+    plan = [fila[0] for fila in conn.exec_driver_sql(f'EXPLAIN {sql}').fetchall()]
+    problemas = [linea.strip() for linea in plan if 'Seq Scan' in linea]
+    return plan, problemas
+
+
+def verificar(detalle=False):
+    fallos = 0
+    with app.app_context():
+        engine = db.engine
+        dialecto = engine.dialect.name
+        explicar = _plan_postgres if dialecto == 'postgresql' else _plan_sqlite
+        with engine.connect() as conn:
+            if dialecto == 'postgresql':
+                conn.execute(text('SET enable_seqscan = off'))
+            print(f'🔎 Verificando planes de consulta ({dialecto})\n')
+            for descripcion, sentencia in consultas_principales():
+                sql = str(sentencia.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+                plan, problemas = explicar(conn, sql)
+                if problemas:
+                    fallos += 1
+                    print(f'❌ {descripcion}')
+                    for linea in problemas:
+                        print(f'     {linea}')
+                else:
+                    print(f'✅ {descripcion}')
+                if detalle:
+                    for linea in plan:
+                        print(f'     · {linea}')
+            conn.rollback()
+    print(f'\n{"❌" if fallos else "✅"} {fallos} consultas sin índice')
+    return fallos == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Verifica que las consultas principales usan índices')
+    parser.add_argument('--detalle', action='store_true', help='Mostrar el plan completo de cada consulta')
+    args = parser.parse_args()
+    sys.exit(0 if verificar(args.detalle) else 1)
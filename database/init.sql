@@ -94,11 +94,13 @@ CREATE TABLE IF NOT EXISTS configuracion (
 );
 
 -- Crear índices para mejor rendimiento
-CREATE INDEX IF NOT EXISTS idx_lote_estado ON lotes(estado);
+-- (mismos nombres que los declarados en los modelos de backend/app.py)
+CREATE INDEX IF NOT EXISTS idx_lotes_estado_fecha ON lotes(estado, fecha_inicio);
+CREATE INDEX IF NOT EXISTS idx_lotes_fecha_inicio ON lotes(fecha_inicio);
 CREATE INDEX IF NOT EXISTS idx_registro_fecha ON registros_diarios(lote_id, fecha);
-CREATE INDEX IF NOT EXISTS idx_costos_lote ON costos(lote_id);
-CREATE INDEX IF NOT EXISTS idx_sanidad_lote ON sanidad(lote_id);
-CREATE INDEX IF NOT EXISTS idx_ingresos_lote ON ingresos(lote_id);
+CREATE INDEX IF NOT EXISTS idx_costos_lote_fecha ON costos(lote_id, fecha);
+CREATE INDEX IF NOT EXISTS idx_sanidad_lote_fecha ON sanidad(lote_id, fecha);
+CREATE INDEX IF NOT EXISTS idx_ingresos_lote_fecha ON ingresos(lote_id, fecha);
 
 -- ============================================
 -- DATOS DE EJEMPLO (OPCIONAL)
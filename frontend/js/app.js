@@ -0,0 +1,127 @@
+// ENTRADA: login, tema y carga inicial del dashboard. El resto de secciones (modales,
+// detalle del lote, gráficas con Chart.js, exportes...) se importa al usarse.
+import {
+    API_URL, estado, registrarSecciones, seccion, applyTheme, toggleTheme, logout, openModal, closeModal
+} from './nucleo.js';
+import { loadDashboard } from './dashboard.js';
+
+registrarSecciones({
+    lotes: () => import('./secciones/lotes.js'),
+    detalle: () => import('./secciones/detalle.js'),
+    exportar: () => import('./secciones/exportar.js'),
+    registros: () => import('./secciones/registros.js'),
+    economia: () => import('./secciones/economia.js'),
+    sanidad: () => import('./secciones/sanidad.js'),
+    enfermedades: () => import('./secciones/enfermedades.js'),
+    configuracion: () => import('./secciones/configuracion.js'),
+    grafica: () => import('./grafica.js')
+}, {
+    nuevoLoteModal: 'lotes',
+    qrLoteModal: 'lotes',
+    editarLoteModal: 'lotes',
+    verLoteModal: 'detalle',
+    nuevoRegistroModal: 'registros',
+    editarRegistroModal: 'registros',
+    nuevoCostoModal: 'economia',
+    editarCostoModal: 'economia',
+    nuevoIngresoModal: 'economia',
+    editarIngresoModal: 'economia',
+    nuevoSanidadModal: 'sanidad',
+    editarSanidadModal: 'sanidad',
+    nuevoEnfermedadModal: 'enfermedades',
+    editarEnfermedadModal: 'enfermedades',
+    editarConfigModal: 'configuracion'
+});
+
+// Funciones usadas desde onclick="..." en el HTML: las de las secciones importan su módulo al primer uso
+const GLOBALES = {
+    lotes: ['showQrLote', 'imprimirEtiquetasQr', 'editarLote', 'eliminarLote'],
+    detalle: ['verLote', 'switchTab'],
+    exportar: ['exportarLote'],
+    registros: ['duplicarRegistro', 'editarRegistro', 'eliminarRegistro'],
+    economia: ['editarCosto', 'eliminarCosto', 'editarIngreso', 'eliminarIngreso'],
+    sanidad: ['editarSanidad', 'eliminarSanidad'],
+    enfermedades: ['editarEnfermedad', 'eliminarEnfermedad']
+};
+Object.entries(GLOBALES).forEach(([nombre, funciones]) => {
+    funciones.forEach(funcion => {
+        window[funcion] = (...args) => seccion(nombre).then(m => m[funcion](...args));
+    });
+});
+Object.assign(window, { toggleTheme, logout, openModal, closeModal });
+
+// AUTHENTICATION
+document.getElementById('loginForm')?.addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const username = document.getElementById('loginUsername').value;
+    const password = document.getElementById('loginPassword').value;
+
+    try {
+        const response = await fetch(`${API_URL}/auth/login`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ username, password }),
+            mode: 'cors',
+            credentials: 'omit'
+        });
+
+        if (!response.ok) {
+            if (response.status === 401) {
+                throw new Error('Usuario o contraseña incorrectos');
+            }
+            throw new Error('Error al iniciar sesión. Intente nuevamente.');
+        }
+
+        const data = await response.json();
+        estado.token = data.token;
+        localStorage.setItem('token', data.token);
+        localStorage.setItem('user', JSON.stringify(data.usuario));
+
+        document.getElementById('loginPage').classList.add('hidden');
+        document.getElementById('mainApp').classList.remove('hidden');
+        document.getElementById('userName').textContent = data.usuario.nombre_completo || data.usuario.username;
+
+        loadDashboard();
+    } catch (error) {
+        let errorMsg = error.message;
+        if (error.name === 'TypeError' || errorMsg.includes('fetch')) {
+            errorMsg = '❌ No se puede conectar al servidor. Verifique que el backend esté corriendo en http://127.0.0.1:5000';
+        }
+        document.getElementById('loginAlert').innerHTML = `
+            <div class="alert alert-danger">${errorMsg}</div>
+        `;
+    }
+});
+
+// INITIALIZATION (los módulos se ejecutan con el documento ya parseado)
+// Tema: aplicar preferencia guardada o del sistema
+const savedTheme = localStorage.getItem('theme');
+const prefersDark = window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches;
+applyTheme(savedTheme || (prefersDark ? 'dark' : 'light'));
+
+async function tryAutoLogin() {
+    const user = JSON.parse(localStorage.getItem('user') || '{}');
+
+    try {
+        await loadDashboard();
+        document.getElementById('loginPage').classList.add('hidden');
+        document.getElementById('mainApp').classList.remove('hidden');
+        document.getElementById('userName').textContent = user.nombre_completo || user.username || '';
+    } catch (error) {
+        console.warn('Error al cargar dashboard en auto-login:', error);
+        // Solo limpiar token y mostrar login si realmente es error de autenticación
+        if (error.message && (error.message.includes('Sesión') || error.message.includes('Token'))) {
+            localStorage.removeItem('token');
+            localStorage.removeItem('user');
+            estado.token = null;
+            document.getElementById('mainApp').classList.add('hidden');
+            document.getElementById('loginPage').classList.remove('hidden');
+        }
+    }
+}
+
+// Check if user is logged in - solo en carga inicial
+if (estado.token && document.getElementById('loginPage') && !document.getElementById('loginPage').classList.contains('hidden')) {
+    tryAutoLogin();
+}
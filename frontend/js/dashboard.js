@@ -0,0 +1,169 @@
+// DASHBOARD: estadísticas generales, alertas, umbrales y tabla de lotes (parte de la carga inicial)
+import { estado, seccion, showAlert, formatNumber, formatCurrency, formatearFecha, apiCall } from './nucleo.js';
+
+export async function loadDashboard() {
+    try {
+        // Agregar timestamp para evitar caché
+        const data = await apiCall(`/dashboard?_t=${Date.now()}`);
+
+        // Update stats
+        const statsHTML = `
+            <div class="stat-card">
+                <div class="stat-label">Lotes Activos</div>
+                <div class="stat-value">${data.total_lotes_activos}</div>
+                <div class="stat-description">En producción</div>
+            </div>
+            <div class="stat-card success">
+                <div class="stat-label">Total Aves</div>
+                <div class="stat-value">${data.total_aves.toLocaleString()}</div>
+                <div class="stat-description">Cantidad actual</div>
+            </div>
+            <div class="stat-card warning">
+                <div class="stat-label">Ganancia Total</div>
+                <div class="stat-value">${formatCurrency(data.lotes.reduce((sum, l) => sum + parseFloat(l.ganancia || 0), 0))}</div>
+                <div class="stat-description">De lotes activos</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-label">FCR Promedio</div>
+                <div class="stat-value">${formatNumber(data.lotes.reduce((sum, l) => sum + parseFloat(l.fcr || 0), 0) / (data.lotes.length || 1))}</div>
+                <div class="stat-description">Conversión alimenticia</div>
+            </div>
+        `;
+        document.getElementById('dashboardStats').innerHTML = statsHTML;
+
+        // Cargar alertas globales
+        await loadAlertasDashboard();
+        await loadConfiguracionCard();
+
+        // Update table
+        await loadLotesTable();
+    } catch (error) {
+        showAlert('Error cargando dashboard', 'danger');
+    }
+}
+
+export async function loadAlertasDashboard() {
+    try {
+        const alertas = await apiCall('/alertas');
+        const cont = document.getElementById('alertasDashboard');
+        if (!alertas.length) {
+            cont.innerHTML = '<div class="card"><div class="card-content" style="color: #10b981; font-weight:600;">✅ No hay alertas activas</div></div>';
+            return;
+        }
+        cont.innerHTML = `
+            <div class="card">
+                <div class="card-header"><h2 class="card-title">Alertas</h2></div>
+                <div class="card-content" style="display:flex; flex-direction:column; gap:0.5rem;">
+                    ${alertas.map(a => `
+                        <div class="alert ${a.prioridad==='alta' ? 'alert-danger' : 'alert-warning'}" style="display:flex; flex-direction:column; gap:0.25rem;">
+                            <div style="display:flex; justify-content:space-between; align-items:center;">
+                                <strong>${a.categoria} - ${a.tipo}</strong>
+                                <span style="font-size:0.75rem; opacity:0.7;">Lote: ${a.lote}</span>
+                            </div>
+                            <div>${a.mensaje}</div>
+                            ${a.valor!==undefined ? `<div style='font-size:0.75rem;'>Valor: <strong>${a.valor}</strong></div>` : ''}
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+        `;
+    } catch (e) {
+        document.getElementById('alertasDashboard').innerHTML = '<div class="alert alert-danger">Error cargando alertas</div>';
+    }
+}
+
+export async function loadConfiguracionCard() {
+    try {
+        const cfg = await apiCall('/configuracion');
+        const div = document.getElementById('configuracionCard');
+        div.innerHTML = `
+        <div class="card">
+            <div class="card-header">
+                <h2 class="card-title">Configuración de Umbrales</h2>
+                <button class="btn btn-outline" onclick="openModal('editarConfigModal')">Editar</button>
+            </div>
+            <div class="card-content" style="display:grid; grid-template-columns:repeat(auto-fit,minmax(160px,1fr)); gap:0.75rem;">
+                <div class="stat-card"><div class="stat-label">Temp Min</div><div class="stat-value">${cfg.temp_min}°C</div></div>
+                <div class="stat-card"><div class="stat-label">Temp Max</div><div class="stat-value">${cfg.temp_max}°C</div></div>
+                <div class="stat-card"><div class="stat-label">Hum Min</div><div class="stat-value">${cfg.humedad_min}%</div></div>
+                <div class="stat-card"><div class="stat-label">Hum Max</div><div class="stat-value">${cfg.humedad_max}%</div></div>
+                <div class="stat-card"><div class="stat-label">Consumo Mín</div><div class="stat-value">${cfg.consumo_min_g_dia}g</div></div>
+                <div class="stat-card"><div class="stat-label">Mort Diaria Máx</div><div class="stat-value">${cfg.mortalidad_diaria_max_pct}%</div></div>
+                <div class="stat-card"><div class="stat-label">Tol Peso ±%</div><div class="stat-value">${cfg.peso_tolerancia_pct}%</div></div>
+            </div>
+        </div>`;
+        estado.configuracion = cfg;
+        // Prellenar modal si ya fue cargado
+        const form = document.getElementById('editarConfigForm');
+        if (form) {
+            seccion('configuracion').then(m => m.prellenarConfiguracion(cfg));
+        }
+    } catch (e) {
+        document.getElementById('configuracionCard').innerHTML = '<div class="alert alert-danger">Error cargando configuración</div>';
+    }
+}
+
+export async function loadLotesTable() {
+    try {
+        // Solo los campos de la tabla y las estadísticas de cada lote en una sola llamada
+        const campos = 'id,nombre,galpon,dias_transcurridos,dias_restantes,fecha_sacrificio,cantidad_actual,estado';
+        const lotes = await apiCall(`/lotes?fields=${campos}&include=stats&_t=${Date.now()}`);
+
+        const tbody = document.getElementById('lotesTableBody');
+        tbody.innerHTML = lotes.map(lote => {
+            // Usar datos calculados del backend
+            const diasRestantes = lote.dias_restantes !== undefined ? lote.dias_restantes : '-';
+            const fechaSacrificio = lote.fecha_sacrificio ? formatearFecha(lote.fecha_sacrificio) : '-';
+
+            // Determinar color para días restantes
+            let colorDiasRestantes = '';
+            if (typeof diasRestantes === 'number') {
+                if (diasRestantes <= 0) colorDiasRestantes = 'style="color: #dc2626; font-weight: bold;"'; // Rojo
+                else if (diasRestantes <= 7) colorDiasRestantes = 'style="color: #f59e0b; font-weight: bold;"'; // Amarillo
+                else if (diasRestantes <= 14) colorDiasRestantes = 'style="color: #3b82f6; font-weight: bold;"'; // Azul
+                else colorDiasRestantes = 'style="color: #10b981;"'; // Verde
+            }
+
+            return `
+            <tr>
+                <td><strong>${lote.nombre}</strong></td>
+                <td>${lote.galpon || '-'}</td>
+                <td>${lote.dias_transcurridos}</td>
+                <td ${colorDiasRestantes}>
+                    ${diasRestantes === 0 ? '¡HOY!' : (diasRestantes < 0 ? `${Math.abs(diasRestantes)} días tarde` : diasRestantes)}
+                </td>
+                <td style="font-size: 0.875rem;">
+                    ${fechaSacrificio}
+                    ${diasRestantes === 0 ? '<br><span style="color: #dc2626; font-weight: bold;">🔔 ¡Sacrificio HOY!</span>' : ''}
+                    ${diasRestantes > 0 && diasRestantes <= 7 ? '<br><span style="color: #f59e0b; font-weight: bold;">⚠️ Próximo</span>' : ''}
+                </td>
+                <td>${lote.cantidad_actual}</td>
+                <td>${lote.estadisticas ? formatNumber(lote.estadisticas.peso_actual, 0) : '-'}</td>
+                <td>
+                    <span class="badge ${lote.estado === 'activo' ? 'badge-success' : 'badge-warning'}">
+                        ${lote.estado}
+                    </span>
+                </td>
+                <td>
+                    <div class="button-group">
+                        <button class="btn btn-primary btn-sm" onclick="verLote(${lote.id})" title="Ver detalles">
+                            👁️ Ver
+                        </button>
+                        <button class="btn btn-outline btn-sm" onclick="showQrLote(${lote.id})" title="QR del lote">
+                            📱 QR
+                        </button>
+                        <button class="btn btn-warning btn-sm" onclick="editarLote(${lote.id})" title="Editar lote">
+                            ✏️ Editar
+                        </button>
+                        <button class="btn btn-danger btn-sm" onclick="eliminarLote(${lote.id}, '${lote.nombre.replace(/'/g, "\\'")}')">
+                            🗑️ Eliminar
+                        </button>
+                    </div>
+                </td>
+            </tr>
+            `;
+        }).join('');
+    } catch (error) {
+        showAlert('Error cargando lotes', 'danger');
+    }
+}
@@ -0,0 +1,157 @@
+// GRÁFICAS: curva de peso del lote con Chart.js cargado bajo demanda
+import { estado, apiCall } from './nucleo.js';
+
+let weightChart = null;
+
+// Chart.js (~200 KB) se descarga solo la primera vez que se abre una gráfica
+const CHART_JS = new URL('../chart.min.js', import.meta.url);
+let cargaChart = null;
+
+function cargarChart() {
+    if (window.Chart) return Promise.resolve(window.Chart);
+    if (!cargaChart) {
+        cargaChart = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = CHART_JS;
+            script.onload = () => resolve(window.Chart);
+            script.onerror = () => {
+                cargaChart = null;
+                script.remove();
+                reject(new Error('No se pudo cargar Chart.js'));
+            };
+            document.head.appendChild(script);
+        });
+    }
+    return cargaChart;
+}
+
+export async function loadWeightChart(loteId) {
+    try {
+        const [data, cfg, Chart] = await Promise.all([
+            apiCall(`/lotes/${loteId}/curva-peso`),
+            apiCall('/configuracion'),
+            cargarChart()
+        ]);
+        
+        const ctx = document.getElementById('chartPeso');
+        if (!ctx) return;
+
+        // Clear previous chart
+        if (weightChart) {
+            weightChart.destroy();
+        }
+
+        // Create canvas + caption genética objetivo
+        const geneticaLower = (estado.loteGenetica || '').toLowerCase();
+        const objetivoLabel = geneticaLower.includes('ross') ? 'Ross 308' : 'Cobb 500';
+        const tolPct = (cfg.peso_tolerancia_pct ?? 5);
+        ctx.innerHTML = `
+            <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:6px;">
+                <small style="color:#64748b;">Genética objetivo: <strong>${objetivoLabel}</strong> (banda ±${tolPct}%)</small>
+            </div>
+            <canvas id="weightChartCanvas"></canvas>
+        `;
+        const canvas = document.getElementById('weightChartCanvas');
+
+        const objetivo = data.map(d => d.peso_objetivo ?? null);
+        const tol = (Number(tolPct) || 0) / 100;
+        const objetivoUpper = objetivo.map(v => (v ? Math.round(v * (1 + tol)) : null));
+        const objetivoLower = objetivo.map(v => (v ? Math.round(v * (1 - tol)) : null));
+
+        weightChart = new Chart(canvas, {
+            type: 'line',
+            data: {
+                labels: data.map(d => `Día ${d.dias}`),
+                datasets: [
+                    {
+                        label: 'Peso Promedio (g)',
+                        data: data.map(d => d.peso),
+                        borderColor: '#2563eb',
+                        backgroundColor: 'rgba(37, 99, 235, 0.1)',
+                        tension: 0.4,
+                        fill: true,
+                        yAxisID: 'y'
+                    },
+                    {
+                        label: 'Objetivo +5%',
+                        data: objetivoUpper,
+                        borderColor: 'rgba(22, 163, 74, 0)',
+                        backgroundColor: 'rgba(22, 163, 74, 0.10)',
+                        pointRadius: 0,
+                        tension: 0.25,
+                        fill: '-1',
+                        yAxisID: 'y'
+                    },
+                    {
+                        label: 'Objetivo -5%',
+                        data: objetivoLower,
+                        borderColor: 'rgba(22, 163, 74, 0)',
+                        backgroundColor: 'rgba(22, 163, 74, 0.10)',
+                        pointRadius: 0,
+                        tension: 0.25,
+                        fill: false,
+                        yAxisID: 'y'
+                    },
+                    {
+                        label: 'Peso Objetivo (g)',
+                        data: objetivo,
+                        borderColor: '#16a34a',
+                        backgroundColor: 'rgba(22, 163, 74, 0.05)',
+                        borderDash: [6, 6],
+                        pointRadius: 0,
+                        tension: 0.3,
+                        fill: false,
+                        yAxisID: 'y'
+                    }
+                ]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        display: true,
+                        position: 'top'
+                    },
+                    title: {
+                        display: true,
+                        text: 'Curva de Crecimiento'
+                    },
+                    tooltip: {
+                        callbacks: {
+                            afterBody: function(items) {
+                                const idx = items[0].dataIndex;
+                                const d = data[idx];
+                                const lines = [];
+                                if (typeof d.adg === 'number') {
+                                    lines.push(`ADG: ${d.adg} g/día`);
+                                }
+                                if (d.fcr) {
+                                    lines.push(`FCR: ${d.fcr}`);
+                                }
+                                return lines;
+                            }
+                        }
+                    }
+                },
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        title: {
+                            display: true,
+                            text: 'Peso (g)'
+                        }
+                    },
+                    x: {
+                        title: {
+                            display: true,
+                            text: 'Días'
+                        }
+                    }
+                }
+            }
+        });
+    } catch (error) {
+        console.error('Error loading chart:', error);
+    }
+}
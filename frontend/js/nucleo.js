@@ -0,0 +1,219 @@
+// NÚCLEO: configuración, API, utilidades y modales compartidos por todas las secciones.
+// No importa ninguna sección: app.js registra los cargadores con registrarSecciones()
+// y el resto las pide con seccion('nombre'), que las importa solo la primera vez.
+
+// CONFIGURATION
+// Base de API según el origen actual (sirviendo frontend y backend juntos)
+function computeApiBase() {
+    const origin = window.location.origin || 'http://127.0.0.1:5000';
+    return `${origin}/api`;
+}
+export const API_URL = computeApiBase();
+try { console.debug('[API_URL]', API_URL); } catch {}
+
+// Estado compartido entre secciones
+export const estado = {
+    token: localStorage.getItem('token'),
+    loteId: null,
+    loteGenetica: '',
+    configuracion: null
+};
+
+// SECCIONES PEREZOSAS
+let cargadores = {};
+let modales = {};
+const cargadas = {};
+
+export function registrarSecciones(mapaCargadores, mapaModales) {
+    cargadores = mapaCargadores;
+    modales = mapaModales;
+}
+
+export function seccion(nombre) {
+    if (!cargadas[nombre]) {
+        cargadas[nombre] = cargadores[nombre]().catch(error => {
+            delete cargadas[nombre];
+            showAlert('No se pudo cargar la sección. Verifique la conexión.', 'danger');
+            throw error;
+        });
+    }
+    return cargadas[nombre];
+}
+
+// THEME
+export function applyTheme(theme) {
+    const t = theme === 'dark' ? 'dark' : 'light';
+    document.documentElement.setAttribute('data-theme', t);
+    try { localStorage.setItem('theme', t); } catch {}
+    const btn = document.getElementById('themeToggle');
+    if (btn) {
+        btn.textContent = t === 'dark' ? '☀️ Claro' : '🌙 Oscuro';
+    }
+}
+
+export function toggleTheme() {
+    const current = (localStorage.getItem('theme') || (window.matchMedia && window.matchMedia('(prefers-color-scheme: dark)').matches ? 'dark' : 'light'));
+    applyTheme(current === 'dark' ? 'light' : 'dark');
+}
+
+// UTILITIES
+export function showAlert(message, type = 'success') {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type}`;
+    alertDiv.textContent = message;
+
+    const container = document.querySelector('.container') || document.body;
+    container.insertBefore(alertDiv, container.firstChild);
+
+    setTimeout(() => alertDiv.remove(), 3000);
+}
+
+export function formatNumber(num, decimals = 2) {
+    return Number(num).toFixed(decimals);
+}
+
+export function formatCurrency(num) {
+    return new Intl.NumberFormat('es-CO', {
+        style: 'currency',
+        currency: 'COP',
+        minimumFractionDigits: 0
+    }).format(num);
+}
+
+export function formatDate(dateString) {
+    const date = new Date(dateString);
+    return date.toLocaleDateString('es-CO');
+}
+
+export function formatearFecha(fechaString) {
+    const fecha = new Date(fechaString);
+    const opciones = {
+        year: 'numeric',
+        month: '2-digit',
+        day: '2-digit'
+    };
+    return fecha.toLocaleDateString('es-CO', opciones);
+}
+
+// API CALLS
+export async function apiCall(endpoint, method = 'GET', data = null) {
+    const options = {
+        method,
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${estado.token}`
+        },
+        // Evitar caches intermedias y problemas con SW
+        cache: 'no-store',
+        mode: 'cors'
+    };
+
+    if (data !== null && data !== undefined) {
+        options.body = JSON.stringify(data);
+    }
+
+    const response = await fetch(`${API_URL}${endpoint}`, options);
+
+    if (!response.ok) {
+        let errorMessage = 'Error en la petición';
+        let shouldLogout = false;
+
+        try {
+            const rawError = await response.text();
+            if (rawError) {
+                try {
+                    const parsedError = JSON.parse(rawError);
+                    errorMessage = parsedError.mensaje || parsedError.message || rawError;
+
+                    // Solo hacer logout si el mensaje indica problema de autenticación
+                    if (response.status === 401 &&
+                        (errorMessage.includes('Token') ||
+                         errorMessage.includes('expirado') ||
+                         errorMessage.includes('inválido') ||
+                         errorMessage.includes('proporcionado') ||
+                         errorMessage.includes('Sesión'))) {
+                        shouldLogout = true;
+                    }
+                } catch (_) {
+                    errorMessage = rawError;
+                }
+            }
+        } catch (_) {
+            // Ignorar fallos al leer el cuerpo de error
+        }
+
+        if (shouldLogout) {
+            logout();
+            throw new Error('Sesión expirada');
+        }
+
+        throw new Error(errorMessage);
+    }
+
+    try {
+        return await response.json();
+    } catch (_) {
+        return null;
+    }
+}
+
+// Varios GET en una sola petición (POST /api/batch); devuelve los cuerpos en el mismo orden
+export async function apiBatch(rutas) {
+    const { respuestas } = await apiCall('/batch', 'POST', { peticiones: rutas });
+    return respuestas.map(r => {
+        if (r.status >= 400) {
+            throw new Error((r.cuerpo && r.cuerpo.mensaje) || `Error ${r.status} en ${r.ruta}`);
+        }
+        return r.cuerpo;
+    });
+}
+
+export function logout() {
+    localStorage.removeItem('token');
+    localStorage.removeItem('user');
+    estado.token = null;
+    document.getElementById('mainApp').classList.add('hidden');
+    document.getElementById('loginPage').classList.remove('hidden');
+}
+
+// MODAL FUNCTIONS
+export function hoyISO() {
+    return new Date().toISOString().split('T')[0];
+}
+
+// Inserta el HTML de los modales de una sección (una sola vez, al importarla)
+export function montarModales(html) {
+    const plantilla = document.createElement('template');
+    plantilla.innerHTML = html;
+    const hoy = hoyISO();
+    plantilla.content.querySelectorAll('input[type="date"]').forEach(input => {
+        if (!input.value) input.value = hoy;
+    });
+    // Close modal on outside click
+    plantilla.content.querySelectorAll('.modal').forEach(modal => {
+        modal.addEventListener('click', (e) => {
+            if (e.target === modal) {
+                modal.classList.remove('active');
+            }
+        });
+    });
+    document.body.appendChild(plantilla.content);
+}
+
+export async function openModal(modalId) {
+    if (!document.getElementById(modalId) && modales[modalId]) {
+        await seccion(modales[modalId]);
+    }
+    document.getElementById(modalId).classList.add('active');
+    if (modalId === 'nuevoEnfermedadModal' || modalId === 'editarEnfermedadModal') {
+        // Cargar lista actualizada al trabajar con enfermedades (refresca la tabla al volver)
+        setTimeout(() => seccion('enfermedades').then(m => m.loadEnfermedades()), 50);
+    }
+    if (modalId === 'nuevoSanidadModal' || modalId === 'editarSanidadModal') {
+        seccion('sanidad').then(m => m.populateEnfermedadesSelects());
+    }
+}
+
+export function closeModal(modalId) {
+    document.getElementById(modalId)?.classList.remove('active');
+}
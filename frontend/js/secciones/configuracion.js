@@ -0,0 +1,87 @@
+// CONFIGURACIÓN de umbrales de alertas
+import { estado, seccion, apiCall, showAlert, closeModal, montarModales } from '../nucleo.js';
+import { loadAlertasDashboard, loadConfiguracionCard } from '../dashboard.js';
+
+const PLANTILLA = `
+<!-- Modal: Editar Configuración -->
+<div id="editarConfigModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Editar Configuración de Umbrales</h3>
+            <button class="close-btn" onclick="closeModal('editarConfigModal')">×</button>
+        </div>
+        <form id="editarConfigForm">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Temp Min (°C)</label>
+                    <input type="number" step="0.1" name="temp_min" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Temp Max (°C)</label>
+                    <input type="number" step="0.1" name="temp_max" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Humedad Min (%)</label>
+                    <input type="number" step="0.1" name="humedad_min" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Humedad Max (%)</label>
+                    <input type="number" step="0.1" name="humedad_max" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Consumo mín (g/ave/día)</label>
+                    <input type="number" step="0.1" name="consumo_min_g_dia" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Mortalidad diaria máx (%)</label>
+                    <input type="number" step="0.1" name="mortalidad_diaria_max_pct" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Tolerancia curva peso (± %)</label>
+                    <input type="number" step="0.1" name="peso_tolerancia_pct" class="form-input" placeholder="5">
+                </div>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('editarConfigModal')">Cancelar</button>
+                <button type="submit" class="btn btn-primary">Guardar</button>
+            </div>
+        </form>
+    </div>
+</div>
+`;
+montarModales(PLANTILLA);
+
+// Configuración
+export function prellenarConfiguracion(cfg) {
+    const form = document.getElementById('editarConfigForm');
+    form.temp_min.value = cfg.temp_min;
+    form.temp_max.value = cfg.temp_max;
+    form.humedad_min.value = cfg.humedad_min;
+    form.humedad_max.value = cfg.humedad_max;
+    form.consumo_min_g_dia.value = cfg.consumo_min_g_dia;
+    form.mortalidad_diaria_max_pct.value = cfg.mortalidad_diaria_max_pct;
+    if (form.peso_tolerancia_pct) form.peso_tolerancia_pct.value = cfg.peso_tolerancia_pct;
+}
+
+document.getElementById('editarConfigForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    // Convertir a número seguro
+    Object.keys(data).forEach(k => { if (data[k] !== '') data[k] = parseFloat(data[k]); });
+    try {
+        await apiCall('/configuracion', 'PUT', data);
+        showAlert('Configuración actualizada', 'success');
+        closeModal('editarConfigModal');
+        loadConfiguracionCard();
+        loadAlertasDashboard(); // Recalcular alertas con nuevos umbrales
+        if (estado.loteId) {
+            // Si hay un lote abierto, refrescar gráfico para actualizar bandas de tolerancia
+            seccion('grafica').then(m => m.loadWeightChart(estado.loteId));
+        }
+    } catch (error) {
+        showAlert('Error actualizando configuración', 'danger');
+    }
+});
+
+if (estado.configuracion) prellenarConfiguracion(estado.configuracion);
@@ -0,0 +1,284 @@
+// DETALLE DEL LOTE: modal con pestañas; cada pestaña importa su sección al abrirse
+import { estado, seccion, apiBatch, showAlert, formatCurrency, openModal, montarModales } from '../nucleo.js';
+import { setDefaultExportWeek } from './exportar.js';
+
+const PLANTILLA = `
+<!-- Modal: Ver Lote -->
+<div id="verLoteModal" class="modal">
+    <div class="modal-content" style="max-width: 1200px;">
+        <div class="modal-header">
+            <h3 class="modal-title" id="loteModalTitle"></h3>
+            <button class="close-btn" onclick="closeModal('verLoteModal')">×</button>
+        </div>
+        
+        <div class="tabs">
+            <button class="tab active" data-tab="resumen" onclick="switchTab('resumen')">📊 Resumen</button>
+            <button class="tab" data-tab="registros" onclick="switchTab('registros')">📝 Registros</button>
+            <button class="tab" data-tab="economia" onclick="switchTab('economia')">💰 Economía</button>
+            <button class="tab" data-tab="sanidad" onclick="switchTab('sanidad')">💊 Sanidad</button>
+        </div>
+
+        <!-- Tab: Resumen -->
+        <div id="resumenTab" class="tab-content active">
+            <div style="display:flex;justify-content:flex-end;gap:0.5rem;margin-bottom:0.75rem;align-items:center;flex-wrap:wrap;">
+                <label style="font-size:0.75rem;color:var(--text-light);display:flex;align-items:center;gap:0.25rem;">
+                    Semana:
+                    <input type="week" id="exportWeekInput" style="padding:0.25rem 0.5rem;border:1px solid var(--border);border-radius:4px;font-size:0.75rem;">
+                </label>
+                <button class="btn btn-outline btn-sm" onclick="exportarLote('pdf')" title="Exportar semana seleccionada (PDF)">🧾 Exportar PDF</button>
+                <button class="btn btn-outline btn-sm" onclick="exportarLote('xlsx')" title="Exportar semana seleccionada (Excel)">📑 Exportar Excel</button>
+            </div>
+            <div id="estadisticasLote" class="stats-grid"></div>
+            
+            <!-- Alertas del lote -->
+            <div style="margin: 1.5rem 0;">
+                <h3 style="margin-bottom: 0.75rem; color: var(--text-primary);">⚠️ Alertas</h3>
+                <div id="alertasLote"></div>
+            </div>
+            
+            <div class="chart-container" id="chartPeso"></div>
+        </div>
+
+        <!-- Tab: Registros -->
+        <div id="registrosTab" class="tab-content">
+            <button class="btn btn-success" onclick="openModal('nuevoRegistroModal')" style="margin-bottom: 1rem;">
+                ➕ Nuevo Registro
+            </button>
+            <div class="table-container">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Fecha</th>
+                            <th>Alimento (kg)</th>
+                            <th>Agua (L)</th>
+                            <th>Mortalidad</th>
+                            <th>Peso (g)</th>
+                            <th>Temp (°C)</th>
+                            <th>Humedad (%)</th>
+                            <th>Observaciones</th>
+                            <th>Acciones</th>
+                        </tr>
+                    </thead>
+                    <tbody id="registrosTableBody"></tbody>
+                </table>
+            </div>
+        </div>
+
+        <!-- Tab: Economía -->
+        <div id="economiaTab" class="tab-content">
+            <h3 style="margin-bottom: 1rem;">Costos</h3>
+            <button class="btn btn-success" onclick="openModal('nuevoCostoModal')" style="margin-bottom: 1rem;">
+                ➕ Nuevo Costo
+            </button>
+            <div class="table-container">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Fecha</th>
+                            <th>Categoría</th>
+                            <th>Concepto</th>
+                            <th>Monto</th>
+                            <th>Acciones</th>
+                        </tr>
+                    </thead>
+                    <tbody id="costosTableBody"></tbody>
+                </table>
+            </div>
+
+            <h3 style="margin-top: 2rem; margin-bottom: 1rem;">Ingresos / Ventas</h3>
+            <button class="btn btn-primary" onclick="openModal('nuevoIngresoModal')" style="margin-bottom: 1rem;">
+                ➕ Nuevo Ingreso
+            </button>
+            <div class="table-container">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Fecha</th>
+                            <th>Cantidad</th>
+                            <th>Peso Prom (kg)</th>
+                            <th>Precio/kg</th>
+                            <th>Total</th>
+                            <th>Cliente</th>
+                            <th>Acciones</th>
+                        </tr>
+                    </thead>
+                    <tbody id="ingresosTableBody"></tbody>
+                </table>
+            </div>
+        </div>
+
+        <!-- Tab: Sanidad -->
+        <div id="sanidadTab" class="tab-content">
+            <button class="btn btn-success" onclick="openModal('nuevoSanidadModal')" style="margin-bottom: 1rem;">
+                ➕ Nuevo Registro Sanitario
+            </button>
+            <button class="btn btn-outline" onclick="openModal('nuevoEnfermedadModal')" style="margin-bottom: 1rem; margin-left:0.5rem;">
+                ➕ Nueva Enfermedad
+            </button>
+            <div class="table-container">
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Fecha</th>
+                            <th>Tipo</th>
+                            <th>Producto</th>
+                            <th>Dosis</th>
+                            <th>Edad (días)</th>
+                            <th>Enfermedad</th>
+                            <th>Vía</th>
+                            <th>Retiro (días)</th>
+                            <th>Acciones</th>
+                        </tr>
+                    </thead>
+                    <tbody id="sanidadTableBody"></tbody>
+                </table>
+            </div>
+            <div class="card" style="margin-top:1.5rem;">
+                <div class="card-header">
+                    <h3 class="card-title">Enfermedades Registradas</h3>
+                </div>
+                <div class="card-content">
+                    <div class="table-container">
+                        <table>
+                            <thead>
+                                <tr>
+                                    <th>Nombre</th>
+                                    <th>Síntomas</th>
+                                    <th>Prevención</th>
+                                    <th>Tratamiento</th>
+                                    <th>Medicamentos</th>
+                                    <th>Acciones</th>
+                                </tr>
+                            </thead>
+                            <tbody id="enfermedadesTableBody"></tbody>
+                        </table>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+`;
+montarModales(PLANTILLA);
+
+export async function verLote(loteId) {
+    estado.loteId = loteId;
+
+    try {
+        // Lote, estadísticas y alertas en un solo viaje al servidor
+        const [lote, stats, alertas] = await apiBatch([
+            `/lotes/${loteId}`, `/lotes/${loteId}/estadisticas`, `/lotes/${loteId}/alertas`
+        ]);
+        estado.loteGenetica = (lote.genetica || '').toString();
+        // Precargar semana actual del ciclo en selector de exportación
+        setDefaultExportWeek(lote.fecha_inicio);
+
+        document.getElementById('loteModalTitle').textContent = lote.nombre;
+
+        // Load stats
+        const statsHTML = `
+            <div class="stat-card">
+                <div class="stat-label">Días Transcurridos</div>
+                <div class="stat-value">${stats.dias_transcurridos}</div>
+            </div>
+            <div class="stat-card success">
+                <div class="stat-label">Aves Actuales</div>
+                <div class="stat-value">${stats.cantidad_actual}</div>
+                <div class="stat-description">Peso: ${stats.peso_actual}g</div>
+            </div>
+            <div class="stat-card ${stats.mortalidad_porcentaje > 5 ? 'danger' : 'warning'}">
+                <div class="stat-label">Mortalidad</div>
+                <div class="stat-value">${stats.mortalidad_porcentaje}%</div>
+                <div class="stat-description">${stats.total_mortalidad} aves</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-label">FCR</div>
+                <div class="stat-value">${stats.fcr}</div>
+                <div class="stat-description">ADG: ${stats.adg}g/día</div>
+            </div>
+            <div class="stat-card warning">
+                <div class="stat-label">Alimento Total</div>
+                <div class="stat-value">${stats.total_alimento}</div>
+                <div class="stat-description">kg consumidos</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-label">Kg Producidos</div>
+                <div class="stat-value">${stats.kg_producidos}</div>
+                <div class="stat-description">Costo: ${formatCurrency(stats.costo_por_kg)}/kg</div>
+            </div>
+            <div class="stat-card ${stats.ganancia >= 0 ? 'success' : 'danger'}">
+                <div class="stat-label">Ganancia</div>
+                <div class="stat-value">${formatCurrency(stats.ganancia)}</div>
+                <div class="stat-description">Rentabilidad: ${stats.rentabilidad}%</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-label">Costo Total</div>
+                <div class="stat-value">${formatCurrency(stats.total_costos)}</div>
+                <div class="stat-description">Por pollo: ${formatCurrency(stats.costo_por_pollo)}</div>
+            </div>
+        `;
+        document.getElementById('estadisticasLote').innerHTML = statsHTML;
+
+        // Alerts for this specific lote
+        renderAlertasLote(alertas);
+
+        // Load weight chart (importa Chart.js la primera vez)
+        seccion('grafica').then(m => m.loadWeightChart(loteId));
+
+        openModal('verLoteModal');
+        switchTab('resumen');
+    } catch (error) {
+        showAlert('Error cargando lote', 'danger');
+    }
+}
+
+function renderAlertasLote(alertas) {
+    try {
+        const cont = document.getElementById('alertasLote');
+        if (!cont) return;
+
+        if (!alertas || !alertas.length) {
+            cont.innerHTML = '<div class="alert alert-info" style="color: #10b981; background: #d1fae5; border-color: #6ee7b7;">✅ No hay alertas. Todo está dentro de los rangos normales.</div>';
+            return;
+        }
+
+        cont.innerHTML = alertas.map(a => `
+            <div class="alert ${a.prioridad==='alta' ? 'alert-danger' : 'alert-warning'}" style="margin-bottom: 0.5rem;">
+                <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom: 0.25rem;">
+                    <strong>${a.categoria} - ${a.tipo}</strong>
+                </div>
+                <div>${a.mensaje}</div>
+                ${a.valor!==undefined ? `<div style='font-size:0.75rem; margin-top: 0.25rem;'>Valor actual: <strong>${a.valor}</strong></div>` : ''}
+            </div>
+        `).join('');
+    } catch (e) {
+        console.error('Error mostrando alertas del lote:', e);
+    }
+}
+
+// TAB FUNCTIONS
+export function switchTab(tabName) {
+    // Update tab buttons
+    document.querySelectorAll('#verLoteModal .tab').forEach(tab => {
+        tab.classList.toggle('active', tab.dataset.tab === tabName);
+    });
+
+    // Update tab content
+    document.querySelectorAll('#verLoteModal .tab-content').forEach(content => {
+        content.classList.remove('active');
+    });
+
+    // Show selected tab
+    const tabContent = document.getElementById(`${tabName}Tab`);
+    if (tabContent) {
+        tabContent.classList.add('active');
+
+        // Load data for the tab (cada pestaña importa su sección al abrirse)
+        if (tabName === 'registros') seccion('registros').then(m => m.loadRegistros());
+        if (tabName === 'economia') seccion('economia').then(m => { m.loadCostos(); m.loadIngresos(); });
+        if (tabName === 'sanidad') {
+            seccion('sanidad').then(m => m.loadSanidad());
+            seccion('enfermedades').then(m => m.loadEnfermedades());
+        }
+    }
+}
@@ -0,0 +1,403 @@
+// ECONOMÍA: costos e ingresos del lote abierto
+import { estado, seccion, apiCall, showAlert, formatDate, formatCurrency, openModal, closeModal, montarModales } from '../nucleo.js';
+
+const PLANTILLA = `
+<!-- Modal: Nuevo Costo -->
+<div id="nuevoCostoModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Registrar Costo</h3>
+            <button class="close-btn" onclick="closeModal('nuevoCostoModal')">×</button>
+        </div>
+        <form id="nuevoCostoForm">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Categoría *</label>
+                    <select name="categoria" class="form-select" required>
+                        <option value="">Seleccionar...</option>
+                        <option value="Pollitos">Pollitos</option>
+                        <option value="Alimento">Alimento</option>
+                        <option value="Medicamentos">Medicamentos</option>
+                        <option value="Energía">Energía</option>
+                        <option value="Transporte">Transporte</option>
+                        <option value="Mano de Obra">Mano de Obra</option>
+                        <option value="Otro">Otro</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Concepto *</label>
+                    <input type="text" name="concepto" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Monto *</label>
+                    <input type="number" name="monto" class="form-input" required step="0.01">
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('nuevoCostoModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Guardar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+
+<!-- Modal: Nuevo Ingreso -->
+<div id="nuevoIngresoModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Registrar Ingreso / Venta</h3>
+            <button class="close-btn" onclick="closeModal('nuevoIngresoModal')">×</button>
+        </div>
+        <form id="nuevoIngresoForm">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Cantidad Vendida *</label>
+                    <input type="number" name="cantidad_vendida" class="form-input" required min="1">
+                    <small class="form-help">Número de pollos vendidos</small>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Peso Promedio (kg) *</label>
+                    <input type="number" name="peso_promedio" class="form-input" required step="0.01" min="0">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Precio por Kg *</label>
+                    <input type="number" name="precio_por_kg" class="form-input" required step="0.01" min="0">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Cliente</label>
+                    <input type="text" name="cliente" class="form-input">
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('nuevoIngresoModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Guardar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+
+<!-- Modal: Editar Ingreso -->
+<div id="editarIngresoModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Editar Ingreso / Venta</h3>
+            <button class="close-btn" onclick="closeModal('editarIngresoModal')">×</button>
+        </div>
+        <form id="editarIngresoForm">
+            <input type="hidden" id="editIngresoId">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" id="editIngresoFecha" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Cantidad Vendida *</label>
+                    <input type="number" id="editIngresoCantidad" name="cantidad_vendida" class="form-input" required min="1">
+                    <small class="form-help">Número de pollos vendidos</small>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Peso Promedio (kg) *</label>
+                    <input type="number" id="editIngresoPeso" name="peso_promedio" class="form-input" required step="0.01" min="0">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Precio por Kg *</label>
+                    <input type="number" id="editIngresoPrecio" name="precio_por_kg" class="form-input" required step="0.01" min="0">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Cliente</label>
+                    <input type="text" id="editIngresoCliente" name="cliente" class="form-input">
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea id="editIngresoObservaciones" name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('editarIngresoModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Actualizar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+
+<!-- Modal: Editar Costo -->
+<div id="editarCostoModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Editar Costo</h3>
+            <button class="close-btn" onclick="closeModal('editarCostoModal')">×</button>
+        </div>
+        <form id="editarCostoForm">
+            <input type="hidden" id="editCostoId">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" id="editCostoFecha" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Categoría *</label>
+                    <select id="editCostoCategoria" name="categoria" class="form-select" required>
+                        <option value="">Seleccionar...</option>
+                        <option value="Pollitos">Pollitos</option>
+                        <option value="Alimento">Alimento</option>
+                        <option value="Medicamentos">Medicamentos</option>
+                        <option value="Energía">Energía</option>
+                        <option value="Transporte">Transporte</option>
+                        <option value="Mano de Obra">Mano de Obra</option>
+                        <option value="Otro">Otro</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Concepto *</label>
+                    <input type="text" id="editCostoConcepto" name="concepto" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Monto *</label>
+                    <input type="number" id="editCostoMonto" name="monto" class="form-input" required step="0.01">
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea id="editCostoObservaciones" name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('editarCostoModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Actualizar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+`;
+montarModales(PLANTILLA);
+
+const recargarLote = () => seccion('detalle').then(m => m.verLote(estado.loteId));
+
+// COSTOS
+export async function loadCostos() {
+    if (!estado.loteId) return;
+
+    try {
+        const costos = await apiCall(`/lotes/${estado.loteId}/costos`);
+
+        const tbody = document.getElementById('costosTableBody');
+        tbody.innerHTML = costos.map(c => `
+            <tr>
+                <td>${formatDate(c.fecha)}</td>
+                <td><span class="badge badge-warning">${c.categoria}</span></td>
+                <td>${c.concepto}</td>
+                <td><strong>${formatCurrency(c.monto)}</strong></td>
+                <td>
+                    <div class="button-group">
+                        <button class="btn btn-warning btn-sm" onclick="editarCosto(${c.id})" title="Editar costo">
+                            ✏️ Editar
+                        </button>
+                        <button class="btn btn-danger btn-sm" onclick="eliminarCosto(${c.id}, '${c.concepto}')" title="Eliminar costo">
+                            🗑️ Eliminar
+                        </button>
+                    </div>
+                </td>
+            </tr>
+        `).join('');
+    } catch (error) {
+        showAlert('Error cargando costos', 'danger');
+    }
+}
+
+document.getElementById('nuevoCostoForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/costos`, 'POST', data);
+        showAlert('Costo registrado exitosamente');
+        closeModal('nuevoCostoModal');
+        e.target.reset();
+        loadCostos();
+        recargarLote();
+    } catch (error) {
+        showAlert('Error registrando costo', 'danger');
+    }
+});
+
+export async function editarCosto(costoId) {
+    try {
+        const costo = await apiCall(`/lotes/${estado.loteId}/costos/${costoId}`);
+
+        // Rellenar el formulario con los datos del costo
+        document.getElementById('editCostoId').value = costo.id;
+        document.getElementById('editCostoFecha').value = costo.fecha;
+        document.getElementById('editCostoCategoria').value = costo.categoria || '';
+        document.getElementById('editCostoConcepto').value = costo.concepto || '';
+        document.getElementById('editCostoMonto').value = costo.monto || '';
+        document.getElementById('editCostoObservaciones').value = costo.observaciones || '';
+
+        openModal('editarCostoModal');
+    } catch (error) {
+        showAlert('Error cargando datos del costo', 'danger');
+    }
+}
+
+export async function eliminarCosto(costoId, concepto) {
+    if (confirm(`¿Estás seguro de que deseas eliminar el costo "${concepto}"?`)) {
+        try {
+            await apiCall(`/lotes/${estado.loteId}/costos/${costoId}`, 'DELETE');
+            showAlert('Costo eliminado exitosamente', 'success');
+            loadCostos();
+            recargarLote(); // Recargar estadísticas
+        } catch (error) {
+            showAlert('Error eliminando costo', 'danger');
+        }
+    }
+}
+
+document.getElementById('editarCostoForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    const costoId = document.getElementById('editCostoId').value;
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/costos/${costoId}`, 'PUT', data);
+        showAlert('Costo actualizado exitosamente', 'success');
+        closeModal('editarCostoModal');
+        loadCostos();
+        recargarLote();
+    } catch (error) {
+        showAlert('Error actualizando costo', 'danger');
+    }
+});
+
+// INGRESOS
+export async function loadIngresos() {
+    if (!estado.loteId) return;
+
+    try {
+        const ingresos = await apiCall(`/lotes/${estado.loteId}/ingresos`);
+
+        const tbody = document.getElementById('ingresosTableBody');
+        tbody.innerHTML = ingresos.map(i => `
+            <tr>
+                <td>${formatDate(i.fecha)}</td>
+                <td>${i.cantidad_vendida}</td>
+                <td>${i.peso_promedio}</td>
+                <td>${formatCurrency(i.precio_por_kg)}</td>
+                <td><strong>${formatCurrency(i.total)}</strong></td>
+                <td>${i.cliente || '-'}</td>
+                <td>
+                    <div class="button-group">
+                        <button class="btn btn-warning btn-sm" onclick="editarIngreso(${i.id})" title="Editar ingreso">
+                            ✏️ Editar
+                        </button>
+                        <button class="btn btn-danger btn-sm" onclick="eliminarIngreso(${i.id})" title="Eliminar ingreso">
+                            🗑️ Eliminar
+                        </button>
+                    </div>
+                </td>
+            </tr>
+        `).join('');
+    } catch (error) {
+        showAlert('Error cargando ingresos', 'danger');
+    }
+}
+
+document.getElementById('nuevoIngresoForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/ingresos`, 'POST', data);
+        showAlert('Ingreso registrado exitosamente');
+        closeModal('nuevoIngresoModal');
+        e.target.reset();
+        loadIngresos();
+        recargarLote();
+    } catch (error) {
+        showAlert('Error registrando ingreso', 'danger');
+    }
+});
+
+export async function editarIngreso(ingresoId) {
+    try {
+        const ingreso = await apiCall(`/lotes/${estado.loteId}/ingresos/${ingresoId}`);
+
+        document.getElementById('editIngresoId').value = ingreso.id;
+        document.getElementById('editIngresoFecha').value = ingreso.fecha;
+        document.getElementById('editIngresoCantidad').value = ingreso.cantidad_vendida;
+        document.getElementById('editIngresoPeso').value = ingreso.peso_promedio;
+        document.getElementById('editIngresoPrecio').value = ingreso.precio_por_kg;
+        document.getElementById('editIngresoCliente').value = ingreso.cliente || '';
+        document.getElementById('editIngresoObservaciones').value = ingreso.observaciones || '';
+
+        openModal('editarIngresoModal');
+    } catch (error) {
+        showAlert('Error cargando datos del ingreso', 'danger');
+    }
+}
+
+document.getElementById('editarIngresoForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    const ingresoId = document.getElementById('editIngresoId').value;
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/ingresos/${ingresoId}`, 'PUT', data);
+        showAlert('Ingreso actualizado exitosamente', 'success');
+        closeModal('editarIngresoModal');
+        loadIngresos();
+        recargarLote();
+    } catch (error) {
+        showAlert('Error actualizando ingreso', 'danger');
+    }
+});
+
+export async function eliminarIngreso(ingresoId) {
+    if (confirm('¿Estás seguro de que deseas eliminar este ingreso?')) {
+        try {
+            await apiCall(`/lotes/${estado.loteId}/ingresos/${ingresoId}`, 'DELETE');
+            showAlert('Ingreso eliminado exitosamente', 'success');
+            loadIngresos();
+            recargarLote();
+        } catch (error) {
+            showAlert('Error eliminando ingreso', 'danger');
+        }
+    }
+}
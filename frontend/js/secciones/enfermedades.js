@@ -0,0 +1,160 @@
+// ENFERMEDADES: catálogo usado por sanidad
+import { apiCall, showAlert, openModal, closeModal, montarModales } from '../nucleo.js';
+
+const PLANTILLA = `
+<!-- Modal: Nueva Enfermedad -->
+<div id="nuevoEnfermedadModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Registrar Enfermedad</h3>
+            <button class="close-btn" onclick="closeModal('nuevoEnfermedadModal')">×</button>
+        </div>
+        <form id="nuevaEnfermedadForm">
+            <div class="form-group">
+                <label class="form-label">Nombre *</label>
+                <input type="text" name="nombre" class="form-input" required>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Síntomas</label>
+                <textarea name="sintomas" class="form-textarea" rows="2"></textarea>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Prevención</label>
+                <textarea name="prevencion" class="form-textarea" rows="2"></textarea>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Tratamiento</label>
+                <textarea name="tratamiento" class="form-textarea" rows="2"></textarea>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Medicamentos</label>
+                <textarea name="medicamentos" class="form-textarea" rows="2" placeholder="Separar por comas"></textarea>
+            </div>
+            <div style="display:flex; gap:1rem; justify-content:flex-end; margin-top:1rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('nuevoEnfermedadModal')">Cancelar</button>
+                <button type="submit" class="btn btn-primary">Guardar</button>
+            </div>
+        </form>
+    </div>
+</div>
+
+<!-- Modal: Editar Enfermedad -->
+<div id="editarEnfermedadModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Editar Enfermedad</h3>
+            <button class="close-btn" onclick="closeModal('editarEnfermedadModal')">×</button>
+        </div>
+        <form id="editarEnfermedadForm">
+            <input type="hidden" name="id" id="editarEnfermedadId">
+            <div class="form-group">
+                <label class="form-label">Nombre *</label>
+                <input type="text" name="nombre" id="editarEnfermedadNombre" class="form-input" required>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Síntomas</label>
+                <textarea name="sintomas" id="editarEnfermedadSintomas" class="form-textarea" rows="2"></textarea>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Prevención</label>
+                <textarea name="prevencion" id="editarEnfermedadPrevencion" class="form-textarea" rows="2"></textarea>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Tratamiento</label>
+                <textarea name="tratamiento" id="editarEnfermedadTratamiento" class="form-textarea" rows="2"></textarea>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Medicamentos</label>
+                <textarea name="medicamentos" id="editarEnfermedadMedicamentos" class="form-textarea" rows="2"></textarea>
+            </div>
+            <div style="display:flex; gap:1rem; justify-content:flex-end; margin-top:1rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('editarEnfermedadModal')">Cancelar</button>
+                <button type="submit" class="btn btn-primary">Actualizar</button>
+            </div>
+        </form>
+    </div>
+</div>
+`;
+montarModales(PLANTILLA);
+
+// ENFERMEDADES
+export async function loadEnfermedades() {
+    try {
+        const enfermedades = await apiCall('/enfermedades');
+        const tbody = document.getElementById('enfermedadesTableBody');
+        if (!tbody) return;
+        tbody.innerHTML = enfermedades.map(e => `
+            <tr>
+                <td><strong>${e.nombre}</strong></td>
+                <td style="max-width:280px; white-space:pre-wrap;">${e.sintomas || '-'}</td>
+                <td style="max-width:220px; white-space:pre-wrap;">${e.prevencion || '-'}</td>
+                <td style="max-width:220px; white-space:pre-wrap;">${e.tratamiento || '-'}</td>
+                <td style="max-width:220px; white-space:pre-wrap;">${e.medicamentos || '-'}</td>
+                <td>
+                    <div class="button-group">
+                        <button class="btn btn-warning btn-sm" onclick="editarEnfermedad(${e.id})">✏️ Editar</button>
+                        <button class="btn btn-danger btn-sm" onclick="eliminarEnfermedad(${e.id}, '${e.nombre.replace(/'/g, "\'")}')">🗑️ Eliminar</button>
+                    </div>
+                </td>
+            </tr>
+        `).join('');
+    } catch (error) {
+        showAlert('Error cargando enfermedades', 'danger');
+    }
+}
+
+document.getElementById('nuevaEnfermedadForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    try {
+        await apiCall('/enfermedades', 'POST', data);
+        showAlert('Enfermedad registrada', 'success');
+        closeModal('nuevoEnfermedadModal');
+        e.target.reset();
+        loadEnfermedades();
+    } catch (error) {
+        showAlert('Error registrando enfermedad', 'danger');
+    }
+});
+
+export async function editarEnfermedad(id) {
+    try {
+        const e = await apiCall(`/enfermedades/${id}`);
+        document.getElementById('editarEnfermedadId').value = e.id;
+        document.getElementById('editarEnfermedadNombre').value = e.nombre || '';
+        document.getElementById('editarEnfermedadSintomas').value = e.sintomas || '';
+        document.getElementById('editarEnfermedadPrevencion').value = e.prevencion || '';
+        document.getElementById('editarEnfermedadTratamiento').value = e.tratamiento || '';
+        document.getElementById('editarEnfermedadMedicamentos').value = e.medicamentos || '';
+        openModal('editarEnfermedadModal');
+    } catch (error) {
+        showAlert('Error cargando enfermedad', 'danger');
+    }
+}
+
+document.getElementById('editarEnfermedadForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const id = document.getElementById('editarEnfermedadId').value;
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    try {
+        await apiCall(`/enfermedades/${id}`, 'PUT', data);
+        showAlert('Enfermedad actualizada', 'success');
+        closeModal('editarEnfermedadModal');
+        loadEnfermedades();
+    } catch (error) {
+        showAlert('Error actualizando enfermedad', 'danger');
+    }
+});
+
+export async function eliminarEnfermedad(id, nombre) {
+    if (!confirm(`¿Eliminar enfermedad "${nombre}"?`)) return;
+    try {
+        await apiCall(`/enfermedades/${id}`, 'DELETE');
+        showAlert('Enfermedad eliminada', 'success');
+        loadEnfermedades();
+    } catch (error) {
+        showAlert('Error eliminando enfermedad', 'danger');
+    }
+}
@@ -0,0 +1,61 @@
+// EXPORTES: semana del ciclo y descarga PDF/Excel del lote abierto
+import { API_URL, estado, showAlert } from '../nucleo.js';
+
+export async function exportarLote(formato = 'pdf') {
+    if (!estado.loteId) return;
+    try {
+        const weekVal = document.getElementById('exportWeekInput')?.value || '';
+        const semanaParam = weekVal ? `&semana=${encodeURIComponent(weekVal)}` : '';
+        const resp = await fetch(`${API_URL}/lotes/${estado.loteId}/export?formato=${encodeURIComponent(formato)}${semanaParam}`, {
+            headers: {
+                'Authorization': `Bearer ${estado.token}`
+            }
+        });
+        if (!resp.ok) {
+            let msg = 'Error generando exporte';
+            try { const j = await resp.json(); msg = j.mensaje || msg; } catch {}
+            throw new Error(msg);
+        }
+        const blob = await resp.blob();
+        const url = URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        const hoy = new Date();
+        const yyyymmdd = hoy.toISOString().slice(0,10).replace(/-/g,'');
+        const ext = formato === 'xlsx' ? 'xlsx' : 'pdf';
+        a.href = url;
+        a.download = `lote_${estado.loteId}_semana_${yyyymmdd}.${ext}`;
+        document.body.appendChild(a);
+        a.click();
+        a.remove();
+        setTimeout(() => URL.revokeObjectURL(url), 1500);
+    } catch (e) {
+        showAlert(e.message || 'No se pudo exportar el lote', 'danger');
+    }
+}
+
+function isoWeekString(date) {
+    // Devuelve 'YYYY-Www' para un Date (UTC seguro)
+    const d = new Date(Date.UTC(date.getFullYear(), date.getMonth(), date.getDate()));
+    // Jueves de la semana actual
+    const day = d.getUTCDay() || 7; // 1..7
+    d.setUTCDate(d.getUTCDate() + 4 - day);
+    const yearStart = new Date(Date.UTC(d.getUTCFullYear(), 0, 1));
+    const weekNo = Math.ceil((((d - yearStart) / 86400000) + 1) / 7);
+    const year = d.getUTCFullYear();
+    const ww = weekNo.toString().padStart(2, '0');
+    return `${year}-W${ww}`;
+}
+
+export function setDefaultExportWeek(fechaInicioStr) {
+    try {
+        const input = document.getElementById('exportWeekInput');
+        if (!input) return;
+        const start = new Date(`${fechaInicioStr}T00:00:00`);
+        const today = new Date();
+        const msPerDay = 24 * 60 * 60 * 1000;
+        const diffDays = Math.max(0, Math.floor((today.setHours(0,0,0,0) - start.setHours(0,0,0,0)) / msPerDay));
+        const segmentStart = new Date(`${fechaInicioStr}T00:00:00`);
+        segmentStart.setDate(segmentStart.getDate() + Math.floor(diffDays / 7) * 7);
+        input.value = isoWeekString(segmentStart);
+    } catch {}
+}
@@ -0,0 +1,357 @@
+// LOTES: crear, editar, eliminar y QR del lote (modales incluidos)
+import { API_URL, estado, apiCall, showAlert, openModal, closeModal, montarModales } from '../nucleo.js';
+import { loadDashboard, loadLotesTable } from '../dashboard.js';
+
+const PLANTILLA = `
+<!-- Modal: Nuevo Lote -->
+<div id="nuevoLoteModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Crear Nuevo Lote</h3>
+            <button class="close-btn" onclick="closeModal('nuevoLoteModal')">×</button>
+        </div>
+        <form id="nuevoLoteForm">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Nombre del Lote *</label>
+                    <input type="text" name="nombre" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Fecha de Inicio *</label>
+                    <input type="date" name="fecha_inicio" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Cantidad de Pollitos *</label>
+                    <input type="number" name="cantidad_inicial" class="form-input" required min="1">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Peso Inicial (g) *</label>
+                    <input type="number" name="peso_inicial" class="form-input" value="40" required step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Días de Ciclo (hasta sacrificio) *</label>
+                    <input type="number" name="dias_ciclo" class="form-input" value="42" required min="20" max="80" 
+                           placeholder="Ej: 42 días" title="Número de días desde inicio hasta sacrificio">
+                    <small class="form-help">Típicamente 35-50 días para pollos de engorde</small>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Fecha Estimada de Sacrificio</label>
+                    <input type="text" id="fechaSacrificioPreview" class="form-input" readonly 
+                           style="background: #f3f4f6; color: #6b7280;" 
+                           placeholder="Se calculará automáticamente">
+                    <small class="form-help">Calculada automáticamente: Fecha inicio + días de ciclo</small>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Genética</label>
+                    <select name="genetica" class="form-select">
+                        <option value="">Seleccionar...</option>
+                        <option value="Cobb 500">Cobb 500</option>
+                        <option value="Ross 308">Ross 308</option>
+                        <option value="Hubbard">Hubbard</option>
+                        <option value="Otro">Otro</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Proveedor</label>
+                    <input type="text" name="proveedor" class="form-input">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Galpón</label>
+                    <input type="text" name="galpon" class="form-input">
+                </div>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('nuevoLoteModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Crear Lote
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+
+<!-- Modal: QR del Lote -->
+<div id="qrLoteModal" class="modal">
+    <div class="modal-content" style="max-width:420px;">
+        <div class="modal-header">
+            <h3 class="modal-title" id="qrModalTitle">QR del Lote</h3>
+            <button class="close-btn" onclick="closeModal('qrLoteModal')">×</button>
+        </div>
+        <div class="card" style="text-align:center;">
+            <img id="qrLoteImg" alt="QR del lote" style="width:320px;height:320px;margin:0 auto;display:block;image-rendering: pixelated;"/>
+            <a id="qrDownloadLink" class="btn btn-primary" style="margin-top:1rem;" href="#" download>Descargar PNG</a>
+            <p class="form-help" style="margin-top:0.75rem;">Escanéalo para ver el reporte público del lote.</p>
+        </div>
+    </div>
+</div>
+
+<!-- Modal: Editar Lote -->
+<div id="editarLoteModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Editar Lote</h3>
+            <button class="close-btn" onclick="closeModal('editarLoteModal')">×</button>
+        </div>
+        <form id="editarLoteForm">
+            <input type="hidden" id="editLoteId" name="id">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Nombre del Lote *</label>
+                    <input type="text" id="editNombre" name="nombre" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Fecha de Inicio *</label>
+                    <input type="date" id="editFechaInicio" name="fecha_inicio" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Cantidad Inicial de Aves *</label>
+                    <input type="number" id="editCantidadInicial" name="cantidad_inicial" class="form-input" min="1" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Peso Inicial (kg)</label>
+                    <input type="number" id="editPesoInicial" name="peso_inicial" class="form-input" step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Días de Ciclo (hasta sacrificio) *</label>
+                    <input type="number" id="editDiasCiclo" name="dias_ciclo" class="form-input" required min="20" max="80">
+                    <small class="form-help">Días desde inicio hasta sacrificio</small>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Fecha Estimada de Sacrificio</label>
+                    <input type="text" id="editFechaSacrificioPreview" class="form-input" readonly 
+                           style="background: #f3f4f6; color: #6b7280;">
+                    <small class="form-help">Calculada automáticamente</small>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Genética</label>
+                    <select id="editGenetica" name="genetica" class="form-select">
+                        <option value="">Seleccionar...</option>
+                        <option value="Cobb 500">Cobb 500</option>
+                        <option value="Ross 308">Ross 308</option>
+                        <option value="Hubbard">Hubbard</option>
+                        <option value="Otro">Otro</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Proveedor</label>
+                    <input type="text" id="editProveedor" name="proveedor" class="form-input">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Galpón</label>
+                    <input type="text" id="editGalpon" name="galpon" class="form-input">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Estado</label>
+                    <select id="editEstado" name="estado" class="form-select">
+                        <option value="activo">Activo</option>
+                        <option value="finalizado">Finalizado</option>
+                        <option value="pausado">Pausado</option>
+                    </select>
+                </div>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('editarLoteModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Actualizar Lote
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+`;
+montarModales(PLANTILLA);
+
+// LOTES
+document.getElementById('nuevoLoteForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+
+    try {
+        await apiCall('/lotes', 'POST', data);
+        showAlert('Lote creado exitosamente');
+        closeModal('nuevoLoteModal');
+        e.target.reset();
+        loadDashboard();
+    } catch (error) {
+        showAlert('Error creando lote', 'danger');
+    }
+});
+
+// Hoja PDF con una etiqueta QR por lote activo, generada en una sola petición
+export async function imprimirEtiquetasQr() {
+    try {
+        const resp = await fetch(`${API_URL}/lotes/etiquetas-qr`, {
+            headers: {
+                'Authorization': `Bearer ${estado.token}`
+            }
+        });
+        if (!resp.ok) {
+            let msg = 'No se pudieron generar las etiquetas';
+            try { const j = await resp.json(); msg = j.mensaje || msg; } catch {}
+            throw new Error(msg);
+        }
+        const url = URL.createObjectURL(await resp.blob());
+        window.open(url, '_blank') || Object.assign(document.createElement('a'), { href: url, download: 'etiquetas_qr.pdf' }).click();
+        setTimeout(() => URL.revokeObjectURL(url), 60000);
+    } catch (e) {
+        showAlert(e.message || 'No se pudieron generar las etiquetas', 'danger');
+    }
+}
+
+export async function showQrLote(loteId) {
+    try {
+        console.log('Generando QR para lote:', loteId);
+        const resp = await fetch(`${API_URL}/lotes/${loteId}/qr`, {
+            headers: {
+                'Authorization': `Bearer ${estado.token}`
+            },
+            mode: 'cors',
+            credentials: 'omit'
+        });
+        if (!resp.ok) {
+            const errorText = await resp.text();
+            console.error('Error del servidor:', errorText);
+            throw new Error('No se pudo obtener el QR: ' + resp.status);
+        }
+        const blob = await resp.blob();
+        const url = URL.createObjectURL(blob);
+        const img = document.getElementById('qrLoteImg');
+        const link = document.getElementById('qrDownloadLink');
+        const title = document.getElementById('qrModalTitle');
+        if (img) img.src = url;
+        if (link) { link.href = url; link.download = `lote_${loteId}_qr.png`; }
+        if (title) title.textContent = `QR del Lote #${loteId}`;
+        openModal('qrLoteModal');
+        console.log('QR generado y modal abierto');
+    } catch (e) {
+        console.error('Error generando QR:', e);
+        showAlert('Error generando QR del lote: ' + e.message, 'danger');
+    }
+}
+
+// Event listener para formulario de editar lote
+document.getElementById('editarLoteForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = {};
+
+    // Convertir FormData a objeto, convirtiendo strings vacíos a null
+    for (let [key, value] of formData.entries()) {
+        if (value === '' || value === null) {
+            data[key] = null;
+        } else {
+            data[key] = value;
+        }
+    }
+
+    const loteId = data.id;
+    delete data.id; // Remover el ID de los datos a enviar
+
+    console.log('Actualizando lote:', loteId, 'con datos:', data);
+
+    try {
+        const response = await apiCall(`/lotes/${loteId}`, 'PUT', data);
+        console.log('Respuesta del servidor:', response);
+        closeModal('editarLoteModal');
+        // Recargar inmediatamente los datos
+        await loadDashboard();
+        await loadLotesTable();
+        showAlert('Lote actualizado exitosamente', 'success');
+    } catch (error) {
+        console.error('Error actualizando lote:', error);
+        showAlert('Error actualizando lote: ' + (error.mensaje || error.message || 'Error desconocido'), 'danger');
+    }
+});
+
+// Función para editar lote
+export async function editarLote(loteId) {
+    try {
+        console.log('Editando lote:', loteId);
+        // Obtener datos del lote
+        const lote = await apiCall(`/lotes/${loteId}`);
+        console.log('Datos del lote obtenidos:', lote);
+
+        // Rellenar el formulario con los datos del lote
+        document.getElementById('editLoteId').value = lote.id;
+        document.getElementById('editNombre').value = lote.nombre || '';
+        document.getElementById('editFechaInicio').value = lote.fecha_inicio || '';
+        document.getElementById('editCantidadInicial').value = lote.cantidad_inicial || '';
+        document.getElementById('editPesoInicial').value = lote.peso_inicial || '';
+        document.getElementById('editDiasCiclo').value = lote.dias_ciclo || 42;
+        document.getElementById('editGenetica').value = lote.genetica || '';
+        document.getElementById('editProveedor').value = lote.proveedor || '';
+        document.getElementById('editGalpon').value = lote.galpon || '';
+        document.getElementById('editEstado').value = lote.estado || 'activo';
+
+        // Calcular fecha de sacrificio después de cargar los datos
+        calcularFechaSacrificioEdit();
+
+        // Abrir el modal
+        openModal('editarLoteModal');
+        console.log('Modal de edición abierto');
+
+    } catch (error) {
+        console.error('Error editando lote:', error);
+        showAlert('Error cargando datos del lote: ' + (error.message || 'Error desconocido'), 'danger');
+    }
+}
+
+// Función para eliminar lote
+export async function eliminarLote(loteId, nombreLote) {
+    console.log('Intentando eliminar lote:', loteId, nombreLote);
+    if (confirm(`¿Estás seguro de que deseas eliminar el lote "${nombreLote}"?\n\n⚠️ ATENCIÓN: Esta acción eliminará:\n• Todos los registros diarios\n• Todos los costos e ingresos\n• Todos los registros de sanidad\n• Toda la información asociada\n\nEsta acción NO se puede deshacer.`)) {
+        try {
+            console.log('Eliminando lote...');
+            await apiCall(`/lotes/${loteId}`, 'DELETE');
+            showAlert('Lote eliminado exitosamente', 'success');
+            console.log('Lote eliminado, recargando dashboard...');
+            loadDashboard(); // Recargar la página principal
+        } catch (error) {
+            console.error('Error eliminando lote:', error);
+            showAlert('Error eliminando lote: ' + (error.mensaje || error.message || 'Error desconocido'), 'danger');
+        }
+    } else {
+        console.log('Eliminación cancelada por el usuario');
+    }
+}
+
+// CALCULADORAS DE FECHA DE SACRIFICIO
+function fechaSacrificioTexto(fechaInicio, diasCiclo) {
+    if (fechaInicio && diasCiclo && diasCiclo > 0) {
+        const inicio = new Date(fechaInicio);
+        inicio.setDate(inicio.getDate() + diasCiclo);
+        return inicio.toLocaleDateString('es-CO', {
+            weekday: 'long',
+            year: 'numeric',
+            month: 'long',
+            day: 'numeric'
+        });
+    }
+    return '';
+}
+
+function calcularFechaSacrificio() {
+    const form = document.getElementById('nuevoLoteForm');
+    document.getElementById('fechaSacrificioPreview').value = fechaSacrificioTexto(
+        form.fecha_inicio.value, parseInt(form.dias_ciclo.value));
+}
+
+function calcularFechaSacrificioEdit() {
+    document.getElementById('editFechaSacrificioPreview').value = fechaSacrificioTexto(
+        document.getElementById('editFechaInicio').value, parseInt(document.getElementById('editDiasCiclo').value));
+}
+
+const nuevoLoteForm = document.getElementById('nuevoLoteForm');
+nuevoLoteForm.fecha_inicio.addEventListener('change', calcularFechaSacrificio);
+nuevoLoteForm.dias_ciclo.addEventListener('input', calcularFechaSacrificio);
+document.getElementById('editFechaInicio').addEventListener('change', calcularFechaSacrificioEdit);
+document.getElementById('editDiasCiclo').addEventListener('input', calcularFechaSacrificioEdit);
+// Calcular fecha inicial al cargar
+calcularFechaSacrificio();
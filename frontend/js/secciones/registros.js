@@ -0,0 +1,247 @@
+// REGISTROS DIARIOS del lote abierto
+import { estado, seccion, apiCall, showAlert, formatDate, hoyISO, openModal, closeModal, montarModales } from '../nucleo.js';
+
+const PLANTILLA = `
+<!-- Modal: Nuevo Registro -->
+<div id="nuevoRegistroModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Nuevo Registro Diario</h3>
+            <button class="close-btn" onclick="closeModal('nuevoRegistroModal')">×</button>
+        </div>
+        <form id="nuevoRegistroForm">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Alimento (kg)</label>
+                    <input type="number" name="alimento_kg" class="form-input" step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Agua (litros)</label>
+                    <input type="number" name="agua_litros" class="form-input" step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Mortalidad</label>
+                    <input type="number" name="mortalidad" class="form-input" value="0" min="0">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Peso Promedio (g)</label>
+                    <input type="number" name="peso_promedio" class="form-input" step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Temperatura (°C)</label>
+                    <input type="number" name="temperatura_promedio" class="form-input" step="0.1">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Humedad (%)</label>
+                    <input type="number" name="humedad" class="form-input" step="0.1" min="0" max="100" placeholder="Ej: 65">
+                    <small class="form-help">Rango ideal usual: 50% - 70%</small>
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('nuevoRegistroModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Guardar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+
+<!-- Modal: Editar Registro -->
+<div id="editarRegistroModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Editar Registro Diario</h3>
+            <button class="close-btn" onclick="closeModal('editarRegistroModal')">×</button>
+        </div>
+        <form id="editarRegistroForm">
+            <input type="hidden" id="editRegistroId">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" id="editRegistroFecha" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Alimento (kg)</label>
+                    <input type="number" id="editRegistroAlimento" name="alimento_kg" class="form-input" step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Agua (litros)</label>
+                    <input type="number" id="editRegistroAgua" name="agua_litros" class="form-input" step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Mortalidad</label>
+                    <input type="number" id="editRegistroMortalidad" name="mortalidad" class="form-input" min="0">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Peso Promedio (g)</label>
+                    <input type="number" id="editRegistroPeso" name="peso_promedio" class="form-input" step="0.01">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Temperatura (°C)</label>
+                    <input type="number" id="editRegistroTemperatura" name="temperatura_promedio" class="form-input" step="0.1">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Humedad (%)</label>
+                    <input type="number" id="editRegistroHumedad" name="humedad" class="form-input" step="0.1" min="0" max="100">
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea id="editRegistroObservaciones" name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('editarRegistroModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Actualizar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+`;
+montarModales(PLANTILLA);
+
+const recargarLote = () => seccion('detalle').then(m => m.verLote(estado.loteId));
+
+// REGISTROS
+export async function loadRegistros() {
+    if (!estado.loteId) return;
+
+    try {
+        const registros = await apiCall(`/lotes/${estado.loteId}/registros`);
+
+        const tbody = document.getElementById('registrosTableBody');
+        tbody.innerHTML = registros.map(r => `
+            <tr>
+                <td>${formatDate(r.fecha)}</td>
+                <td>${r.alimento_kg || '-'}</td>
+                <td>${r.agua_litros || '-'}</td>
+                <td>${r.mortalidad || 0}</td>
+                <td>${r.peso_promedio || '-'}</td>
+                <td>${r.temperatura_promedio || '-'}</td>
+                <td>${r.humedad || '-'}</td>
+                <td>${r.observaciones || '-'}</td>
+                <td>
+                    <div class="button-group">
+                        <button class="btn btn-primary btn-sm" onclick="duplicarRegistro(${r.id})" title="Duplicar registro">
+                            📋 Duplicar
+                        </button>
+                        <button class="btn btn-warning btn-sm" onclick="editarRegistro(${r.id})" title="Editar registro">
+                            ✏️ Editar
+                        </button>
+                        <button class="btn btn-danger btn-sm" onclick="eliminarRegistro(${r.id}, '${r.fecha}')" title="Eliminar registro">
+                            🗑️ Eliminar
+                        </button>
+                    </div>
+                </td>
+            </tr>
+        `).join('');
+    } catch (error) {
+        showAlert('Error cargando registros', 'danger');
+    }
+}
+
+document.getElementById('nuevoRegistroForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/registros`, 'POST', data);
+        showAlert('Registro guardado exitosamente');
+        closeModal('nuevoRegistroModal');
+        e.target.reset();
+        loadRegistros();
+        recargarLote(); // Reload stats
+    } catch (error) {
+        showAlert('Error guardando registro', 'danger');
+    }
+});
+
+export async function editarRegistro(registroId) {
+    try {
+        const registro = await apiCall(`/lotes/${estado.loteId}/registros/${registroId}`);
+
+        // Rellenar el formulario con los datos del registro
+        document.getElementById('editRegistroId').value = registro.id;
+        document.getElementById('editRegistroFecha').value = registro.fecha;
+        document.getElementById('editRegistroAlimento').value = registro.alimento_kg || '';
+        document.getElementById('editRegistroAgua').value = registro.agua_litros || '';
+        document.getElementById('editRegistroMortalidad').value = registro.mortalidad || '';
+        document.getElementById('editRegistroPeso').value = registro.peso_promedio || '';
+        document.getElementById('editRegistroTemperatura').value = registro.temperatura_promedio || '';
+        document.getElementById('editRegistroHumedad').value = registro.humedad || '';
+        document.getElementById('editRegistroObservaciones').value = registro.observaciones || '';
+
+        openModal('editarRegistroModal');
+    } catch (error) {
+        showAlert('Error cargando datos del registro', 'danger');
+    }
+}
+
+export async function eliminarRegistro(registroId, fecha) {
+    if (confirm(`¿Estás seguro de que deseas eliminar el registro del ${formatDate(fecha)}?`)) {
+        try {
+            await apiCall(`/lotes/${estado.loteId}/registros/${registroId}`, 'DELETE');
+            showAlert('Registro eliminado exitosamente', 'success');
+            loadRegistros();
+            recargarLote(); // Recargar estadísticas
+        } catch (error) {
+            showAlert('Error eliminando registro', 'danger');
+        }
+    }
+}
+
+export async function duplicarRegistro(registroId) {
+    try {
+        const registro = await apiCall(`/lotes/${estado.loteId}/registros/${registroId}`);
+
+        // Rellenar el formulario de nuevo registro con los datos del registro original
+        const form = document.getElementById('nuevoRegistroForm');
+        form.fecha.value = hoyISO(); // Fecha actual
+        form.alimento_kg.value = registro.alimento_kg || '';
+        form.agua_litros.value = registro.agua_litros || '';
+        form.mortalidad.value = '0'; // Resetear mortalidad
+        form.peso_promedio.value = registro.peso_promedio || '';
+        form.temperatura_promedio.value = registro.temperatura_promedio || '';
+        form.humedad.value = registro.humedad || '';
+        form.observaciones.value = `Duplicado de registro del ${formatDate(registro.fecha)}`;
+
+        openModal('nuevoRegistroModal');
+        showAlert('Datos copiados. Modifica la fecha y guarda el nuevo registro.', 'success');
+    } catch (error) {
+        showAlert('Error duplicando registro', 'danger');
+    }
+}
+
+document.getElementById('editarRegistroForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    const registroId = document.getElementById('editRegistroId').value;
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/registros/${registroId}`, 'PUT', data);
+        showAlert('Registro actualizado exitosamente', 'success');
+        closeModal('editarRegistroModal');
+        await loadRegistros();
+        await recargarLote();
+    } catch (error) {
+        showAlert('Error actualizando registro', 'danger');
+    }
+});
@@ -0,0 +1,319 @@
+// SANIDAD: registros sanitarios del lote abierto
+import { estado, apiCall, showAlert, formatDate, openModal, closeModal, montarModales } from '../nucleo.js';
+
+const PLANTILLA = `
+<!-- Modal: Nuevo Registro Sanitario -->
+<div id="nuevoSanidadModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Nuevo Registro Sanitario</h3>
+            <button class="close-btn" onclick="closeModal('nuevoSanidadModal')">×</button>
+        </div>
+        <form id="nuevoSanidadForm">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Tipo *</label>
+                    <select name="tipo" class="form-select" required>
+                        <option value="">Seleccionar...</option>
+                        <option value="Vacuna">Vacuna</option>
+                        <option value="Antibiótico">Antibiótico</option>
+                        <option value="Vitaminas">Vitaminas</option>
+                        <option value="Desparasitante">Desparasitante</option>
+                        <option value="Otro">Otro</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Producto *</label>
+                    <input type="text" name="producto" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Dosis</label>
+                    <input type="text" name="dosis" class="form-input">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Edad (días)</label>
+                    <input type="number" name="edad_dias" class="form-input">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Enfermedad</label>
+                    <select name="enfermedad_id" id="sanidadEnfermedadSelect" class="form-select">
+                        <option value="">Seleccionar...</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Vía de administración</label>
+                    <select name="via_administracion" class="form-select">
+                        <option value="">Seleccionar...</option>
+                        <option value="Oral">Oral</option>
+                        <option value="Agua">Agua</option>
+                        <option value="Inyectable">Inyectable</option>
+                        <option value="Spray">Spray</option>
+                        <option value="Alimento">Alimento</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Días de retiro</label>
+                    <input type="number" name="retiro_dias" class="form-input" min="0" placeholder="Ej: 7">
+                    <small class="form-help">Tiempo recomendado antes de sacrificio</small>
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('nuevoSanidadModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Guardar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+
+<!-- Modal: Editar Sanidad -->
+<div id="editarSanidadModal" class="modal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h3 class="modal-title">Editar Registro Sanitario</h3>
+            <button class="close-btn" onclick="closeModal('editarSanidadModal')">×</button>
+        </div>
+        <form id="editarSanidadForm">
+            <input type="hidden" id="editSanidadId">
+            <div class="form-grid">
+                <div class="form-group">
+                    <label class="form-label">Fecha *</label>
+                    <input type="date" id="editSanidadFecha" name="fecha" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Tipo *</label>
+                    <select id="editSanidadTipo" name="tipo" class="form-select" required>
+                        <option value="">Seleccionar...</option>
+                        <option value="Vacuna">Vacuna</option>
+                        <option value="Antibiótico">Antibiótico</option>
+                        <option value="Vitaminas">Vitaminas</option>
+                        <option value="Desparasitante">Desparasitante</option>
+                        <option value="Otro">Otro</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Producto *</label>
+                    <input type="text" id="editSanidadProducto" name="producto" class="form-input" required>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Dosis</label>
+                    <input type="text" id="editSanidadDosis" name="dosis" class="form-input">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Edad (días)</label>
+                    <input type="number" id="editSanidadEdad" name="edad_dias" class="form-input">
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Enfermedad</label>
+                    <select id="editSanidadEnfermedad" name="enfermedad_id" class="form-select">
+                        <option value="">Seleccionar...</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Vía de administración</label>
+                    <select id="editSanidadVia" name="via_administracion" class="form-select">
+                        <option value="">Seleccionar...</option>
+                        <option value="Oral">Oral</option>
+                        <option value="Agua">Agua</option>
+                        <option value="Inyectable">Inyectable</option>
+                        <option value="Spray">Spray</option>
+                        <option value="Alimento">Alimento</option>
+                    </select>
+                </div>
+                <div class="form-group">
+                    <label class="form-label">Días de retiro</label>
+                    <input type="number" id="editSanidadRetiro" name="retiro_dias" class="form-input" min="0" placeholder="Ej: 7">
+                    <small class="form-help">Tiempo recomendado antes de sacrificio</small>
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Observaciones</label>
+                <textarea id="editSanidadObservaciones" name="observaciones" class="form-textarea"></textarea>
+            </div>
+            <div style="display: flex; gap: 1rem; justify-content: flex-end; margin-top: 1.5rem;">
+                <button type="button" class="btn btn-outline" onclick="closeModal('editarSanidadModal')">
+                    Cancelar
+                </button>
+                <button type="submit" class="btn btn-primary">
+                    Actualizar
+                </button>
+            </div>
+        </form>
+    </div>
+</div>
+`;
+montarModales(PLANTILLA);
+
+// SANIDAD
+export async function loadSanidad() {
+    if (!estado.loteId) return;
+
+    try {
+        const sanidad = await apiCall(`/lotes/${estado.loteId}/sanidad`);
+
+        const tbody = document.getElementById('sanidadTableBody');
+        tbody.innerHTML = sanidad.map(s => `
+            <tr>
+                <td>${formatDate(s.fecha)}</td>
+                <td><span class="badge badge-success">${s.tipo}</span></td>
+                <td>${s.producto}</td>
+                <td>${s.dosis || '-'}</td>
+                <td>${s.edad_dias || '-'}</td>
+                <td>${s.enfermedad_nombre || '-'}</td>
+                <td>${s.via_administracion || '-'}</td>
+                <td>${s.retiro_dias != null ? s.retiro_dias : '-'}</td>
+                <td>
+                    <div class="button-group">
+                        <button class="btn btn-warning btn-sm" onclick="editarSanidad(${s.id})" title="Editar registro sanitario">
+                            ✏️ Editar
+                        </button>
+                        <button class="btn btn-danger btn-sm" onclick="eliminarSanidad(${s.id}, '${s.producto}')" title="Eliminar registro sanitario">
+                            🗑️ Eliminar
+                        </button>
+                    </div>
+                </td>
+            </tr>
+        `).join('');
+    } catch (error) {
+        showAlert('Error cargando registros sanitarios', 'danger');
+    }
+}
+
+document.getElementById('nuevoSanidadForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    // Normalizar campos opcionales
+    if (data.retiro_dias === '') delete data.retiro_dias; else data.retiro_dias = Number(data.retiro_dias);
+    if (data.enfermedad_id === '') delete data.enfermedad_id; else data.enfermedad_id = Number(data.enfermedad_id);
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/sanidad`, 'POST', data);
+        showAlert('Registro sanitario guardado exitosamente');
+        closeModal('nuevoSanidadModal');
+        e.target.reset();
+        loadSanidad();
+    } catch (error) {
+        showAlert('Error guardando registro sanitario', 'danger');
+    }
+});
+
+export async function editarSanidad(sanidadId) {
+    try {
+        const sanidad = await apiCall(`/lotes/${estado.loteId}/sanidad/${sanidadId}`);
+
+        // Rellenar el formulario con los datos del registro sanitario
+        document.getElementById('editSanidadId').value = sanidad.id;
+        document.getElementById('editSanidadFecha').value = sanidad.fecha;
+        document.getElementById('editSanidadTipo').value = sanidad.tipo || '';
+        document.getElementById('editSanidadProducto').value = sanidad.producto || '';
+        document.getElementById('editSanidadDosis').value = sanidad.dosis || '';
+        document.getElementById('editSanidadEdad').value = sanidad.edad_dias || '';
+        await populateEnfermedadesSelects();
+        document.getElementById('editSanidadEnfermedad').value = sanidad.enfermedad_id || '';
+        document.getElementById('editSanidadVia').value = sanidad.via_administracion || '';
+        document.getElementById('editSanidadRetiro').value = sanidad.retiro_dias ?? '';
+        document.getElementById('editSanidadObservaciones').value = sanidad.observaciones || '';
+
+        openModal('editarSanidadModal');
+    } catch (error) {
+        showAlert('Error cargando datos del registro sanitario', 'danger');
+    }
+}
+
+export async function eliminarSanidad(sanidadId, producto) {
+    if (confirm(`¿Estás seguro de que deseas eliminar el registro sanitario "${producto}"?`)) {
+        try {
+            await apiCall(`/lotes/${estado.loteId}/sanidad/${sanidadId}`, 'DELETE');
+            showAlert('Registro sanitario eliminado exitosamente', 'success');
+            loadSanidad();
+        } catch (error) {
+            showAlert('Error eliminando registro sanitario', 'danger');
+        }
+    }
+}
+
+document.getElementById('editarSanidadForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = Object.fromEntries(formData);
+    const sanidadId = document.getElementById('editSanidadId').value;
+    if (data.retiro_dias === '') delete data.retiro_dias; else data.retiro_dias = Number(data.retiro_dias);
+    if (data.enfermedad_id === '') delete data.enfermedad_id; else data.enfermedad_id = Number(data.enfermedad_id);
+
+    try {
+        await apiCall(`/lotes/${estado.loteId}/sanidad/${sanidadId}`, 'PUT', data);
+        showAlert('Registro sanitario actualizado exitosamente', 'success');
+        closeModal('editarSanidadModal');
+        loadSanidad();
+    } catch (error) {
+        showAlert('Error actualizando registro sanitario', 'danger');
+    }
+});
+
+export async function populateEnfermedadesSelects() {
+    try {
+        const enfermedades = await apiCall('/enfermedades');
+        const options = ['<option value="">Seleccionar...</option>'].concat(
+            enfermedades.map(e => `<option value="${e.id}">${e.nombre}</option>`)
+        ).join('');
+        const nuevoSelect = document.getElementById('sanidadEnfermedadSelect');
+        const editSelect = document.getElementById('editSanidadEnfermedad');
+        if (nuevoSelect) nuevoSelect.innerHTML = options;
+        if (editSelect) editSelect.innerHTML = options;
+    } catch (error) {
+        console.warn('No se pudieron cargar enfermedades para selects');
+    }
+}
+
+async function prefillSanidadFromEnfermedad(enfermedadId, contexto) {
+    try {
+        const enf = await apiCall(`/enfermedades/${enfermedadId}`);
+        const meds = (enf.medicamentos || '').split(',').map(s => s.trim()).filter(Boolean);
+        const medSugerido = meds.length ? meds[0] : '';
+        const textoSug = [
+            enf.nombre ? `Enfermedad: ${enf.nombre}` : null,
+            enf.tratamiento ? `Tratamiento sugerido: ${enf.tratamiento}` : null,
+            enf.medicamentos ? `Medicamentos: ${enf.medicamentos}` : null
+        ].filter(Boolean).join('\n');
+
+        if (contexto === 'nuevo') {
+            const modal = document.getElementById('nuevoSanidadModal');
+            const producto = modal?.querySelector('input[name="producto"]');
+            const obs = modal?.querySelector('textarea[name="observaciones"]');
+            if (producto && (!producto.value || !producto.value.trim()) && medSugerido) producto.value = medSugerido;
+            if (obs && (!obs.value || !obs.value.trim()) && textoSug) obs.value = textoSug;
+        } else if (contexto === 'editar') {
+            const producto = document.getElementById('editSanidadProducto');
+            const obs = document.getElementById('editSanidadObservaciones');
+            if (producto && (!producto.value || !producto.value.trim()) && medSugerido) producto.value = medSugerido;
+            if (obs && (!obs.value || !obs.value.trim()) && textoSug) obs.value = textoSug;
+        }
+    } catch (e) {
+        console.warn('No se pudo autocompletar desde enfermedad');
+    }
+}
+
+document.getElementById('sanidadEnfermedadSelect').addEventListener('change', async (e) => {
+    const id = e.target.value;
+    if (!id) return;
+    await prefillSanidadFromEnfermedad(id, 'nuevo');
+});
+document.getElementById('editSanidadEnfermedad').addEventListener('change', async (e) => {
+    const id = e.target.value;
+    if (!id) return;
+    await prefillSanidadFromEnfermedad(id, 'editar');
+});